@@ -1,373 +1,148 @@
+import altair as alt
 import streamlit as st
 import pandas as pd
-import io
+import json
 import math
-
-# Add custom CSS for grey background and white text to match Navigate Wealth logo
-st.markdown(
-    """
-    <style>
-    .stApp {
-        background-color: #4A4A4A;  /* Grey background similar to logo */
-        color: white;  /* White text */
-    }
-    h1 {
-        color: white;  /* Ensure title is white */
-    }
-    .stTextInput > div > div > input {
-        background-color: #555555;  /* Lighter grey for input fields */
-        color: white;  /* White text in inputs */
-    }
-    .stTextInput > div > div > input::placeholder {
-        color: #CCCCCC;  /* Light grey placeholder text */
-        opacity: 1;  /* Ensure placeholder is fully visible */
-    }
-    .stNumberInput > div > div > input {
-        background-color: #555555;  /* Lighter grey for number input fields */
-        color: white;  /* White text in inputs */
-    }
-    .stNumberInput > div > div > input::placeholder {
-        color: #CCCCCC;  /* Light grey placeholder text */
-        opacity: 1;  /* Ensure placeholder is fully visible */
-    }
-    .stButton > button {
-        background-color: #666666;  /* Medium grey for button */
-        color: white;  /* White text on button */
-        border: 1px solid #777777;  /* Slight border for visibility */
-    }
-    .stButton > button:hover {
-        background-color: #777777;  /* Slightly lighter grey on hover */
-        color: red;  /* Red text on hover */
-    }
-    .stFormSubmitButton > button {
-        background-color: #666666;  /* Medium grey for form submit button */
-        color: white;  /* White text on button */
-        border: 1px solid #777777;  /* Slight border for visibility */
-    }
-    .stFormSubmitButton > button:hover {
-        background-color: #777777;  /* Slightly lighter grey on hover */
-        color: red;  /* Red text on hover */
-    }
-    .stDownloadButton > button {
-        background-color: #666666;  /* Medium grey for download button */
-        color: white;  /* White text */
-        border: 1px solid #777777;
-    }
-    .stDownloadButton > button:hover {
-        background-color: #777777;  /* Slightly lighter grey on hover */
-        color: red;  /* Red text on hover */
-    }
-    .stAlert {
-        background-color: #333333;  /* Darker grey for success/info boxes */
-        color: white;  /* White text in alerts */
-    }
-    .stSelectbox > div > div > select {
-        background-color: #333333;  /* Darker grey for dropdown */
-        color: white;  /* White text in dropdown */
-    }
-    /* Style for labels */
-    .stTextInput > label, .stNumberInput > label, .stSelectbox > label {
-        color: white;  /* White labels */
-    }
-    /* Style for descriptions (st.write text) */
-    .stMarkdown, .stMarkdown p {
-        color: white;  /* White description text */
-    }
-    </style>
-    """,
-    unsafe_allow_html=True
+import os
+import re
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from calculators import (
+    DEFAULT_TAX_YEAR,
+    DEPLETION_HORIZON_YEARS,
+    TAX_TABLES,
+    average_contribution_increase,
+    calculate_additional_savings_needed,
+    calculate_budget,
+    calculate_estate_liquidity,
+    calculate_ra_rebate,
+    calculate_retirement_plan,
+    calculate_salary_tax,
+    calculate_years_until_depletion,
+    combine_provisions,
+    project_provision,
 )
+from calculators.budget_projection import EXPENSE_FREQUENCIES, MAX_PROJECTION_MONTHS, MIN_PROJECTION_MONTHS, project_budget
+from calculators.bulk import RESULT_FORMATS, calculate_estate_liquidity_tables, read_client_chunks, write_estate_liquidity_results, write_salary_tax_results
+from calculators.goal_seek import MAX_RETIREMENT_AGE, solve_retirement_age
+from calculators.monte_carlo import CHUNK_PATHS, run_retirement_monte_carlo
+from calculators.ra_optimizer import optimize_ra_contribution_batch
+from calculators.sweep import sweep_retirement_plan
+from calc_cache import CALCULATION_CACHE, cached
+from calc_graph import CalculationGraph
+from excel_export import WORKBOOK_CACHE, XLSX_MIME, workbook_bytes
+from profiling import PROFILER, PROFILING_ENABLED, phase, profiled
+from result_store import default_result_store
+from result_views import MAX_BAR_CATEGORIES, PAGE_SIZES, downsample_line, page_count, result_page, thin_grid, top_categories
+from session_memory import process_memory_bytes, session_report
 
-# Tax Rates and Rebates (2024/2025) - Easily updatable
-TAX_BRACKETS = [
-    (0, 237100, 0.18, 0),
-    (237101, 370500, 0.26, 42678),
-    (370501, 512800, 0.31, 77362),
-    (512801, 673000, 0.36, 121475),
-    (673001, 857900, 0.39, 179147),
-    (857901, 1817000, 0.41, 251258),
-    (1817001, float('inf'), 0.45, 644489)
-]
-REBATES = {
-    "primary": 17235,
-    "secondary": 9444,  # Age 65+
-    "tertiary": 3145    # Age 75+
+# Custom CSS for grey background and white text to match Navigate Wealth logo
+APP_CSS = """
+<style>
+.stApp {
+    background-color: #4A4A4A;  /* Grey background similar to logo */
+    color: white;  /* White text */
 }
-UIF_RATE = 0.01  # 1% employee contribution
-UIF_MONTHLY_CAP = 17712  # Updated to R17,712/month as of 1 June 2021
-UIF_ANNUAL_CAP = UIF_MONTHLY_CAP * 12  # R212,544
-# Medical Tax Credits (2025/2026)
-MTC_PER_PERSON = 364  # R364 per month for taxpayer and first dependant
-MTC_ADDITIONAL_DEPENDANT = 246  # R246 per month for each additional dependant
-# Estate Duty Rates (2025)
-ESTATE_DUTY_ABATEMENT = 3500000  # R3.5 million
-ESTATE_DUTY_RATE_1 = 0.20  # 20% up to R30 million
-ESTATE_DUTY_RATE_2 = 0.25  # 25% above R30 million
-ESTATE_DUTY_THRESHOLD = 30000000  # R30 million
-EXECUTOR_FEE_RATE = 0.035  # 3.5%
-VAT_RATE = 0.15  # 15%
-CGT_INCLUSION_RATE = 0.40  # 40% inclusion rate for individuals
-CGT_EXCLUSION_DEATH = 300000  # R300,000 exclusion in year of death
-
-# RA Tax Rebate Calculator Functions
-def get_tax_rate(income):
-    """Return the marginal tax rate based on annual taxable income (2024/2025 rates)."""
-    for lower, upper, rate, base_tax in TAX_BRACKETS:
-        if lower <= income <= upper:
-            return rate
-    return 0.45
-
-def calculate_ra_rebate(income, contribution):
-    """Calculate the tax rebate for RA contributions and excess carryover."""
-    max_deductible = min(income * 0.275, 350000)  # 27.5% of income, capped at R350,000
-    deductible = min(contribution, max_deductible)  # Deductible amount
-    excess = max(0, contribution - max_deductible)  # Excess contribution to carry over
-    tax_rate = get_tax_rate(income)
-    rebate = deductible * tax_rate
-    return deductible, tax_rate, rebate, excess
-
-# Calculate Medical Tax Credits
-def calculate_medical_tax_credits(num_dependants):
-    """Calculate the Medical Scheme Fees Tax Credit (MTC) based on the number of dependants."""
-    if num_dependants <= 0:
-        return 0, 0
-    # First two members (taxpayer + first dependant) get R364 each per month
-    if num_dependants <= 2:
-        annual_mtc = num_dependants * MTC_PER_PERSON * 12
-    else:
-        # First two get R364 each, additional dependants get R246 each
-        annual_mtc = (2 * MTC_PER_PERSON * 12) + ((num_dependants - 2) * MTC_ADDITIONAL_DEPENDANT * 12)
-    monthly_mtc = annual_mtc / 12
-    return annual_mtc, monthly_mtc
-
-# Salary Tax Calculator Function
-def calculate_salary_tax(gross_salary, pension_contribution, age, medical_contributions, num_dependants):
-    """Calculate PAYE, UIF, MTC, taxable income, and tax rates."""
-    # Step 1: Calculate Taxable Income
-    max_deductible = min(gross_salary * 0.275, 350000)  # Pension/RA deduction limit
-    deductible_contribution = min(pension_contribution, max_deductible)
-    taxable_income = max(0, gross_salary - deductible_contribution)
-
-    # Step 2: Calculate PAYE before MTC
-    tax_before_rebates = 0
-    marginal_rate = 0
-    for lower, upper, rate, base_tax in TAX_BRACKETS:
-        if taxable_income > lower:
-            if taxable_income <= upper:
-                tax_before_rebates = base_tax + (taxable_income - lower) * rate
-                marginal_rate = rate
-                break
-            marginal_rate = rate
-        else:
-            break
-
-    # Apply rebates based on age
-    total_rebate = REBATES["primary"]
-    if age >= 75:
-        total_rebate += REBATES["secondary"] + REBATES["tertiary"]
-    elif age >= 65:
-        total_rebate += REBATES["secondary"]
-    paye_before_mtc = max(0, tax_before_rebates - total_rebate)
-    paye_before_mtc_monthly = paye_before_mtc / 12
-
-    # Step 3: Calculate Medical Tax Credits
-    mtc_annual, mtc_monthly = calculate_medical_tax_credits(num_dependants)
-    # Apply MTC to reduce PAYE
-    paye = max(0, paye_before_mtc - mtc_annual)
-    paye_monthly = paye / 12
-
-    # Step 4: Calculate UIF (employee contribution)
-    annual_salary_for_uif = min(gross_salary, UIF_ANNUAL_CAP)
-    uif = annual_salary_for_uif * UIF_RATE
-    uif_monthly = uif / 12
-
-    # Step 5: Calculate Net Income
-    net_income = gross_salary - paye - uif
-    net_income_monthly = net_income / 12
-
-    return taxable_income, paye_before_mtc, paye_before_mtc_monthly, mtc_annual, mtc_monthly, paye, paye_monthly, uif, uif_monthly, net_income, net_income_monthly, marginal_rate
-
-# Budget Tool Function
-def calculate_budget(monthly_income, expenses):
-    """Calculate total expenses, remaining budget, and savings potential."""
-    total_expenses = sum(expense for category, expense in expenses)
-    remaining_budget = monthly_income - total_expenses
-    savings_potential = max(0, remaining_budget)  # Savings if positive, 0 if negative
-    return total_expenses, remaining_budget, savings_potential
-
-# Retirement Calculator Functions
-def calculate_future_value(current_value, annual_rate, years, monthly_contribution=0, annual_contribution_increase=0):
-    """Calculate the future value of an investment with monthly contributions and annual increases."""
-    future_value = current_value
-    monthly_rate = (1 + annual_rate) ** (1/12) - 1  # Convert annual rate to monthly
-    annual_contributions = monthly_contribution * 12  # Initial annual contribution
-
-    for year in range(years):
-        # Apply growth to the current value at the start of the year
-        future_value = future_value * (1 + annual_rate)
-        # Add contributions for the year, compounded monthly
-        for month in range(12):
-            monthly_contrib = (annual_contributions / 12) * (1 + monthly_rate) ** (11 - month)
-            future_value += monthly_contrib
-        # Increase contributions for the next year
-        annual_contributions *= (1 + annual_contribution_increase)
-
-    return future_value
-
-def calculate_years_until_depletion(capital, annual_income, inflation_rate, years_to_retirement, assumed_return):
-    """Calculate how many years the capital will last with annual withdrawals, considering SA laws."""
-    current_capital = capital
-    max_drawdown_rate = 0.175  # Living annuity max drawdown of 17.5%
-    years = 0
-    first_withdrawal = None
-    capital_over_time = [current_capital]  # Track capital for graphing
-    withdrawals_over_time = []  # Track withdrawals (income) for graphing
-    monthly_income_over_time = []  # Track monthly income for graphing
-    monthly_income_today_value = []  # Track monthly income in today's value
-
-    while current_capital > 0:
-        # Check if capital is below R125,000 threshold for full withdrawal
-        if current_capital <= 125000:
-            withdrawals_over_time.append(current_capital)  # Full withdrawal
-            monthly_income = current_capital / 12
-            monthly_income_over_time.append(monthly_income)
-            # Adjust for inflation to today's value
-            total_years = years_to_retirement + years + 1
-            inflation_factor = (1 + inflation_rate) ** total_years
-            monthly_income_today = monthly_income / inflation_factor
-            monthly_income_today_value.append(monthly_income_today)
-            years += 1
-            capital_over_time.append(0)  # Capital drops to 0 after withdrawal
-            # Pad the income arrays with 0 to match capital_over_time length
-            withdrawals_over_time.append(0)
-            monthly_income_over_time.append(0)
-            monthly_income_today_value.append(0)
-            break
-
-        # Calculate the withdrawal at the start of the year (capped at 17.5%)
-        max_withdrawal = current_capital * max_drawdown_rate
-        withdrawal = min(annual_income, max_withdrawal)
-        if years == 0:  # Store the first withdrawal
-            first_withdrawal = withdrawal
-        
-        # Deduct the full annual withdrawal upfront
-        current_capital -= withdrawal
-        # Apply assumed return to the remaining capital at the end of the year
-        current_capital = current_capital * (1 + assumed_return)
-        years += 1
-        capital_over_time.append(max(0, current_capital))
-        withdrawals_over_time.append(withdrawal)
-        # Calculate monthly income
-        monthly_income = withdrawal / 12
-        monthly_income_over_time.append(monthly_income)
-        # Adjust monthly income to today's value
-        total_years = years_to_retirement + years
-        inflation_factor = (1 + inflation_rate) ** total_years
-        monthly_income_today = monthly_income / inflation_factor
-        monthly_income_today_value.append(monthly_income_today)
-
-    return years, first_withdrawal, capital_over_time, withdrawals_over_time, monthly_income_over_time, monthly_income_today_value
-
-def calculate_additional_savings_needed(shortfall, years_to_retirement, average_return):
-    """Calculate additional monthly savings needed to bridge the shortfall using annual compounding."""
-    if shortfall <= 0:
-        return 0
-    annual_rate = average_return
-    # Use annual compounding for simplicity
-    fv_factor = ((1 + annual_rate) ** years_to_retirement - 1) / annual_rate
-    annual_savings = shortfall / fv_factor
-    monthly_savings = annual_savings / 12
-    return monthly_savings
-
-def calculate_retirement_plan(monthly_income, inflation_rate, annual_increase, years_to_retirement, preserve_capital, preservation_years, assumed_return):
-    """Calculate the retirement plan details."""
-    annual_income = monthly_income * 12
-    # Future value of the annual income needed at retirement, adjusted for inflation and annual increase
-    future_annual_income = annual_income * (1 + inflation_rate) ** years_to_retirement * (1 + annual_increase) ** years_to_retirement
-    future_monthly_income = future_annual_income / 12
+h1 {
+    color: white;  /* Ensure title is white */
+}
+.stTextInput > div > div > input {
+    background-color: #555555;  /* Lighter grey for input fields */
+    color: white;  /* White text in inputs */
+}
+.stTextInput > div > div > input::placeholder {
+    color: #CCCCCC;  /* Light grey placeholder text */
+    opacity: 1;  /* Ensure placeholder is fully visible */
+}
+.stNumberInput > div > div > input {
+    background-color: #555555;  /* Lighter grey for number input fields */
+    color: white;  /* White text in inputs */
+}
+.stNumberInput > div > div > input::placeholder {
+    color: #CCCCCC;  /* Light grey placeholder text */
+    opacity: 1;  /* Ensure placeholder is fully visible */
+}
+.stButton > button {
+    background-color: #666666;  /* Medium grey for button */
+    color: white;  /* White text on button */
+    border: 1px solid #777777;  /* Slight border for visibility */
+}
+.stButton > button:hover {
+    background-color: #777777;  /* Slightly lighter grey on hover */
+    color: red;  /* Red text on hover */
+}
+.stFormSubmitButton > button {
+    background-color: #666666;  /* Medium grey for form submit button */
+    color: white;  /* White text on button */
+    border: 1px solid #777777;  /* Slight border for visibility */
+}
+.stFormSubmitButton > button:hover {
+    background-color: #777777;  /* Slightly lighter grey on hover */
+    color: red;  /* Red text on hover */
+}
+.stDownloadButton > button {
+    background-color: #666666;  /* Medium grey for download button */
+    color: white;  /* White text */
+    border: 1px solid #777777;
+}
+.stDownloadButton > button:hover {
+    background-color: #777777;  /* Slightly lighter grey on hover */
+    color: red;  /* Red text on hover */
+}
+.stAlert {
+    background-color: #333333;  /* Darker grey for success/info boxes */
+    color: white;  /* White text in alerts */
+}
+.stSelectbox > div > div > select {
+    background-color: #333333;  /* Darker grey for dropdown */
+    color: white;  /* White text in dropdown */
+}
+/* Style for labels */
+.stTextInput > label, .stNumberInput > label, .stSelectbox > label {
+    color: white;  /* White labels */
+}
+/* Style for descriptions (st.write text) */
+.stMarkdown, .stMarkdown p {
+    color: white;  /* White description text */
+}
+</style>
+"""
 
-    if preserve_capital:
-        # Step 1: For the preservation period, income is drawn from returns only
-        if assumed_return <= 0:
-            capital_at_retirement = float('inf')
-        else:
-            # Capital needed to generate the income during preservation
-            capital_at_retirement = future_annual_income / assumed_return
-            # Check if the withdrawal rate exceeds 17.5%
-            withdrawal_rate = future_annual_income / capital_at_retirement
-            max_drawdown_rate = 0.175
-            if withdrawal_rate > max_drawdown_rate:
-                capital_at_retirement = future_annual_income / max_drawdown_rate
-                withdrawal_rate = max_drawdown_rate
-        
-        # Step 2: After preservation, deplete the capital over remaining life expectancy (assume 20 years)
-        remaining_years = 20  # From age 75 to 95
-        income_after_preservation = future_annual_income * (1 + inflation_rate) ** preservation_years * (1 + annual_increase) ** preservation_years
-        # Present value of an annuity to deplete the capital over 20 years
-        if assumed_return > 0:
-            annuity_factor = (1 - (1 + assumed_return) ** (-remaining_years)) / assumed_return
-            capital_required = income_after_preservation * annuity_factor
-            # Discount back to retirement age
-            capital_required = capital_required / (1 + assumed_return) ** preservation_years
-            # Use the higher of the two capital amounts (preservation period or depletion period)
-            capital_required = max(capital_at_retirement, capital_required)
-        else:
-            capital_required = capital_at_retirement
+@st.cache_resource
+def minified_css():
+    """APP_CSS without comments and indentation, built once per process rather than once per rerun."""
+    css = re.sub(r"/\*.*?\*/", "", APP_CSS, flags=re.DOTALL)
+    return re.sub(r"\s*([{};:,>])\s*", r"\1", re.sub(r"\s+", " ", css)).strip()
 
-        years_until_depletion = None
-        withdrawal_at_retirement = min(future_annual_income, capital_required * max_drawdown_rate)
-    else:
-        capital_required = None
-        years_until_depletion, withdrawal_at_retirement = None, future_annual_income
-
-    return future_annual_income, future_monthly_income, capital_required, years_until_depletion, withdrawal_at_retirement
-
-# Estate Liquidity Tool Functions
-def calculate_estate_duty(net_value, has_surviving_spouse, spouse_bequest_value, pbo_bequest_value):
-    """Calculate estate duty based on net estate value and deductions."""
-    # Apply Section 4q deduction (spouse bequest) and Section 18A (PBO bequest)
-    dutiable_value = max(0, net_value - spouse_bequest_value - pbo_bequest_value)
-    # Apply R3.5 million abatement
-    dutiable_value = max(0, dutiable_value - ESTATE_DUTY_ABATEMENT)
-    
-    if dutiable_value <= 0:
-        return 0
-    if dutiable_value <= ESTATE_DUTY_THRESHOLD:
-        estate_duty = dutiable_value * ESTATE_DUTY_RATE_1
-    else:
-        estate_duty = (ESTATE_DUTY_THRESHOLD * ESTATE_DUTY_RATE_1) + ((dutiable_value - ESTATE_DUTY_THRESHOLD) * ESTATE_DUTY_RATE_2)
-    
-    if has_surviving_spouse:
-        # Note that estate duty is deferred until second spouse's death
-        return 0
-    return estate_duty
-
-def calculate_cgt(assets, marginal_tax_rate):
-    """Calculate Capital Gains Tax on assets at death."""
-    total_gain = 0
-    for asset in assets:
-        gain = max(0, asset["market_value"] - asset["base_cost"])
-        total_gain += gain
-    
-    # Apply R300,000 exclusion in year of death
-    taxable_gain = max(0, total_gain - CGT_EXCLUSION_DEATH)
-    # Apply inclusion rate
-    taxable_amount = taxable_gain * CGT_INCLUSION_RATE
-    # Apply marginal tax rate
-    cgt = taxable_amount * marginal_tax_rate
-    return cgt
-
-def calculate_executor_fees(gross_value):
-    """Calculate executor's fees based on gross estate value."""
-    base_fee = gross_value * EXECUTOR_FEE_RATE
-    total_fee = base_fee * (1 + VAT_RATE)  # Add 15% VAT
-    return total_fee
+@st.cache_resource
+def logo_bytes():
+    """The logo image, read once per process and shared by every session."""
+    return Path(__file__).with_name("logo.png").read_bytes()
+
+with phase("css"):
+    st.markdown(minified_css(), unsafe_allow_html=True)
+
+# Cache the pure calculators across Streamlit reruns (see calc_cache.py); profiled() times the cache misses
+cached_calculate_ra_rebate = cached(profiled(calculate_ra_rebate))
+cached_optimize_ra_contribution = cached(profiled(optimize_ra_contribution_batch))
+cached_calculate_salary_tax = cached(profiled(calculate_salary_tax))
+cached_calculate_budget = cached(profiled(calculate_budget))
+cached_project_budget = cached(profiled(project_budget))
+cached_calculate_retirement_plan = cached(profiled(calculate_retirement_plan))
+cached_calculate_years_until_depletion = cached(profiled(calculate_years_until_depletion))
+cached_run_retirement_monte_carlo = cached(profiled(run_retirement_monte_carlo))
+cached_calculate_additional_savings_needed = cached(profiled(calculate_additional_savings_needed))
+cached_solve_retirement_age = cached(profiled(solve_retirement_age))
+cached_sweep_retirement_plan = cached(profiled(sweep_retirement_plan))
+cached_calculate_estate_liquidity = cached(profiled(calculate_estate_liquidity))
 
 # Streamlit interface
 # Center the logo using columns
 col1, col2, col3 = st.columns([1, 2, 1])
-with col2:
-    st.image("logo.png", width=300)
+with col2, phase("logo"):
+    st.image(logo_bytes(), width=300)
 st.markdown("<br>", unsafe_allow_html=True)
 st.title("Navigate Wealth Financial Tools")
 # Add tagline
@@ -377,6 +152,192 @@ st.markdown("<p style='text-align: center; color: #CCCCCC;'>Powered by Navigate
 tool_options = ["Select a Tool", "Budget Tool", "RA Tax Rebate Calculator", "Retirement Calculator", "Salary Tax Calculator", "Estate Liquidity Tool"]
 selected_tool = st.selectbox("Choose a Financial Tool:", tool_options)
 
+def select_tax_year(key):
+    """Render a tax year dropdown defaulting to DEFAULT_TAX_YEAR and return the chosen year."""
+    years = sorted(TAX_TABLES)
+    return st.selectbox("Tax Year", years, index=years.index(DEFAULT_TAX_YEAR), format_func=lambda year: TAX_TABLES[year].label, key=key)
+
+def sweep_range(low_percent, high_percent, steps):
+    """Evenly spaced rates from low_percent to high_percent inclusive, as fractions."""
+    return [round((low_percent + (high_percent - low_percent) * i / (steps - 1)) / 100, 6) for i in range(steps)]
+
+def render_sweep_heatmap(data, value_column, scale):
+    """Heatmap of value_column over inflation and return, one panel per retirement age."""
+    # Fine sweeps have more cells than the chart has pixels, so only a thinned grid is sent
+    data = thin_grid(data, ("Inflation Rate (%)", "Assumed Return (%)"))
+    chart = alt.Chart(data).mark_rect().encode(
+        x=alt.X("Assumed Return (%):O", axis=alt.Axis(format=".1f")),
+        y=alt.Y("Inflation Rate (%):O", axis=alt.Axis(format=".1f"), sort="descending"),
+        color=alt.Color(f"{value_column}:Q", scale=scale),
+        tooltip=["Inflation Rate (%)", "Assumed Return (%)", "Retirement Age", alt.Tooltip(f"{value_column}:Q", format=",.0f")]
+    ).facet(column="Retirement Age:O")
+    with phase("charts"):
+        st.altair_chart(chart)
+
+def store_excel_export(tool_key, file_name, sheets, instructions):
+    """Remember a result's workbook layout; the workbook itself is built by render_excel_download."""
+    st.session_state[f"{tool_key}_excel_export"] = (file_name, sheets, instructions)
+
+def render_excel_download(tool_key):
+    """Offer the last stored result as Excel, building the workbook only once it is asked for."""
+    export = st.session_state.get(f"{tool_key}_excel_export")
+    if export is None:
+        return
+    file_name, sheets, instructions = export
+    if st.button("Prepare Excel Download", key=f"{tool_key}_prepare_excel"):
+        with phase("excel"):
+            data = workbook_bytes(sheets, instructions)
+        # Downloading releases the session's copy of the result; the workbook stays in WORKBOOK_CACHE for a while
+        st.download_button(
+            label="Download Summary as Excel",
+            data=data,
+            file_name=file_name,
+            mime=XLSX_MIME,
+            on_click=release_excel_export,
+            args=(tool_key,)
+        )
+
+def release_excel_export(tool_key):
+    """Forget a downloaded result's workbook layout and the DataFrames it holds."""
+    st.session_state.pop(f"{tool_key}_excel_export", None)
+
+RESULT_FILE_DIR = os.path.join(tempfile.gettempdir(), "navigate_wealth_results")
+RESULT_FILE_TTL = 3600
+
+def select_result_format(key):
+    """Render a dropdown of the bulk result file formats and return the chosen one."""
+    return st.selectbox("Results File Format", list(RESULT_FORMATS), format_func=lambda file_format: RESULT_FORMATS[file_format][0], key=key)
+
+def store_result_file(tool_key, file_name, file_format, write):
+    """Stream a bulk result into a temporary file with write(file) and remember it for render_result_file_download.
+
+    The file replaces the tool's previous one. Files left behind by sessions that ended
+    without downloading them are deleted once they are RESULT_FILE_TTL seconds old. Returns
+    what write returns.
+    """
+    release_result_file(tool_key)
+    os.makedirs(RESULT_FILE_DIR, exist_ok=True)
+    for entry in os.scandir(RESULT_FILE_DIR):
+        try:
+            if entry.stat().st_mtime < time.time() - RESULT_FILE_TTL:
+                os.remove(entry.path)
+        except OSError:  # Removed by another session first
+            pass
+    with tempfile.NamedTemporaryFile(prefix=f"{tool_key}_", suffix=f".{file_format}", dir=RESULT_FILE_DIR, delete=False) as file:
+        try:
+            result = write(file)
+        except BaseException:
+            file.close()
+            os.remove(file.name)
+            raise
+    st.session_state[f"{tool_key}_result_file"] = (file.name, f"{file_name}.{file_format}", file_format)
+    return result
+
+def render_result_file_download(tool_key):
+    """Offer the last bulk result file stored by store_result_file, reading it only once it is asked for.
+
+    st.download_button holds its data in memory, so the file is read on the rerun of the
+    Prepare click only, not on every page or sort click in the result view.
+    """
+    stored = st.session_state.get(f"{tool_key}_result_file")
+    if stored is None or not os.path.exists(stored[0]):
+        return
+    path, file_name, file_format = stored
+    label, mime = RESULT_FORMATS[file_format]
+    if not st.button(f"Prepare {label} Download", key=f"{tool_key}_prepare_results"):
+        return
+    with open(path, "rb") as file:
+        st.download_button(
+            label=f"Download Results as {label}", data=file, file_name=file_name, mime=mime, key=f"{tool_key}_download_results",
+            on_click=release_result_file, args=(tool_key,)
+        )
+
+def release_result_file(tool_key):
+    """Delete a bulk result file once it has been downloaded (or is replaced)."""
+    stored = st.session_state.pop(f"{tool_key}_result_file", None)
+    if stored is not None and os.path.exists(stored[0]):
+        os.remove(stored[0])
+
+def store_result_view(view_key, df):
+    """Remember a large result for render_result_view, or forget it when df is None."""
+    if df is None:
+        st.session_state.pop(f"{view_key}_result_view", None)
+    else:
+        st.session_state[f"{view_key}_result_view"] = df
+
+def render_result_view(view_key, title):
+    """Show the stored result one page at a time; sorting and slicing happen on the server."""
+    df = st.session_state.get(f"{view_key}_result_view")
+    if df is None:
+        return
+    st.write(f"**{title}** ({len(df):,} rows)")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        sort_column = st.selectbox("Sort By", ["Original Order", *df.columns], key=f"{view_key}_sort")
+    with col2:
+        ascending = st.selectbox("Order", ["Ascending", "Descending"], key=f"{view_key}_order") == "Ascending"
+    with col3:
+        page_size = st.selectbox("Rows per Page", PAGE_SIZES, key=f"{view_key}_page_size")
+    pages = page_count(len(df), page_size)
+    page_key = f"{view_key}_page"
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    with col4:
+        page = st.number_input("Page", min_value=1, max_value=pages, step=1, key=page_key, help=f"{pages:,} pages")
+    with phase("dataframes"):
+        rows = result_page(df, page - 1, page_size, None if sort_column == "Original Order" else sort_column, ascending)
+    st.dataframe(rows)
+
+def stored_monte_carlo(client, capital, annual_income, retirement_age, assumed_return, inflation_rate, settings):
+    """Load a Monte Carlo simulation run before from the result store, or run and store it.
+
+    The simulation is seeded, and for a fixed chunk size (part of the stored inputs) its result
+    doesn't depend on the worker count, so a stored result is the one a new run would produce.
+    """
+    def run():
+        return cached_run_retirement_monte_carlo(
+            capital, annual_income, retirement_age, assumed_return, settings["return_volatility"], inflation_rate,
+            settings["inflation_volatility"], num_paths=settings["num_paths"], life_expectancy=settings["life_expectancy"],
+            escalate_income=settings["escalate_income"], chunk_paths=CHUNK_PATHS, workers=settings["workers"], seed=0
+        )
+
+    store = default_result_store()
+    if store is None:
+        return run()
+    inputs = {
+        "capital": capital, "annual_income": annual_income, "retirement_age": retirement_age, "assumed_return": assumed_return,
+        "inflation_rate": inflation_rate, "seed": 0, "chunk_paths": CHUNK_PATHS,
+        **{key: value for key, value in settings.items() if key != "workers"}
+    }
+    # JSON turns the percentile keys into strings and the (age, fraction) pairs into lists
+    return store.get_or_compute("retirement_monte_carlo", inputs, run, client, decode=lambda outputs: (
+        outputs[0], {int(percentile): age for percentile, age in outputs[1].items()}, [tuple(pair) for pair in outputs[2]]
+    ))
+
+def save_result(tool, client, inputs, summary_data, tax_year=None):
+    """Record a calculation's inputs and summary row in the result store, if it is turned on."""
+    store = default_result_store()
+    if store is None:
+        return
+    try:
+        store.record(tool, client, inputs, {column: values[0] for column, values in summary_data.items() if column != "Client"}, tax_year)
+    except (sqlite3.Error, TypeError, ValueError) as e:
+        st.warning(f"This result could not be saved to the result store: {e}")
+
+def render_previous_results(tool, client):
+    """List the client's stored results for this tool, newest first."""
+    store = default_result_store()
+    if store is None or not client.strip():
+        return
+    history = store.history(client, tool)
+    if not history:
+        return
+    with st.expander(f"Previous Results for {client} ({len(history)})"):
+        st.dataframe(pd.DataFrame([
+            {"Calculated": pd.Timestamp(record["created_at"], unit="s").strftime("%Y-%m-%d %H:%M"), **record["outputs"]}
+            for record in history
+        ]))
+
 # Display the selected tool's interface
 if selected_tool == "Select a Tool":
     st.write("Please select a tool from the dropdown above to get started.")
@@ -389,31 +350,65 @@ elif selected_tool == "RA Tax Rebate Calculator":
     )
 
     # Input fields
+    tax_year = select_tax_year("ra_tax_year")
     name = st.text_input("Client's Name")
     income = st.number_input("Annual Pensionable Income (R)", min_value=0.0, step=1000.0)
     contribution = st.number_input("Annual RA Contribution (R)", min_value=0.0, step=1000.0)
+    carried_forward = st.number_input("Excess RA Contributions Carried Forward From Previous Years (R)", min_value=0.0, step=1000.0)
+    find_optimal = st.checkbox("Find the Optimal Contribution")
+    if find_optimal:
+        col1, col2 = st.columns(2)
+        with col1:
+            age = st.number_input("Client's Age", min_value=0, max_value=120, step=1, value=40, key="ra_age")
+        with col2:
+            num_dependants = st.number_input("Number of Dependants on Medical Scheme (including you)", min_value=0, max_value=10, step=1, key="ra_dependants")
 
     # Calculate button
     if st.button("Calculate Rebate"):
         if not name.strip():
             st.error("Please enter a name.")
-        elif income < 0 or contribution < 0:
-            st.error("Income and contribution must be non-negative.")
+        elif income < 0 or contribution < 0 or carried_forward < 0:
+            st.error("Income and contributions must be non-negative.")
         else:
             try:
-                deductible, tax_rate, rebate, excess = calculate_ra_rebate(income, contribution)
+                # Excess from previous years is deducted together with this year's contribution
+                deductible, tax_rate, rebate, excess = cached_calculate_ra_rebate(income, contribution + carried_forward, tax_year)
                 st.success("--- Tax Rebate Summary ---")
                 st.write(f"**Client**: {name}")
                 st.write(f"**Annual Pensionable Income**: R {income:,.2f}")
                 st.write(f"**RA Contribution**: R {contribution:,.2f}")
+                if carried_forward > 0:
+                    st.write(f"**Excess Carried Forward From Previous Years**: R {carried_forward:,.2f}")
                 st.write(f"**Deductible Contribution**: R {deductible:,.2f}")
                 if excess > 0:
                     st.write(f"**Excess Contribution (Carried Over)**: R {excess:,.2f}")
                 st.write(f"**Marginal Tax Rate**: {tax_rate * 100:.1f}%")
                 st.write(f"**Tax Rebate**: R {rebate:,.2f}")
+                optimal_df = None
+                if find_optimal:
+                    # Tax saved as PAYE falls, from the kinks of the saving curve (see calculators/ra_optimizer.py)
+                    optimal = cached_optimize_ra_contribution(income, age, num_dependants, 0.0, tax_year)
+                    total_contribution = contribution + carried_forward
+                    saving = (
+                        cached_calculate_salary_tax(income, 0.0, age, 0.0, num_dependants, tax_year)[5]
+                        - cached_calculate_salary_tax(income, total_contribution, age, 0.0, num_dependants, tax_year)[5]
+                    )
+                    st.write("**Optimal Contribution**")
+                    if optimal["rebate_per_rand"] > 0:
+                        st.write(f"- Every rand up to **R {optimal['optimal_contribution']:,.2f}** saves {optimal['rebate_per_rand'] * 100:.1f}% in PAYE, the most a rand can save (PAYE saved: R {optimal['optimal_rebate']:,.2f}).")
+                        if optimal["max_useful_contribution"] > optimal["optimal_contribution"]:
+                            st.write(f"- Contributions above that save less per rand, and above R {optimal['max_useful_contribution']:,.2f} nothing this year (PAYE saved: R {optimal['max_rebate']:,.2f}).")
+                        st.write(f"- This year's contribution including carried-forward excess (R {total_contribution:,.2f}) saves R {saving:,.2f} in PAYE.")
+                    else:
+                        st.write("- This client pays no PAYE, so an RA contribution saves no tax this year.")
+                    optimal_df = pd.DataFrame({
+                        "Contribution (R)": optimal["contribution_points"], "PAYE Saved (R)": optimal["rebate_points"]
+                    }).drop_duplicates("Contribution (R)")
+                    with phase("charts"):
+                        st.line_chart(optimal_df.set_index("Contribution (R)"))
                 # Tax rates note with smaller font
                 st.markdown(
-                    "<p style='font-size: 14px; color: #888888;'>Note: Tax rates are based on 2024/2025 SARS tables. Verify with 2025/2026 rates when available.</p>",
+                    f"<p style='font-size: 14px; color: #888888;'>Note: Tax rates are based on {TAX_TABLES[tax_year].label} SARS tables.</p>",
                     unsafe_allow_html=True
                 )
                 # Export to Excel
@@ -421,168 +416,227 @@ elif selected_tool == "RA Tax Rebate Calculator":
                     "Client": [name],
                     "Annual Pensionable Income (R)": [income],
                     "RA Contribution (R)": [contribution],
+                    "Excess Carried Forward From Previous Years (R)": [carried_forward],
                     "Deductible Contribution (R)": [deductible],
                     "Excess Contribution (Carried Over) (R)": [excess if excess > 0 else 0],
                     "Marginal Tax Rate (%)": [tax_rate * 100],
                     "Tax Rebate (R)": [rebate]
                 }
+                if find_optimal:
+                    summary_data["Optimal Contribution (R)"] = [optimal["optimal_contribution"]]
+                    summary_data["PAYE Saved per Rand at Optimal Contribution (%)"] = [optimal["rebate_per_rand"] * 100]
+                    summary_data["Contribution Above Which No PAYE Is Saved (R)"] = [optimal["max_useful_contribution"]]
+                ra_inputs = {"income": income, "contribution": contribution, "carried_forward": carried_forward}
+                if find_optimal:
+                    ra_inputs.update(age=age, num_dependants=num_dependants)
+                save_result("ra_rebate", name, ra_inputs, summary_data, tax_year)
                 df = pd.DataFrame(summary_data)
-                # Create a buffer to store the Excel file
-                buffer = io.BytesIO()
-                with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
-                    df.to_excel(writer, index=False, sheet_name="RA Tax Rebate Summary")
-                    # Add a note sheet for chart instructions
-                    instructions = pd.DataFrame({
-                        "Instructions": [
-                            "This Excel file contains your RA Tax Rebate Summary.",
-                            "There are no charts in this tool, but you can create your own in Excel.",
-                            "For example, select your data and use Insert > Chart to visualize your results."
-                        ]
-                    })
-                    instructions.to_excel(writer, index=False, sheet_name="Instructions")
-                buffer.seek(0)
-                st.download_button(
-                    label="Download Summary as Excel",
-                    data=buffer,
-                    file_name="ra_tax_rebate_summary.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
+                sheets = [("RA Tax Rebate Summary", df, 0)]
+                if optimal_df is not None:
+                    sheets.append(("Optimal Contribution", optimal_df, 0))
+                store_excel_export("ra", "ra_tax_rebate_summary.xlsx", sheets, [
+                    "This Excel file contains your RA Tax Rebate Summary.",
+                    "There are no charts in this tool, but you can create your own in Excel.",
+                    "For example, select your data and use Insert > Chart to visualize your results.",
+                    "If you looked for the optimal contribution, the 'Optimal Contribution' sheet lists the PAYE saved at each contribution where the saving per rand changes; it is a straight line between them."
+                ])
             except Exception as e:
                 st.error(f"Error: {e}")
+    render_previous_results("ra_rebate", name)
+    render_excel_download("ra")
 elif selected_tool == "Salary Tax Calculator":
-    st.write("Enter client details to calculate their salary tax, UIF, medical tax credits, and net income.")
-    # Input fields
-    name = st.text_input("Client's Name", key="tax_calc_name")
-    gross_salary = st.number_input("Gross Annual Salary (R)", min_value=0.0, step=1000.0)
-    pension_contribution = st.number_input("Annual Pension/RA Contribution (R)", min_value=0.0, step=1000.0)
-    medical_contributions = st.number_input("Annual Medical Scheme Contributions (R)", min_value=0.0, step=1000.0)
-    num_dependants = st.number_input("Number of Dependants on Medical Scheme (including you)", min_value=0, max_value=10, step=1)
-    age = st.number_input("Client's Age", min_value=0, max_value=120, step=1)
+    salary_mode = st.radio("Mode", ["Single Client", "Bulk Upload"], horizontal=True, key="tax_calc_mode")
+    tax_year = select_tax_year("tax_calc_year")
+    if salary_mode == "Bulk Upload":
+        st.write("Upload a CSV or Excel (.xlsx) file with one client per row to calculate salary tax for all of them at once.")
+        st.markdown(
+            "<p style='font-size: 14px; font-style: italic; color: #CCCCCC;'>Required columns: Gross Salary, Pension Contribution, Age, Num Dependants (annual amounts in rands). Any other columns, such as Name, are copied through to the results.</p>",
+            unsafe_allow_html=True
+        )
+        uploaded_file = st.file_uploader("Client File", type=["csv", "xlsx"], key="tax_calc_upload")
+        result_format = select_result_format("tax_calc_result_format")
+        if uploaded_file is not None and st.button("Calculate Tax for All Clients"):
+            progress_bar = st.progress(0.0)
+            chunk_status = st.empty()
+            processed = {"rows": 0}
+
+            def show_chunk_progress(rows, seconds, fraction_done):
+                processed["rows"] += rows
+                progress_bar.progress(fraction_done)
+                chunk_status.write(f"Processed {processed['rows']:,} clients (last chunk: {rows:,} rows at {rows / max(seconds, 1e-9):,.0f} rows/s)")
 
-    # Calculate button
-    if st.button("Calculate Tax"):
-        if not name.strip():
-            st.error("Please enter a name.")
-        elif gross_salary < 0 or pension_contribution < 0 or medical_contributions < 0 or num_dependants < 0 or age < 0:
-            st.error("All inputs must be non-negative.")
-        else:
             try:
-                taxable_income, paye_before_mtc, paye_before_mtc_monthly, mtc_annual, mtc_monthly, paye, paye_monthly, uif, uif_monthly, net_income, net_income_monthly, marginal_rate = calculate_salary_tax(gross_salary, pension_contribution, age, medical_contributions, num_dependants)
-                st.success("--- Salary Tax Summary ---")
-                st.write(f"**Client**: {name}")
-                st.write(f"**Gross Annual Salary**: R {gross_salary:,.2f}")
-                st.write(f"**Taxable Income**: R {taxable_income:,.2f}")
-                st.write(f"**PAYE (Before Medical Tax Credits, Annual)**: R {paye_before_mtc:,.2f}")
-                st.write(f"**PAYE (Before Medical Tax Credits, Monthly)**: R {paye_before_mtc_monthly:,.2f}")
-                summary_data = {
-                    "Client": [name],
-                    "Gross Annual Salary (R)": [gross_salary],
-                    "Taxable Income (R)": [taxable_income],
-                    "PAYE Before Medical Tax Credits (Annual) (R)": [paye_before_mtc],
-                    "PAYE Before Medical Tax Credits (Monthly) (R)": [paye_before_mtc_monthly]
-                }
-                if num_dependants > 0:
-                    st.write(f"**Medical Tax Credits (Annual)**: R {mtc_annual:,.2f}")
-                    st.write(f"**Medical Tax Credits (Monthly)**: R {mtc_monthly:,.2f}")
-                    # Visual: Progress bar for tax savings
-                    tax_savings_percentage = min((mtc_annual / paye_before_mtc) * 100 if paye_before_mtc > 0 else 0, 100)
-                    st.write(f"**Tax Savings from Medical Credits**: {tax_savings_percentage:.1f}% of your PAYE")
-                    st.progress(tax_savings_percentage / 100)
-                    # Note about dependent credits
+                # Calculation and file writing are interleaved per chunk, so they share one phase
+                with phase("bulk_salary_tax"):
+                    total_rows = store_result_file("salary_bulk", "salary_tax_results", result_format, lambda file: write_salary_tax_results(
+                        read_client_chunks(uploaded_file, uploaded_file.name), file, result_format, on_chunk=show_chunk_progress, tax_year=tax_year
+                    ))
+                progress_bar.progress(1.0)
+                st.success(f"--- Salary Tax calculated for {total_rows:,} clients ---")
+            except Exception as e:
+                st.error(f"Error: {e}")
+        render_result_file_download("salary_bulk")
+    else:
+        st.write("Enter client details to calculate their salary tax, UIF, medical tax credits, and net income.")
+        # Input fields
+        name = st.text_input("Client's Name", key="tax_calc_name")
+        gross_salary = st.number_input("Gross Annual Salary (R)", min_value=0.0, step=1000.0)
+        pension_contribution = st.number_input("Annual Pension/RA Contribution (R)", min_value=0.0, step=1000.0)
+        medical_contributions = st.number_input("Annual Medical Scheme Contributions (R)", min_value=0.0, step=1000.0)
+        num_dependants = st.number_input("Number of Dependants on Medical Scheme (including you)", min_value=0, max_value=10, step=1)
+        age = st.number_input("Client's Age", min_value=0, max_value=120, step=1)
+
+        # Calculate button
+        if st.button("Calculate Tax"):
+            if not name.strip():
+                st.error("Please enter a name.")
+            elif gross_salary < 0 or pension_contribution < 0 or medical_contributions < 0 or num_dependants < 0 or age < 0:
+                st.error("All inputs must be non-negative.")
+            else:
+                try:
+                    taxable_income, paye_before_mtc, paye_before_mtc_monthly, mtc_annual, mtc_monthly, paye, paye_monthly, uif, uif_monthly, net_income, net_income_monthly, marginal_rate = cached_calculate_salary_tax(gross_salary, pension_contribution, age, medical_contributions, num_dependants, tax_year)
+                    st.success("--- Salary Tax Summary ---")
+                    st.write(f"**Client**: {name}")
+                    st.write(f"**Gross Annual Salary**: R {gross_salary:,.2f}")
+                    st.write(f"**Taxable Income**: R {taxable_income:,.2f}")
+                    st.write(f"**PAYE (Before Medical Tax Credits, Annual)**: R {paye_before_mtc:,.2f}")
+                    st.write(f"**PAYE (Before Medical Tax Credits, Monthly)**: R {paye_before_mtc_monthly:,.2f}")
+                    summary_data = {
+                        "Client": [name],
+                        "Gross Annual Salary (R)": [gross_salary],
+                        "Taxable Income (R)": [taxable_income],
+                        "PAYE Before Medical Tax Credits (Annual) (R)": [paye_before_mtc],
+                        "PAYE Before Medical Tax Credits (Monthly) (R)": [paye_before_mtc_monthly]
+                    }
+                    if num_dependants > 0:
+                        st.write(f"**Medical Tax Credits (Annual)**: R {mtc_annual:,.2f}")
+                        st.write(f"**Medical Tax Credits (Monthly)**: R {mtc_monthly:,.2f}")
+                        # Visual: Progress bar for tax savings
+                        tax_savings_percentage = min((mtc_annual / paye_before_mtc) * 100 if paye_before_mtc > 0 else 0, 100)
+                        st.write(f"**Tax Savings from Medical Credits**: {tax_savings_percentage:.1f}% of your PAYE")
+                        st.progress(tax_savings_percentage / 100)
+                        # Note about dependent credits
+                        st.markdown(
+                            "<p style='font-size: 14px; font-style: italic; color: #CCCCCC;'>Dependent Credits: R364/month for you and your first dependant, R246/month for each additional dependant (e.g., spouse, children, or other family members on your medical scheme).</p>",
+                            unsafe_allow_html=True
+                        )
+                        summary_data["Medical Tax Credits (Annual) (R)"] = [mtc_annual]
+                        summary_data["Medical Tax Credits (Monthly) (R)"] = [mtc_monthly]
+                        summary_data["Tax Savings from Medical Credits (%)"] = [tax_savings_percentage]
+                    st.write(f"**PAYE (After Medical Tax Credits, Annual)**: R {paye:,.2f}")
+                    st.write(f"**PAYE (After Medical Tax Credits, Monthly)**: R {paye_monthly:,.2f}")
+                    st.write(f"**UIF Contribution (Employee, Annual)**: R {uif:,.2f}")
+                    st.write(f"**UIF Contribution (Employee, Monthly)**: R {uif_monthly:,.2f}")
+                    st.write(f"**Net Annual Income**: R {net_income:,.2f}")
+                    st.write(f"**Net Monthly Income**: R {net_income_monthly:,.2f}")
+                    st.write(f"**Marginal Tax Rate**: {marginal_rate * 100:.1f}%")
+                    # Add to summary data
+                    summary_data["PAYE After Medical Tax Credits (Annual) (R)"] = [paye]
+                    summary_data["PAYE After Medical Tax Credits (Monthly) (R)"] = [paye_monthly]
+                    summary_data["UIF Contribution (Employee, Annual) (R)"] = [uif]
+                    summary_data["UIF Contribution (Employee, Monthly) (R)"] = [uif_monthly]
+                    summary_data["Net Annual Income (R)"] = [net_income]
+                    summary_data["Net Monthly Income (R)"] = [net_income_monthly]
+                    summary_data["Marginal Tax Rate (%)"] = [marginal_rate * 100]
+                    # Visual: Bar chart for tax breakdown
+                    st.write("**Tax Breakdown Visualization**")
+                    chart_data = pd.DataFrame({
+                        "Category": ["Gross Income", "PAYE", "UIF", "Medical Tax Credits", "Net Income"],
+                        "Amount (R)": [gross_salary, -paye, -uif, -mtc_annual if num_dependants > 0 else 0, net_income]
+                    })
+                    with phase("charts"):
+                        st.bar_chart(chart_data.set_index("Category"))
+                    # Tax rates note with smaller font
                     st.markdown(
-                        "<p style='font-size: 14px; font-style: italic; color: #CCCCCC;'>Dependent Credits: R364/month for you and your first dependant, R246/month for each additional dependant (e.g., spouse, children, or other family members on your medical scheme).</p>",
+                        f"<p style='font-size: 14px; color: #888888;'>Note: Tax rates, UIF limits, and medical tax credits are based on {TAX_TABLES[tax_year].label} SARS tables.</p>",
                         unsafe_allow_html=True
                     )
-                    summary_data["Medical Tax Credits (Annual) (R)"] = [mtc_annual]
-                    summary_data["Medical Tax Credits (Monthly) (R)"] = [mtc_monthly]
-                    summary_data["Tax Savings from Medical Credits (%)"] = [tax_savings_percentage]
-                st.write(f"**PAYE (After Medical Tax Credits, Annual)**: R {paye:,.2f}")
-                st.write(f"**PAYE (After Medical Tax Credits, Monthly)**: R {paye_monthly:,.2f}")
-                st.write(f"**UIF Contribution (Employee, Annual)**: R {uif:,.2f}")
-                st.write(f"**UIF Contribution (Employee, Monthly)**: R {uif_monthly:,.2f}")
-                st.write(f"**Net Annual Income**: R {net_income:,.2f}")
-                st.write(f"**Net Monthly Income**: R {net_income_monthly:,.2f}")
-                st.write(f"**Marginal Tax Rate**: {marginal_rate * 100:.1f}%")
-                # Add to summary data
-                summary_data["PAYE After Medical Tax Credits (Annual) (R)"] = [paye]
-                summary_data["PAYE After Medical Tax Credits (Monthly) (R)"] = [paye_monthly]
-                summary_data["UIF Contribution (Employee, Annual) (R)"] = [uif]
-                summary_data["UIF Contribution (Employee, Monthly) (R)"] = [uif_monthly]
-                summary_data["Net Annual Income (R)"] = [net_income]
-                summary_data["Net Monthly Income (R)"] = [net_income_monthly]
-                summary_data["Marginal Tax Rate (%)"] = [marginal_rate * 100]
-                # Visual: Bar chart for tax breakdown
-                st.write("**Tax Breakdown Visualization**")
-                chart_data = pd.DataFrame({
-                    "Category": ["Gross Income", "PAYE", "UIF", "Medical Tax Credits", "Net Income"],
-                    "Amount (R)": [gross_salary, -paye, -uif, -mtc_annual if num_dependants > 0 else 0, net_income]
-                })
-                st.bar_chart(chart_data.set_index("Category"))
-                # Tax rates note with smaller font
-                st.markdown(
-                    "<p style='font-size: 14px; color: #888888;'>Note: Tax rates, UIF limits, and medical tax credits are based on 2024/2025 SARS tables. Verify with 2025/2026 rates when available.</p>",
-                    unsafe_allow_html=True
-                )
-                # Export to Excel
-                summary_df = pd.DataFrame(summary_data)
-                chart_df = pd.DataFrame(chart_data).reset_index()
-                buffer = io.BytesIO()
-                with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
-                    summary_df.to_excel(writer, index=False, sheet_name="Salary Tax Summary")
-                    chart_df.to_excel(writer, index=False, sheet_name="Chart Data", startrow=0)
-                    # Add a note sheet for chart instructions
-                    instructions = pd.DataFrame({
-                        "Instructions": [
-                            "This Excel file contains your Salary Tax Summary and Chart Data.",
-                            "To recreate the bar chart in Excel:",
-                            "1. Go to the 'Chart Data' sheet.",
-                            "2. Select the 'Category' and 'Amount (R)' columns.",
-                            "3. Click Insert > Bar Chart in Excel to visualize the tax breakdown.",
-                            "Note: The progress bar (Tax Savings %) cannot be exported as it is a dynamic widget."
-                        ]
-                    })
-                    instructions.to_excel(writer, index=False, sheet_name="Instructions")
-                buffer.seek(0)
-                st.download_button(
-                    label="Download Summary as Excel",
-                    data=buffer,
-                    file_name="salary_tax_summary.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
-            except Exception as e:
-                st.error(f"Error: {e}")
+                    # Export to Excel
+                    save_result("salary_tax", name, {
+                        "gross_salary": gross_salary, "pension_contribution": pension_contribution, "age": age,
+                        "medical_contributions": medical_contributions, "num_dependants": num_dependants
+                    }, summary_data, tax_year)
+                    summary_df = pd.DataFrame(summary_data)
+                    chart_df = pd.DataFrame(chart_data).reset_index()
+                    store_excel_export("salary", "salary_tax_summary.xlsx", [
+                        ("Salary Tax Summary", summary_df, 0),
+                        ("Chart Data", chart_df, 0)
+                    ], [
+                        "This Excel file contains your Salary Tax Summary and Chart Data.",
+                        "To recreate the bar chart in Excel:",
+                        "1. Go to the 'Chart Data' sheet.",
+                        "2. Select the 'Category' and 'Amount (R)' columns.",
+                        "3. Click Insert > Bar Chart in Excel to visualize the tax breakdown.",
+                        "Note: The progress bar (Tax Savings %) cannot be exported as it is a dynamic widget."
+                    ])
+                except Exception as e:
+                    st.error(f"Error: {e}")
+        render_previous_results("salary_tax", name)
+        render_excel_download("salary")
 elif selected_tool == "Budget Tool":
     st.write("Enter your monthly income and expenses to create a budget and see your savings potential.")
     # Input fields
     monthly_income = st.number_input("Monthly Income (R)", min_value=0.0, step=1000.0, value=39500.0)  # Default to ~R39,494 from previous example
+    project_cash_flow = st.checkbox("Project Cash Flow Over Time")
+    if project_cash_flow:
+        col1, col2 = st.columns(2)
+        with col1:
+            projection_months = st.slider("Projection Period (Months)", min_value=MIN_PROJECTION_MONTHS, max_value=MAX_PROJECTION_MONTHS, value=120, step=12)
+            income_escalation = st.number_input("Annual Income Increase (%)", min_value=0.0, max_value=20.0, value=5.0, step=0.5) / 100
+        with col2:
+            opening_savings = st.number_input("Current Savings (R)", min_value=0.0, step=1000.0)
+            savings_return = st.number_input("Return on Savings (% per year)", min_value=0.0, max_value=20.0, value=6.0, step=0.5) / 100
 
-    # Dynamic expense inputs using a form
-    st.write("**Add Your Monthly Expenses**")
+    # One editable table for all expense categories, so hundreds of rows are one widget
+    st.write("**Add Your Expenses**")
     with st.form(key="expense_form"):
-        num_expenses = st.number_input("Number of Expense Categories", min_value=1, max_value=10, step=1, value=3)
-        expenses = []
-        for i in range(num_expenses):
-            col1, col2 = st.columns(2)
-            with col1:
-                category = st.text_input(f"Expense Category {i+1}", value=f"Category {i+1}", key=f"category_{i}")
-            with col2:
-                amount = st.number_input(f"Amount (R)", min_value=0.0, step=100.0, key=f"amount_{i}")
-            expenses.append((category, amount))
+        expense_table = st.data_editor(
+            pd.DataFrame({
+                "Category": [f"Category {i + 1}" for i in range(3)],
+                "Amount (R)": [0.0] * 3,
+                "Frequency": ["Monthly"] * 3,
+                "First Month": [1] * 3,
+                "Annual Inflation (%)": [6.0] * 3,
+            }),
+            num_rows="dynamic",
+            use_container_width=True,
+            key="expense_table",
+            column_config={
+                "Category": st.column_config.TextColumn(required=True),
+                "Amount (R)": st.column_config.NumberColumn(min_value=0.0, step=100.0, format="%.2f", required=True),
+                "Frequency": st.column_config.SelectboxColumn(options=list(EXPENSE_FREQUENCIES), required=True),
+                "First Month": st.column_config.NumberColumn(min_value=1, max_value=MAX_PROJECTION_MONTHS, step=1, help="Month of the first payment (1 is this month)"),
+                "Annual Inflation (%)": st.column_config.NumberColumn(min_value=0.0, max_value=50.0, step=0.5, help="Used by the cash flow projection"),
+            },
+        )
         submit_button = st.form_submit_button("Calculate Budget")
 
     if submit_button:
+        expense_table = expense_table.dropna(subset=["Category", "Amount (R)"]).fillna({"Frequency": "Monthly", "First Month": 1, "Annual Inflation (%)": 0.0})
+        # The monthly budget covers the expenses paid every month; the projection covers all of them
+        expenses = [
+            (category, amount)
+            for category, amount, frequency in zip(expense_table["Category"], expense_table["Amount (R)"], expense_table["Frequency"])
+            if frequency == "Monthly"
+        ]
         if monthly_income < 0:
             st.error("Monthly income must be non-negative.")
+        elif expense_table.empty:
+            st.error("Please add at least one expense.")
         else:
             try:
-                total_expenses, remaining_budget, savings_potential = calculate_budget(monthly_income, expenses)
+                total_expenses, remaining_budget, savings_potential = cached_calculate_budget(monthly_income, expenses)
                 st.success("--- Budget Summary ---")
                 st.write(f"**Monthly Income**: R {monthly_income:,.2f}")
-                st.write("**Expenses Breakdown**:")
+                st.write("**Monthly Expenses Breakdown**:")
                 expenses_data = []
                 for category, amount in expenses:
-                    st.write(f"- {category}: R {amount:,.2f}")
                     expenses_data.append({"Category": category, "Amount (R)": amount})
+                # Long expense lists are listed only in the Excel export
+                for category, amount in expenses[:MAX_BAR_CATEGORIES]:
+                    st.write(f"- {category}: R {amount:,.2f}")
+                if len(expenses) > MAX_BAR_CATEGORIES:
+                    st.write(f"- ... and {len(expenses) - MAX_BAR_CATEGORIES:,} more categories")
                 st.write(f"**Total Monthly Expenses**: R {total_expenses:,.2f}")
                 st.write(f"**Remaining Budget**: R {remaining_budget:,.2f}")
                 summary_data = {
@@ -601,36 +655,69 @@ elif selected_tool == "Budget Tool":
                     "Category": [category for category, amount in expenses] + ["Remaining Budget"],
                     "Amount (R)": [amount for category, amount in expenses] + [max(0, remaining_budget)]
                 })
-                st.bar_chart(chart_data.set_index("Category"))
+                with phase("charts"):
+                    st.bar_chart(top_categories(chart_data, "Category", "Amount (R)", keep=("Remaining Budget",)).set_index("Category"))
+
+                projection_df = None
+                if project_cash_flow:
+                    # Every category over every month in one vectorized pass
+                    projection = cached_project_budget(
+                        monthly_income, expense_table["Amount (R)"].tolist(), projection_months,
+                        (expense_table["Annual Inflation (%)"] / 100).tolist(), income_escalation,
+                        [EXPENSE_FREQUENCIES[frequency] for frequency in expense_table["Frequency"]],
+                        (expense_table["First Month"].astype(int) - 1).tolist(), opening_savings, savings_return
+                    )
+                    with phase("dataframes"):
+                        projection_df = pd.DataFrame({
+                            "Month": range(1, projection_months + 1),
+                            "Income (R)": projection["income"],
+                            "Expenses (R)": projection["expenses"],
+                            "Net Cash Flow (R)": projection["net_cash_flow"],
+                            "Savings Balance (R)": projection["savings_balance"],
+                        })
+                    final_balance = projection["savings_balance"][-1]
+                    st.write(f"**Savings Balance After {projection_months} Months**: R {final_balance:,.2f}")
+                    deficit_months = projection["net_cash_flow"] < 0
+                    if deficit_months.any():
+                        st.warning(f"Expenses exceed income in {deficit_months.sum():,} of the {projection_months} months, first in month {deficit_months.argmax() + 1}.")
+                    if (projection["savings_balance"] < 0).any():
+                        st.warning(f"Savings run out in month {(projection['savings_balance'] < 0).argmax() + 1}.")
+                    st.write("**Cash Flow Projection**")
+                    with phase("charts"):
+                        st.line_chart(downsample_line(projection_df, "Month").set_index("Month")[["Income (R)", "Expenses (R)", "Savings Balance (R)"]])
+                    summary_data["Projection Period (Months)"] = [projection_months]
+                    summary_data["Savings Balance at End of Projection (R)"] = [final_balance]
+                store_result_view("budget_projection", projection_df)
+                budget_inputs = {"monthly_income": monthly_income, "expenses": expense_table.to_dict("records")}
+                if projection_df is not None:
+                    budget_inputs.update(
+                        months=projection_months, income_escalation=income_escalation, opening_savings=opening_savings, savings_return=savings_return
+                    )
+                save_result("budget", "", budget_inputs, summary_data)
                 # Export to Excel
                 summary_df = pd.DataFrame(summary_data)
                 expenses_df = pd.DataFrame(expenses_data)
                 chart_df = pd.DataFrame(chart_data).reset_index()
-                buffer = io.BytesIO()
-                with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
-                    summary_df.to_excel(writer, index=False, sheet_name="Budget Summary")
-                    expenses_df.to_excel(writer, startrow=len(summary_df) + 2, index=False, sheet_name="Budget Summary")
-                    chart_df.to_excel(writer, index=False, sheet_name="Chart Data", startrow=0)
-                    # Add a note sheet for chart instructions
-                    instructions = pd.DataFrame({
-                        "Instructions": [
-                            "This Excel file contains your Budget Summary and Chart Data.",
-                            "To recreate the bar chart in Excel:",
-                            "1. Go to the 'Chart Data' sheet.",
-                            "2. Select the 'Category' and 'Amount (R)' columns.",
-                            "3. Click Insert > Bar Chart in Excel to visualize the budget breakdown."
-                        ]
-                    })
-                    instructions.to_excel(writer, index=False, sheet_name="Instructions")
-                buffer.seek(0)
-                st.download_button(
-                    label="Download Summary as Excel",
-                    data=buffer,
-                    file_name="budget_summary.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
+                sheets = [
+                    ("Budget Summary", summary_df, 0),
+                    ("Budget Summary", expenses_df, len(summary_df) + 2),
+                    ("Chart Data", chart_df, 0)
+                ]
+                if projection_df is not None:
+                    sheets.append(("Expenses", expense_table, 0))
+                    sheets.append(("Cash Flow Projection", projection_df, 0))
+                store_excel_export("budget", "budget_summary.xlsx", sheets, [
+                    "This Excel file contains your Budget Summary and Chart Data.",
+                    "To recreate the bar chart in Excel:",
+                    "1. Go to the 'Chart Data' sheet.",
+                    "2. Select the 'Category' and 'Amount (R)' columns.",
+                    "3. Click Insert > Bar Chart in Excel to visualize the budget breakdown.",
+                    "If you projected your cash flow, the 'Cash Flow Projection' sheet lists the income, expenses and savings balance for every month, and the 'Expenses' sheet the expenses it was based on."
+                ])
             except Exception as e:
                 st.error(f"Error: {e}")
+    render_result_view("budget_projection", "Monthly Cash Flow")
+    render_excel_download("budget")
 elif selected_tool == "Retirement Calculator":
     st.write("Enter client details to calculate the capital needed for retirement.")
     # Input fields
@@ -645,6 +732,36 @@ elif selected_tool == "Retirement Calculator":
     preservation_years = 0
     if preserve_capital:
         preservation_years = st.selectbox("Preservation Period (Years)", [10, 15, 20, 25])
+    run_monte_carlo = False
+    if not preserve_capital:
+        run_monte_carlo = st.checkbox("Run Monte Carlo Simulation (Stochastic Returns and Inflation)")
+    if run_monte_carlo:
+        col1, col2 = st.columns(2)
+        with col1:
+            return_volatility = st.number_input("Return Volatility (% per year)", min_value=0.0, max_value=50.0, value=12.0, step=0.5) / 100
+            num_paths = st.selectbox("Number of Simulations", [10000, 25000, 50000, 100000])
+            escalate_income = st.checkbox("Increase Income with Inflation Each Year", value=True)
+        with col2:
+            inflation_volatility = st.number_input("Inflation Volatility (% per year)", min_value=0.0, max_value=20.0, value=2.0, step=0.5) / 100
+            life_expectancy = st.number_input("Plan Income Until Age", min_value=70, max_value=120, value=95, step=1)
+            use_all_cores = st.checkbox("Use All CPU Cores", value=False)
+    run_sweep = st.checkbox("Run Scenario Sweep (Every Combination of Inflation, Return, Retirement Age and Preservation Period)")
+    if run_sweep:
+        col1, col2 = st.columns(2)
+        with col1:
+            sweep_inflation = st.slider("Inflation Rate Range (%)", min_value=0.0, max_value=20.0, value=(3.0, 9.0), step=0.5)
+            sweep_inflation_steps = st.number_input("Inflation Rate Steps", min_value=2, max_value=301, value=25, step=1)
+            sweep_ages = st.multiselect("Retirement Ages", list(range(50, 76)), default=[55, 60, 65])
+        with col2:
+            sweep_return = st.slider("Assumed Return Range (%)", min_value=0.0, max_value=20.0, value=(4.0, 12.0), step=0.5)
+            sweep_return_steps = st.number_input("Assumed Return Steps", min_value=2, max_value=301, value=25, step=1)
+            sweep_periods = st.multiselect("Preservation Periods (Years)", [10, 15, 20, 25], default=[10, 15, 20, 25])
+        sweep_points = sweep_inflation_steps * sweep_return_steps * len(sweep_ages) * len(sweep_periods)
+        st.markdown(
+            f"<p style='font-size: 14px; font-style: italic; color: #CCCCCC;'>{sweep_points:,} scenarios. The shortfall heatmap shows the preserve-capital shortfall for the chosen preservation period; the depletion heatmap shows the age the provisions run out without preserving capital.</p>",
+            unsafe_allow_html=True
+        )
+        heatmap_period = st.selectbox("Heatmap Preservation Period (Years)", sweep_periods) if sweep_periods else None
 
     # Dynamic provision inputs
     st.write("**Add Your Current Provisions**")
@@ -683,26 +800,35 @@ elif selected_tool == "Retirement Calculator":
         elif desired_monthly_income <= 0 or current_age < 18 or current_age >= retirement_age:
             st.error("Please ensure desired income is positive and current age is valid (18 or older, less than retirement age).")
         else:
+            # Each step is a node of this session's calculation graph, so a rerun only recomputes
+            # the steps downstream of inputs that changed
+            graph = CalculationGraph(st.session_state.setdefault("retirement_graph", {}))
             try:
                 years_to_retirement = retirement_age - current_age
+                for input_name, value in (
+                    ("desired_monthly_income", desired_monthly_income), ("desired_annual_increase", desired_annual_increase),
+                    ("current_age", current_age), ("retirement_age", retirement_age), ("years_to_retirement", years_to_retirement),
+                    ("inflation_rate", inflation_rate), ("assumed_return", assumed_return),
+                    ("preserve_capital", preserve_capital), ("preservation_years", preservation_years)
+                ):
+                    graph.input(input_name, value)
                 # Step 1: Calculate future income needed
-                future_annual_income, future_monthly_income, capital_required, years_until_depletion, withdrawal_at_retirement = calculate_retirement_plan(
-                    desired_monthly_income, inflation_rate, desired_annual_increase, years_to_retirement, preserve_capital, preservation_years, assumed_return
+                future_annual_income, future_monthly_income, capital_required, years_until_depletion, withdrawal_at_retirement = graph.node(
+                    "retirement_plan", cached_calculate_retirement_plan, "desired_monthly_income", "inflation_rate", "desired_annual_increase",
+                    "years_to_retirement", "preserve_capital", "preservation_years", "assumed_return"
+                )
+                # Step 2: Calculate future value of current provisions, one node per provision
+                provision_names = [f"provision_{i}" for i in range(len(provisions))]
+                future_values = []
+                for provision_name, provision in zip(provision_names, provisions):
+                    graph.input(provision_name, {key: value for key, value in provision.items() if key != "type"})
+                    future_values.append(graph.node(f"future_value_{provision_name}", project_provision, provision_name, "years_to_retirement"))
+                total_provision_value, average_return = graph.node(
+                    "provision_totals", lambda years, *values: combine_provisions(values[:len(provisions)], values[len(provisions):], years),
+                    "years_to_retirement", *provision_names, *(f"future_value_{provision_name}" for provision_name in provision_names)
                 )
-                # Step 2: Calculate future value of current provisions
-                total_provision_value = 0
                 provisions_data = []
-                average_return = 0
-                total_weight = 0
-                for provision in provisions:
-                    fv = calculate_future_value(
-                        provision["current_value"],
-                        provision["annual_return"],
-                        years_to_retirement,
-                        provision["monthly_contribution"],
-                        provision["contribution_increase"]
-                    )
-                    total_provision_value += fv
+                for provision, fv in zip(provisions, future_values):
                     provisions_data.append({
                         "Type": provision["type"],
                         "Current Value (R)": provision["current_value"],
@@ -711,12 +837,6 @@ elif selected_tool == "Retirement Calculator":
                         "Annual Contribution Increase (%)": provision["contribution_increase"] * 100,
                         "Future Value at Retirement (R)": fv
                     })
-                    # Weighted average return for additional savings calculation
-                    weight = provision["current_value"] + (provision["monthly_contribution"] * 12 * years_to_retirement)
-                    average_return += provision["annual_return"] * weight
-                    total_weight += weight
-                if total_weight > 0:
-                    average_return /= total_weight
 
                 # Step 3: Calculate shortfall or excess
                 summary_data = {
@@ -756,10 +876,13 @@ elif selected_tool == "Retirement Calculator":
                     summary_data["Initial Withdrawal at Retirement (Monthly) (R)"] = [withdrawal_at_retirement / 12]
                 else:
                     # Calculate how long the capital will last
-                    years_until_depletion, first_withdrawal, capital_over_time, withdrawals_over_time, monthly_income_over_time, monthly_income_today_value = calculate_years_until_depletion(
-                        total_provision_value, future_annual_income, inflation_rate, years_to_retirement, assumed_return
+                    years_until_depletion, first_withdrawal, capital_over_time, withdrawals_over_time, monthly_income_over_time, monthly_income_today_value = graph.node(
+                        "depletion", lambda totals, plan, inflation, years, returns: cached_calculate_years_until_depletion(totals[0], plan[0], inflation, years, returns),
+                        "provision_totals", "retirement_plan", "inflation_rate", "years_to_retirement", "assumed_return"
                     )
                     st.write(f"**Capital at Retirement (Based on Provisions)**: R {total_provision_value:,.2f}")
+                    if math.isinf(years_until_depletion):
+                        years_until_depletion = f"More than {DEPLETION_HORIZON_YEARS}"
                     st.write(f"**Years Until Capital Depletion**: {years_until_depletion}")
                     st.write(f"**Initial Withdrawal at Retirement (Annual)**: R {first_withdrawal:,.2f}")
                     st.write(f"**Initial Withdrawal at Retirement (Monthly)**: R {(first_withdrawal / 12):,.2f}")
@@ -771,189 +894,332 @@ elif selected_tool == "Retirement Calculator":
                     summary_data["Preservation Period (Years)"] = [0]
                     # Visual: Line chart for capital depletion
                     st.write("**Capital Depletion Over Time**")
-                    chart_data = pd.DataFrame({
-                        "Year": list(range(years_to_retirement, years_to_retirement + len(capital_over_time))),
-                        "Capital (R)": capital_over_time,
-                        "Annual Withdrawal (R)": withdrawals_over_time,
-                        "Monthly Income (R)": monthly_income_over_time,
-                        "Monthly Income in Today's Value (R)": monthly_income_today_value
+                    with phase("dataframes"):
+                        chart_data = pd.DataFrame({
+                            "Year": list(range(years_to_retirement, years_to_retirement + len(capital_over_time))),
+                            "Capital (R)": capital_over_time,
+                            "Annual Withdrawal (R)": withdrawals_over_time,
+                            "Monthly Income (R)": monthly_income_over_time,
+                            "Monthly Income in Today's Value (R)": monthly_income_today_value
+                        })
+                    with phase("charts"):
+                        st.line_chart(downsample_line(chart_data, "Year").set_index("Year")[["Capital (R)", "Annual Withdrawal (R)", "Monthly Income (R)", "Monthly Income in Today's Value (R)"]])
+
+                monte_carlo_df = None
+                if run_monte_carlo:
+                    # Stochastic version of the depletion model above
+                    graph.input("monte_carlo_settings", {
+                        "return_volatility": return_volatility, "inflation_volatility": inflation_volatility, "num_paths": num_paths,
+                        "life_expectancy": life_expectancy, "escalate_income": escalate_income, "workers": None if use_all_cores else 1
                     })
-                    st.line_chart(chart_data.set_index("Year")[["Capital (R)", "Annual Withdrawal (R)", "Monthly Income (R)", "Monthly Income in Today's Value (R)"]])
+                    # The client is an input too, so the result store records the run under the current name
+                    graph.input("client_name", name)
+                    probability_of_success, depletion_age_percentiles, survival_by_age = graph.node(
+                        "monte_carlo", lambda client, totals, plan, age, returns, inflation, settings: stored_monte_carlo(
+                            client, totals[0], plan[0], age, returns, inflation, settings
+                        ),
+                        "client_name", "provision_totals", "retirement_plan", "retirement_age", "assumed_return", "inflation_rate", "monte_carlo_settings"
+                    )
+                    st.write(f"**Monte Carlo Simulation ({num_paths:,} paths)**")
+                    st.write(f"**Probability Capital Lasts Until Age {life_expectancy}**: {probability_of_success * 100:.1f}%")
+                    if probability_of_success < 0.5:
+                        st.warning("In most simulations the capital runs out before the planned age. Consider saving more or lowering the desired income.")
+                    percentile_rows = []
+                    for percentile, age in depletion_age_percentiles.items():
+                        age_text = f"After {life_expectancy}" if math.isinf(age) else str(int(age))
+                        st.write(f"- {percentile}th percentile depletion age: {age_text}")
+                        percentile_rows.append({"Percentile": percentile, "Depletion Age": age_text})
+                    monte_carlo_df = pd.DataFrame({
+                        "Age": [age for age, fraction in survival_by_age],
+                        "Probability Capital Remains (%)": [fraction * 100 for age, fraction in survival_by_age]
+                    })
+                    st.write("**Probability Capital Remains by Age**")
+                    with phase("charts"):
+                        st.line_chart(downsample_line(monte_carlo_df, "Age").set_index("Age"))
+                    monte_carlo_df = pd.concat([monte_carlo_df, pd.DataFrame(percentile_rows)], axis=1)
+                    summary_data["Monte Carlo Simulations"] = [num_paths]
+                    summary_data["Probability of Success (%)"] = [probability_of_success * 100]
 
                 # Step 4: Calculate additional savings needed
                 if preserve_capital and shortfall > 0:
-                    additional_savings = calculate_additional_savings_needed(shortfall, years_to_retirement, average_return)
+                    # The additional savings earn the provisions' average return and escalate like their contributions
+                    additional_savings = graph.node(
+                        "additional_savings", lambda plan, totals, years, *provision_values: cached_calculate_additional_savings_needed(
+                            plan[2] - totals[0], years, totals[1], average_contribution_increase(provision_values)
+                        ),
+                        "retirement_plan", "provision_totals", "years_to_retirement", *provision_names
+                    )
                     st.warning(f"**Capital Shortfall**: R {shortfall:,.2f}")
                     st.write(f"**Additional Monthly Savings Needed**: R {additional_savings:,.2f}")
+                    st.markdown(
+                        f"<p style='font-size: 14px; font-style: italic; color: #CCCCCC;'>Assumes the additional savings earn the provisions' average return "
+                        f"({average_return * 100:.2f}%) and increase each year by their average contribution increase "
+                        f"({average_contribution_increase(provisions) * 100:.2f}%).</p>",
+                        unsafe_allow_html=True
+                    )
+                    earliest_retirement_age = graph.node(
+                        "earliest_retirement_age", lambda age, income, inflation, increase, period, returns, *provision_values: cached_solve_retirement_age(
+                            age, list(provision_values), income, inflation, increase, period, returns
+                        ),
+                        "current_age", "desired_monthly_income", "inflation_rate", "desired_annual_increase", "preservation_years", "assumed_return", *provision_names
+                    )
+                    if earliest_retirement_age is None:
+                        st.write(f"**Earliest Retirement Age Without Additional Savings**: Not reached by age {MAX_RETIREMENT_AGE}")
+                    else:
+                        st.write(f"**Earliest Retirement Age Without Additional Savings**: {earliest_retirement_age}")
                     summary_data["Capital Shortfall (R)"] = [shortfall]
                     summary_data["Additional Monthly Savings Needed (R)"] = [additional_savings]
+                    summary_data["Earliest Retirement Age Without Additional Savings"] = [earliest_retirement_age]
                 elif preserve_capital and shortfall <= 0:
                     st.write(f"**Capital Excess**: R {-shortfall:,.2f}")
                     summary_data["Capital Excess (R)"] = [-shortfall]
                     summary_data["Capital Shortfall (R)"] = [0]
                     summary_data["Additional Monthly Savings Needed (R)"] = [0]
 
+                sweep_df = None
+                if run_sweep and sweep_ages and sweep_periods:
+                    # Every combination of the sweep parameters in one vectorized pass
+                    graph.input("sweep_settings", {
+                        "inflation_rates": sweep_range(*sweep_inflation, sweep_inflation_steps),
+                        "assumed_returns": sweep_range(*sweep_return, sweep_return_steps),
+                        "retirement_ages": sorted(sweep_ages),
+                        "preservation_periods": sorted(sweep_periods)
+                    })
+                    sweep = graph.node(
+                        "scenario_sweep", lambda income, increase, age, settings, *provision_values: cached_sweep_retirement_plan(
+                            income, increase, age, list(provision_values), settings["inflation_rates"], settings["assumed_returns"],
+                            settings["retirement_ages"], settings["preservation_periods"]
+                        ),
+                        "desired_monthly_income", "desired_annual_increase", "current_age", "sweep_settings", *provision_names
+                    )
+                    with phase("dataframes"):
+                        sweep_df = pd.DataFrame({
+                            "Inflation Rate (%)": sweep["inflation_rate"] * 100,
+                            "Assumed Return (%)": sweep["assumed_return"] * 100,
+                            "Retirement Age": sweep["retirement_age"].astype(int),
+                            "Preservation Period (Years)": sweep["preservation_years"].astype(int),
+                            "Future Monthly Income Needed (R)": sweep["future_monthly_income"],
+                            "Capital at Retirement (R)": sweep["capital_at_retirement"],
+                            "Capital Required (Preserve Capital) (R)": sweep["capital_required"],
+                            "Capital Shortfall (R)": sweep["capital_shortfall"],
+                            # Capital that outlasts the horizon has no depletion age
+                            "Depletion Age": pd.Series(sweep["depletion_age"]).replace([math.inf], math.nan),
+                        })
+                    st.write(f"**Scenario Sweep ({len(sweep_df):,} scenarios)**")
+                    st.write(f"**Capital Shortfall With a {heatmap_period}-Year Preservation Period (R, negative is an excess)**")
+                    render_sweep_heatmap(
+                        sweep_df[sweep_df["Preservation Period (Years)"] == heatmap_period], "Capital Shortfall (R)",
+                        alt.Scale(scheme="redblue", reverse=True, domainMid=0)
+                    )
+                    st.write(f"**Age at Capital Depletion Without Preserving Capital (blank: lasts more than {DEPLETION_HORIZON_YEARS} years)**")
+                    render_sweep_heatmap(
+                        sweep_df[sweep_df["Preservation Period (Years)"] == sweep_df["Preservation Period (Years)"].iloc[0]], "Depletion Age",
+                        alt.Scale(scheme="redyellowgreen")
+                    )
+
+                save_result("retirement_plan", name, {
+                    "desired_monthly_income": desired_monthly_income, "desired_annual_increase": desired_annual_increase,
+                    "current_age": current_age, "retirement_age": retirement_age, "inflation_rate": inflation_rate,
+                    "assumed_return": assumed_return, "preserve_capital": preserve_capital, "preservation_years": preservation_years,
+                    "provisions": provisions
+                }, summary_data)
                 # Export to Excel
                 summary_df = pd.DataFrame(summary_data)
-                chart_df = pd.DataFrame(chart_data).reset_index() if not preserve_capital else pd.DataFrame()
-                buffer = io.BytesIO()
-                with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
-                    summary_df.to_excel(writer, index=False, sheet_name="Retirement Plan Summary")
-                    provisions_df.to_excel(writer, startrow=len(summary_df) + 2, index=False, sheet_name="Retirement Plan Summary")
-                    if not preserve_capital:
-                        chart_df.to_excel(writer, index=False, sheet_name="Chart Data", startrow=0)
-                    # Add a note sheet for chart instructions
-                    instructions = pd.DataFrame({
-                        "Instructions": [
-                            "This Excel file contains your Retirement Plan Summary and Provisions Data.",
-                            "If you did not opt to preserve capital, the 'Chart Data' sheet includes data for visualizing capital depletion over time.",
-                            "To recreate the line chart in Excel (if applicable):",
-                            "1. Go to the 'Chart Data' sheet.",
-                            "2. Select the 'Year' and 'Capital (R)' columns (or other metrics).",
-                            "3. Click Insert > Line Chart in Excel to visualize the depletion."
-                        ]
-                    })
-                    instructions.to_excel(writer, index=False, sheet_name="Instructions")
-                buffer.seek(0)
-                st.download_button(
-                    label="Download Summary as Excel",
-                    data=buffer,
-                    file_name="retirement_plan_summary.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
+                sheets = [
+                    ("Retirement Plan Summary", summary_df, 0),
+                    ("Retirement Plan Summary", provisions_df, len(summary_df) + 2)
+                ]
+                if not preserve_capital:
+                    sheets.append(("Chart Data", pd.DataFrame(chart_data).reset_index(), 0))
+                if monte_carlo_df is not None:
+                    sheets.append(("Monte Carlo", monte_carlo_df, 0))
+                if sweep_df is not None:
+                    sheets.append(("Scenario Sweep", sweep_df, 0))
+                store_result_view("retirement_sweep", sweep_df)
+                store_excel_export("retirement", "retirement_plan_summary.xlsx", sheets, [
+                    "This Excel file contains your Retirement Plan Summary and Provisions Data.",
+                    "If you did not opt to preserve capital, the 'Chart Data' sheet includes data for visualizing capital depletion over time.",
+                    "To recreate the line chart in Excel (if applicable):",
+                    "1. Go to the 'Chart Data' sheet.",
+                    "2. Select the 'Year' and 'Capital (R)' columns (or other metrics).",
+                    "3. Click Insert > Line Chart in Excel to visualize the depletion.",
+                    "If you ran a Monte Carlo simulation, the 'Monte Carlo' sheet lists the probability that capital remains at each age and the depletion age percentiles.",
+                    "If you ran a scenario sweep, the 'Scenario Sweep' sheet lists the shortfall and depletion age for every combination of inflation, return, retirement age and preservation period."
+                ])
             except Exception as e:
                 st.error(f"Error: {e}")
+            st.session_state.setdefault("calculation_graph_reports", {})["Retirement Calculator"] = graph.finish()
+    render_result_view("retirement_sweep", "Scenario Sweep Results")
+    render_previous_results("retirement_plan", name)
+    render_excel_download("retirement")
 elif selected_tool == "Estate Liquidity Tool":
-    st.write("Enter details to assess your estate's liquidity and ensure your beneficiaries are protected.")
-    # Note about estate duty rates
-    st.markdown(
-        "<p style='font-size: 14px; font-style: italic; color: #CCCCCC;'>Note: Estate duty rates are based on 2025 South African laws: R3.5M abatement, 20% up to R30M, 25% above R30M. Verify with a tax professional for your specific case.</p>",
-        unsafe_allow_html=True
-    )
+    estate_mode = st.radio("Mode", ["Single Estate", "Bulk Upload"], horizontal=True, key="estate_mode")
+    if estate_mode == "Bulk Upload":
+        st.write("Upload your client book as three CSV or Excel (.xlsx) tables to review the liquidity of every estate at once.")
+        st.markdown(
+            "<p style='font-size: 14px; font-style: italic; color: #CCCCCC;'>Estates: one row per estate with Estate ID and any of Cash, Life Insurance To Estate, Other Assets, Debts, Medical Bills, Cash Bequests, Has Surviving Spouse, Spouse Bequest Value, PBO Bequest Value, Marginal Tax Rate (missing columns default to 0, No and 0.45). Properties: Estate ID, Market Value. Investments: Estate ID, Market Value, Base Cost. An estate may have any number of properties and investments.</p>",
+            unsafe_allow_html=True
+        )
+        estates_file = st.file_uploader("Estates", type=["csv", "xlsx"], key="estate_upload_estates")
+        properties_file = st.file_uploader("Properties (optional)", type=["csv", "xlsx"], key="estate_upload_properties")
+        investments_file = st.file_uploader("Investments (optional)", type=["csv", "xlsx"], key="estate_upload_investments")
+        result_format = select_result_format("estate_result_format")
+        if estates_file is not None and st.button("Calculate Liquidity for All Estates"):
+            try:
+                with phase("bulk_estate_liquidity"):
+                    estates = pd.concat([chunk for chunk, fraction_done in read_client_chunks(estates_file, estates_file.name)], ignore_index=True)
+                    results = calculate_estate_liquidity_tables(
+                        estates,
+                        read_client_chunks(properties_file, properties_file.name) if properties_file is not None else (),
+                        read_client_chunks(investments_file, investments_file.name) if investments_file is not None else ()
+                    )
+                with phase("excel"):
+                    store_result_file("estate_bulk", "estate_liquidity_results", result_format, lambda file: write_estate_liquidity_results(results, file, result_format))
+                # Kept in the session so paging through the results doesn't recalculate them
+                store_result_view("estate_bulk", results)
+            except Exception as e:
+                st.error(f"Error: {e}")
+        results = st.session_state.get("estate_bulk_result_view")
+        if results is not None:
+            shortfalls = results["liquidity_shortfall"] > 0
+            st.success(f"--- Estate Liquidity calculated for {len(results):,} estates ---")
+            st.write(f"**Estates With a Liquidity Shortfall**: {shortfalls.sum():,}")
+            st.write(f"**Total Liquidity Shortfall**: R {results['liquidity_shortfall'].sum():,.2f}")
+            render_result_file_download("estate_bulk")
+            render_result_view("estate_bulk", "Estate Liquidity Results")
+    else:
+        st.write("Enter details to assess your estate's liquidity and ensure your beneficiaries are protected.")
+        # Note about estate duty rates
+        st.markdown(
+            "<p style='font-size: 14px; font-style: italic; color: #CCCCCC;'>Note: Estate duty rates are based on 2025 South African laws: R3.5M abatement, 20% up to R30M, 25% above R30M. Verify with a tax professional for your specific case.</p>",
+            unsafe_allow_html=True
+        )
 
-    # Input fields
-    name = st.text_input("Client's Name", key="estate_name")
+        # Input fields
+        name = st.text_input("Client's Name", key="estate_name")
     
-    # Personal Details
-    marital_status = st.selectbox("Marital Status", ["Single", "Married in Community of Property", "Married Out of Community (No Accrual)", "Married Out of Community (With Accrual)"])
-    has_surviving_spouse = st.checkbox("Is there a surviving spouse?", value=False)
-
-    # Assets
-    st.write("**Liquid Assets**")
-    cash = st.number_input("Cash in Bank/Savings (R)", min_value=0.0, step=1000.0)
-    life_insurance_to_estate = st.number_input("Life Insurance Payable to Estate (R)", min_value=0.0, step=1000.0)
-
-    st.write("**Non-Liquid Assets**")
-    num_properties = st.number_input("Number of Properties", min_value=0, max_value=10, step=1, value=0)
-    properties = []
-    for i in range(num_properties):
-        st.write(f"**Property {i+1}**")
-        market_value = st.number_input(f"Market Value of Property {i+1} (R)", min_value=0.0, step=1000.0, key=f"prop_value_{i}")
-        properties.append(market_value)
-
-    num_investments = st.number_input("Number of Investments (e.g., Shares, Bonds)", min_value=0, max_value=10, step=1, value=0)
-    investments = []
-    for i in range(num_investments):
-        st.write(f"**Investment {i+1}**")
-        market_value = st.number_input(f"Market Value of Investment {i+1} (R)", min_value=0.0, step=1000.0, key=f"inv_value_{i}")
-        base_cost = st.number_input(f"Base Cost of Investment {i+1} (R)", min_value=0.0, step=1000.0, key=f"inv_base_{i}")
-        investments.append({"market_value": market_value, "base_cost": base_cost})
-
-    other_assets = st.number_input("Other Non-Liquid Assets (e.g., Vehicles, Jewelry) (R)", min_value=0.0, step=1000.0)
-
-    # Liabilities
-    st.write("**Liabilities**")
-    debts = st.number_input("Outstanding Debts (e.g., Loans, Bonds) (R)", min_value=0.0, step=1000.0)
-    medical_bills = st.number_input("Medical Bills or Pre-Death Expenses (R)", min_value=0.0, step=1000.0)
-
-    # Will Details
-    st.write("**Will Details**")
-    cash_bequests = st.number_input("Cash Bequests to Beneficiaries (R)", min_value=0.0, step=1000.0)
-    spouse_bequest_value = st.number_input("Bequests to Surviving Spouse (R)", min_value=0.0, step=1000.0, disabled=not has_surviving_spouse)
-    pbo_bequest_value = st.number_input("Bequests to Public Benefit Organizations (R)", min_value=0.0, step=1000.0)
-
-    # Assumptions
-    st.write("**Assumptions**")
-    marginal_tax_rate = st.number_input("Marginal Tax Rate for CGT (e.g., 0.45 for 45%)", min_value=0.0, max_value=0.45, value=0.45, step=0.01)
+        # Personal Details
+        marital_status = st.selectbox("Marital Status", ["Single", "Married in Community of Property", "Married Out of Community (No Accrual)", "Married Out of Community (With Accrual)"])
+        has_surviving_spouse = st.checkbox("Is there a surviving spouse?", value=False)
 
-    # Calculate button
-    if st.button("Calculate Estate Liquidity"):
-        if not name.strip():
-            st.error("Please enter a name.")
-        elif cash < 0 or life_insurance_to_estate < 0 or any(p < 0 for p in properties) or any(i["market_value"] < 0 or i["base_cost"] < 0 for i in investments) or other_assets < 0 or debts < 0 or medical_bills < 0 or cash_bequests < 0 or spouse_bequest_value < 0 or pbo_bequest_value < 0 or marginal_tax_rate < 0 or marginal_tax_rate > 0.45:
-            st.error("All financial inputs must be non-negative, and marginal tax rate must be between 0 and 45%.")
-        else:
-            try:
-                # Calculate Gross Estate Value
-                gross_estate = cash + life_insurance_to_estate + sum(properties) + sum(i["market_value"] for i in investments) + other_assets
+        # Assets
+        st.write("**Liquid Assets**")
+        cash = st.number_input("Cash in Bank/Savings (R)", min_value=0.0, step=1000.0)
+        life_insurance_to_estate = st.number_input("Life Insurance Payable to Estate (R)", min_value=0.0, step=1000.0)
 
-                # Calculate Net Estate Value
-                net_estate = gross_estate - debts - medical_bills - cash_bequests
+        st.write("**Non-Liquid Assets**")
+        num_properties = st.number_input("Number of Properties", min_value=0, max_value=10, step=1, value=0)
+        properties = []
+        for i in range(num_properties):
+            st.write(f"**Property {i+1}**")
+            market_value = st.number_input(f"Market Value of Property {i+1} (R)", min_value=0.0, step=1000.0, key=f"prop_value_{i}")
+            properties.append(market_value)
 
-                # Calculate Capital Gains Tax
-                cgt = calculate_cgt(investments, marginal_tax_rate)
+        num_investments = st.number_input("Number of Investments (e.g., Shares, Bonds)", min_value=0, max_value=10, step=1, value=0)
+        investments = []
+        for i in range(num_investments):
+            st.write(f"**Investment {i+1}**")
+            market_value = st.number_input(f"Market Value of Investment {i+1} (R)", min_value=0.0, step=1000.0, key=f"inv_value_{i}")
+            base_cost = st.number_input(f"Base Cost of Investment {i+1} (R)", min_value=0.0, step=1000.0, key=f"inv_base_{i}")
+            investments.append({"market_value": market_value, "base_cost": base_cost})
 
-                # Calculate Estate Duty
-                estate_duty = calculate_estate_duty(net_estate, has_surviving_spouse, spouse_bequest_value, pbo_bequest_value)
+        other_assets = st.number_input("Other Non-Liquid Assets (e.g., Vehicles, Jewelry) (R)", min_value=0.0, step=1000.0)
 
-                # Calculate Executor Fees
-                executor_fees = calculate_executor_fees(gross_estate)
+        # Liabilities
+        st.write("**Liabilities**")
+        debts = st.number_input("Outstanding Debts (e.g., Loans, Bonds) (R)", min_value=0.0, step=1000.0)
+        medical_bills = st.number_input("Medical Bills or Pre-Death Expenses (R)", min_value=0.0, step=1000.0)
 
-                # Calculate Total Costs
-                total_costs = cgt + estate_duty + executor_fees
+        # Will Details
+        st.write("**Will Details**")
+        cash_bequests = st.number_input("Cash Bequests to Beneficiaries (R)", min_value=0.0, step=1000.0)
+        spouse_bequest_value = st.number_input("Bequests to Surviving Spouse (R)", min_value=0.0, step=1000.0, disabled=not has_surviving_spouse)
+        pbo_bequest_value = st.number_input("Bequests to Public Benefit Organizations (R)", min_value=0.0, step=1000.0)
 
-                # Calculate Liquid Assets Available
-                liquid_assets = cash + life_insurance_to_estate
+        # Assumptions
+        st.write("**Assumptions**")
+        marginal_tax_rate = st.number_input("Marginal Tax Rate for CGT (e.g., 0.45 for 45%)", min_value=0.0, max_value=0.45, value=0.45, step=0.01)
 
-                # Assess Liquidity
-                liquidity_shortfall = max(0, total_costs - liquid_assets)
+        # Calculate button
+        if st.button("Calculate Estate Liquidity"):
+            if not name.strip():
+                st.error("Please enter a name.")
+            elif cash < 0 or life_insurance_to_estate < 0 or any(p < 0 for p in properties) or any(i["market_value"] < 0 or i["base_cost"] < 0 for i in investments) or other_assets < 0 or debts < 0 or medical_bills < 0 or cash_bequests < 0 or spouse_bequest_value < 0 or pbo_bequest_value < 0 or marginal_tax_rate < 0 or marginal_tax_rate > 0.45:
+                st.error("All financial inputs must be non-negative, and marginal tax rate must be between 0 and 45%.")
+            else:
+                try:
+                    gross_estate, net_estate, cgt, estate_duty, executor_fees, total_costs, liquid_assets, liquidity_shortfall = cached_calculate_estate_liquidity(
+                        cash, life_insurance_to_estate, properties, investments, other_assets, debts, medical_bills,
+                        cash_bequests, has_surviving_spouse, spouse_bequest_value, pbo_bequest_value, marginal_tax_rate
+                    )
 
-                st.success("--- Estate Liquidity Summary ---")
-                st.write(f"**Client**: {name}")
-                st.write(f"**Gross Estate Value**: R {gross_estate:,.2f}")
-                st.write(f"**Net Estate Value (after debts, medical bills, and cash bequests)**: R {net_estate:,.2f}")
-                st.write(f"**Capital Gains Tax**: R {cgt:,.2f}")
-                st.write(f"**Estate Duty**: R {estate_duty:,.2f}")
-                st.write(f"**Executor Fees (incl. VAT)**: R {executor_fees:,.2f}")
-                st.write(f"**Total Costs**: R {total_costs:,.2f}")
-                st.write(f"**Liquid Assets Available**: R {liquid_assets:,.2f}")
-                if liquidity_shortfall > 0:
-                    st.warning(f"**Liquidity Shortfall**: R {liquidity_shortfall:,.2f}")
-                    st.write("**Recommendation**: Consider increasing life insurance payable to the estate or liquidating non-liquid assets to cover the shortfall.")
-                else:
-                    st.write("**Liquidity Status**: Sufficient liquid assets to cover costs.")
+                    st.success("--- Estate Liquidity Summary ---")
+                    st.write(f"**Client**: {name}")
+                    st.write(f"**Gross Estate Value**: R {gross_estate:,.2f}")
+                    st.write(f"**Net Estate Value (after debts, medical bills, and cash bequests)**: R {net_estate:,.2f}")
+                    st.write(f"**Capital Gains Tax**: R {cgt:,.2f}")
+                    st.write(f"**Estate Duty**: R {estate_duty:,.2f}")
+                    st.write(f"**Executor Fees (incl. VAT)**: R {executor_fees:,.2f}")
+                    st.write(f"**Total Costs**: R {total_costs:,.2f}")
+                    st.write(f"**Liquid Assets Available**: R {liquid_assets:,.2f}")
+                    if liquidity_shortfall > 0:
+                        st.warning(f"**Liquidity Shortfall**: R {liquidity_shortfall:,.2f}")
+                        st.write("**Recommendation**: Consider increasing life insurance payable to the estate or liquidating non-liquid assets to cover the shortfall.")
+                    else:
+                        st.write("**Liquidity Status**: Sufficient liquid assets to cover costs.")
 
-                # Export to Excel
-                summary_data = {
-                    "Client": [name],
-                    "Gross Estate Value (R)": [gross_estate],
-                    "Net Estate Value (R)": [net_estate],
-                    "Capital Gains Tax (R)": [cgt],
-                    "Estate Duty (R)": [estate_duty],
-                    "Executor Fees (R)": [executor_fees],
-                    "Total Costs (R)": [total_costs],
-                    "Liquid Assets Available (R)": [liquid_assets],
-                    "Liquidity Shortfall (R)": [liquidity_shortfall if liquidity_shortfall > 0 else 0]
-                }
-                summary_df = pd.DataFrame(summary_data)
-                buffer = io.BytesIO()
-                with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
-                    summary_df.to_excel(writer, index=False, sheet_name="Estate Liquidity Summary")
-                    # Add a note sheet for instructions
-                    instructions = pd.DataFrame({
-                        "Instructions": [
-                            "This Excel file contains your Estate Liquidity Summary.",
-                            "There are no charts in this tool, but you can create your own in Excel.",
-                            "For example, select your data and use Insert > Chart to visualize your results."
-                        ]
-                    })
-                    instructions.to_excel(writer, index=False, sheet_name="Instructions")
-                buffer.seek(0)
-                st.download_button(
-                    label="Download Summary as Excel",
-                    data=buffer,
-                    file_name="estate_liquidity_summary.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
-            except Exception as e:
-                st.error(f"Error: {e}")
+                    # Export to Excel
+                    summary_data = {
+                        "Client": [name],
+                        "Gross Estate Value (R)": [gross_estate],
+                        "Net Estate Value (R)": [net_estate],
+                        "Capital Gains Tax (R)": [cgt],
+                        "Estate Duty (R)": [estate_duty],
+                        "Executor Fees (R)": [executor_fees],
+                        "Total Costs (R)": [total_costs],
+                        "Liquid Assets Available (R)": [liquid_assets],
+                        "Liquidity Shortfall (R)": [liquidity_shortfall if liquidity_shortfall > 0 else 0]
+                    }
+                    save_result("estate_liquidity", name, {
+                        "cash": cash, "life_insurance_to_estate": life_insurance_to_estate, "properties": properties, "investments": investments,
+                        "other_assets": other_assets, "debts": debts, "medical_bills": medical_bills, "cash_bequests": cash_bequests,
+                        "has_surviving_spouse": has_surviving_spouse, "spouse_bequest_value": spouse_bequest_value,
+                        "pbo_bequest_value": pbo_bequest_value, "marginal_tax_rate": marginal_tax_rate
+                    }, summary_data)
+                    summary_df = pd.DataFrame(summary_data)
+                    store_excel_export("estate", "estate_liquidity_summary.xlsx", [("Estate Liquidity Summary", summary_df, 0)], [
+                        "This Excel file contains your Estate Liquidity Summary.",
+                        "There are no charts in this tool, but you can create your own in Excel.",
+                        "For example, select your data and use Insert > Chart to visualize your results."
+                    ])
+                except Exception as e:
+                    st.error(f"Error: {e}")
+        render_previous_results("estate_liquidity", name)
+        render_excel_download("estate")
+
+# Hidden diagnostics panel, shown by adding ?diagnostics=1 to the URL
+if st.query_params.get("diagnostics") == "1":
+    with st.sidebar.expander("Diagnostics", expanded=True):
+        st.write("**Calculation Cache**")
+        st.json(CALCULATION_CACHE.stats())
+        st.write("**Excel Workbook Cache**")
+        st.json(WORKBOOK_CACHE.stats())
+        st.write("**Calculation Graph (Last Run per Tool)**")
+        st.json(st.session_state.get("calculation_graph_reports", {}))
+        st.write("**Session Memory**")
+        memory_rows, memory_bytes, memory_disk_bytes = session_report(st.session_state)
+        st.write(f"This session: {memory_bytes / 2 ** 20:,.2f} MiB in memory, {memory_disk_bytes / 2 ** 20:,.2f} MiB of result files on disk")
+        resident_bytes = process_memory_bytes()
+        if resident_bytes is not None:
+            st.write(f"Server process: {resident_bytes / 2 ** 20:,.1f} MiB resident (all sessions and caches)")
+        if memory_rows:
+            st.dataframe(pd.DataFrame(memory_rows), hide_index=True)
+        st.write("**Profiling (All Sessions)**")
+        if PROFILING_ENABLED:
+            st.json(PROFILER.stats())
+            st.download_button("Download Profile as JSON", json.dumps(PROFILER.stats(), indent=2), file_name="profile.json", mime="application/json")
+            st.download_button("Download Profile as Prometheus Text", PROFILER.prometheus_text(), file_name="profile.prom", mime="text/plain")
+            if st.button("Reset Profile"):
+                PROFILER.reset()
+        else:
+            st.write("Disabled. Start the app with APP_PROFILE=1 to record timings and allocations.")
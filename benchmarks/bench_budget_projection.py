@@ -0,0 +1,54 @@
+"""Benchmark the vectorized budget projection against a month-by-month loop.
+
+Run from the repository root:  python -m benchmarks.bench_budget_projection [categories] [months]
+"""
+import sys
+import time
+
+import numpy as np
+
+from calculators.budget_projection import project_budget
+
+
+def project_budget_loop(monthly_income, amounts, months, annual_inflation, income_escalation, every_months, first_months,
+                        opening_savings, savings_return):
+    """Reference projection, one month and one category at a time."""
+    growth = (1 + savings_return) ** (1 / 12)
+    balance, balances = opening_savings, []
+    for month in range(months):
+        year = month // 12
+        expenses = 0.0
+        for amount, inflation, every, first in zip(amounts, annual_inflation, every_months, first_months):
+            since_first = month - first
+            if since_first >= 0 and (since_first % every == 0 if every > 0 else since_first == 0):
+                expenses += amount * (1 + inflation) ** year
+        balance = balance * growth + monthly_income * (1 + income_escalation) ** year - expenses
+        balances.append(balance)
+    return balances
+
+
+def main(categories=500, months=480):
+    rng = np.random.default_rng(0)
+    amounts = np.round(rng.uniform(10, 400, categories), 2).tolist()
+    annual_inflation = rng.uniform(0.03, 0.1, categories).tolist()
+    every_months = rng.choice([0, 1, 1, 1, 3, 12], categories).tolist()
+    first_months = rng.integers(0, 24, categories).tolist()
+    arguments = (60000, amounts, months, annual_inflation, 0.05, every_months, first_months, 100000, 0.08)
+
+    start = time.perf_counter()
+    expected = project_budget_loop(*arguments)
+    loop_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    projection = project_budget(*arguments)
+    vectorized_seconds = time.perf_counter() - start
+
+    if not np.allclose(projection["savings_balance"], expected, rtol=1e-9, atol=1e-4):
+        raise SystemExit("The vectorized projection differs from the month-by-month loop")
+
+    print(f"categories x months: {categories:,} x {months}")
+    print(f"loop:                {loop_seconds * 1e3:,.1f} ms")
+    print(f"vectorized:          {vectorized_seconds * 1e3:,.2f} ms ({loop_seconds / vectorized_seconds:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
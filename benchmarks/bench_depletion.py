@@ -0,0 +1,72 @@
+"""Benchmark the NumPy depletion engine against the original while loop.
+
+Run from the repository root:  python -m benchmarks.bench_depletion [clients]
+
+The original loop never ends when the return sustains the income, so it is only timed on
+clients that deplete within the horizon; the engine is timed on all of them.
+"""
+import math
+import sys
+import time
+
+import numpy as np
+
+from calculators import DEPLETION_HORIZON_YEARS, FULL_WITHDRAWAL_LIMIT, MAX_DRAWDOWN_RATE, calculate_years_until_depletion
+from calculators.batch import calculate_depletion_trajectory_batch, calculate_depletion_years_batch
+
+
+def loop_depletion_years(capital, annual_income, assumed_return):
+    """Years value of calculate_years_until_depletion as it was before the engine (unbounded loop)."""
+    current_capital, years = capital, 0
+    while current_capital > 0:
+        if current_capital <= FULL_WITHDRAWAL_LIMIT:
+            return years + 1
+        current_capital = (current_capital - min(annual_income, current_capital * MAX_DRAWDOWN_RATE)) * (1 + assumed_return)
+        years += 1
+    return years
+
+
+def make_clients(count, seed=0):
+    rng = np.random.default_rng(seed)
+    capital = np.round(rng.uniform(0, 30000000, count), 2)
+    annual_income = np.round(rng.uniform(100000, 3000000, count), 2)
+    assumed_return = np.round(rng.uniform(0, 0.15, count) * 200) / 200
+    return capital, annual_income, assumed_return
+
+
+def main(count=100000):
+    capital, annual_income, assumed_return = make_clients(count)
+
+    start = time.perf_counter()
+    years = calculate_depletion_years_batch(capital, annual_income, assumed_return)
+    years_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    trajectory_years = calculate_depletion_trajectory_batch(capital, annual_income, assumed_return)[0]
+    trajectory_seconds = time.perf_counter() - start
+
+    finite = np.flatnonzero(np.isfinite(years))
+    rows = list(zip(capital[finite].tolist(), annual_income[finite].tolist(), assumed_return[finite].tolist()))
+    start = time.perf_counter()
+    expected = np.array([loop_depletion_years(*row) for row in rows])
+    loop_seconds = time.perf_counter() - start
+
+    if not np.array_equal(years[finite], expected) or not np.array_equal(years, trajectory_years):
+        raise SystemExit("The engine differs from the original loop")
+
+    # A perpetual case, which hung the original loop
+    start = time.perf_counter()
+    perpetual_years = calculate_years_until_depletion(20000000, 1000000, 0.06, 25, 0.07)[0]
+    perpetual_seconds = time.perf_counter() - start
+    if not math.isinf(perpetual_years):
+        raise SystemExit("Expected the perpetual case to never deplete")
+
+    print(f"clients:           {count:,} ({len(finite):,} deplete within {DEPLETION_HORIZON_YEARS} years)")
+    print(f"loop:              {loop_seconds / len(finite) * 1e6:,.2f} us/client (depleting clients only)")
+    print(f"years batch:       {years_seconds / count * 1e6:,.3f} us/client")
+    print(f"trajectory batch:  {trajectory_seconds / count * 1e6:,.3f} us/client")
+    print(f"perpetual scalar:  {perpetual_seconds * 1e3:,.2f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
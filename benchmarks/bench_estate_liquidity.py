@@ -0,0 +1,86 @@
+"""Benchmark the columnar estate liquidity engine on a synthetic client book.
+
+Run from the repository root:  python -m benchmarks.bench_estate_liquidity [estates]
+
+Asset tables are generated and aggregated in chunks, as they would be streamed from
+an upload, so the reported peak memory covers one chunk plus the per-estate totals.
+"""
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from calculators import ESTATE_LIQUIDITY_OUTPUTS, calculate_estate_liquidity
+from calculators.bulk import calculate_estate_liquidity_tables
+
+ASSETS_PER_ESTATE = 40  # Properties plus investments per estate, on average
+CHUNK_ROWS = 500000
+
+
+def make_estates(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "estate_id": np.arange(count),
+        "cash": np.round(rng.uniform(0, 2000000, count), 2),
+        "life_insurance_to_estate": np.round(rng.uniform(0, 1000000, count), 2),
+        "other_assets": np.round(rng.uniform(0, 1000000, count), 2),
+        "debts": np.round(rng.uniform(0, 3000000, count), 2),
+        "has_surviving_spouse": rng.random(count) < 0.5,
+        "spouse_bequest_value": np.round(rng.uniform(0, 5000000, count), 2),
+        "marginal_tax_rate": 0.45,
+    })
+
+
+def asset_chunks(estates, rows, investments, seed):
+    """Yield random property or investment rows in chunks of CHUNK_ROWS."""
+    rng = np.random.default_rng(seed)
+    for start in range(0, rows, CHUNK_ROWS):
+        size = min(CHUNK_ROWS, rows - start)
+        chunk = pd.DataFrame({"estate_id": rng.integers(0, estates, size), "market_value": np.round(rng.uniform(0, 5000000, size), 2)})
+        if investments:
+            chunk["base_cost"] = np.round(rng.uniform(0, 5000000, size), 2)
+        yield chunk
+
+
+def main(count=50000):
+    estates = make_estates(count)
+    property_rows = investment_rows = count * ASSETS_PER_ESTATE // 2
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    results = calculate_estate_liquidity_tables(
+        estates, asset_chunks(count, property_rows, False, 1), asset_chunks(count, investment_rows, True, 2)
+    )
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    # Check a sample of estates against the scalar calculator
+    sample = np.random.default_rng(3).choice(count, min(count, 100), replace=False)
+    properties = pd.concat(asset_chunks(count, property_rows, False, 1))
+    investments = pd.concat(asset_chunks(count, investment_rows, True, 2))
+    properties = properties[properties["estate_id"].isin(sample)]
+    investments = investments[investments["estate_id"].isin(sample)]
+    for estate_id in sample:
+        estate = estates.iloc[estate_id]
+        expected = calculate_estate_liquidity(
+            estate["cash"], estate["life_insurance_to_estate"],
+            properties.loc[properties["estate_id"] == estate_id, "market_value"].tolist(),
+            investments.loc[investments["estate_id"] == estate_id, ["market_value", "base_cost"]].to_dict("records"),
+            estate["other_assets"], estate["debts"], 0, 0, estate["has_surviving_spouse"], estate["spouse_bequest_value"], 0, 0.45
+        )
+        actual = results.loc[estate_id, list(ESTATE_LIQUIDITY_OUTPUTS)].to_numpy(dtype=float)
+        if not np.allclose(actual, expected, rtol=1e-9, atol=1e-4):
+            raise SystemExit(f"Estate {estate_id} differs from calculate_estate_liquidity")
+
+    print(f"estates:           {count:,}")
+    print(f"asset rows:        {property_rows + investment_rows:,}")
+    print(f"time:              {seconds:,.2f} s ({(property_rows + investment_rows) / seconds:,.0f} asset rows/s)")
+    print(f"peak memory:       {peak / 2**20:,.0f} MiB")
+    print(f"with shortfall:    {(results['liquidity_shortfall'] > 0).sum():,}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
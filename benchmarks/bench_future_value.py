@@ -0,0 +1,66 @@
+"""Benchmark the closed-form future value against the original monthly loop.
+
+Run from the repository root:  python -m benchmarks.bench_future_value [provisions]
+"""
+import sys
+import time
+
+import numpy as np
+
+from calculators import calculate_future_value
+from calculators.batch import calculate_future_value_batch
+
+
+def loop_future_value(current_value, annual_rate, years, monthly_contribution=0, annual_contribution_increase=0):
+    """calculate_future_value as it was before the closed form (years x 12 loop)."""
+    future_value = current_value
+    monthly_rate = (1 + annual_rate) ** (1/12) - 1
+    annual_contributions = monthly_contribution * 12
+    for year in range(years):
+        future_value = future_value * (1 + annual_rate)
+        for month in range(12):
+            monthly_contrib = (annual_contributions / 12) * (1 + monthly_rate) ** (11 - month)
+            future_value += monthly_contrib
+        annual_contributions *= (1 + annual_contribution_increase)
+    return future_value
+
+
+def make_provisions(count, seed=0):
+    rng = np.random.default_rng(seed)
+    current_value = np.round(rng.uniform(0, 5000000, count), 2)
+    annual_rate = np.round(rng.uniform(0, 0.20, count) * 200) / 200  # 0.5% steps like the UI
+    years = rng.integers(0, 48, count)
+    monthly_contribution = np.round(rng.uniform(0, 20000, count), 2)
+    contribution_increase = np.round(rng.uniform(0, 0.20, count) * 200) / 200
+    return current_value, annual_rate, years, monthly_contribution, contribution_increase
+
+
+def main(count=20000):
+    provisions = make_provisions(count)
+    rows = list(zip(*(column.tolist() for column in provisions)))
+
+    start = time.perf_counter()
+    expected = np.array([loop_future_value(*row) for row in rows])
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    closed = np.array([calculate_future_value(*row) for row in rows])
+    closed_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = calculate_future_value_batch(*provisions)
+    batch_seconds = time.perf_counter() - start
+
+    for name, values in (("closed form", closed), ("vectorized", batch)):
+        if not np.allclose(values, expected, rtol=1e-9, atol=1e-6):
+            worst = np.max(np.abs(values - expected) / np.maximum(np.abs(expected), 1))
+            raise SystemExit(f"{name} differs from the loop (worst relative error {worst:.3g})")
+
+    print(f"provisions:        {count:,}")
+    print(f"loop:              {loop_seconds / count * 1e6:,.2f} us/provision")
+    print(f"closed form:       {closed_seconds / count * 1e6:,.2f} us/provision ({loop_seconds / closed_seconds:,.1f}x)")
+    print(f"vectorized:        {batch_seconds / count * 1e6:,.4f} us/provision ({loop_seconds / batch_seconds:,.1f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
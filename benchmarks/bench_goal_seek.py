@@ -0,0 +1,71 @@
+"""Benchmark the vectorized retirement age solver against a year-by-year scalar search.
+
+Run from the repository root:  python -m benchmarks.bench_goal_seek [clients]
+"""
+import sys
+import time
+
+import numpy as np
+
+from calculators import calculate_retirement_plan, project_provisions
+from calculators.goal_seek import MAX_RETIREMENT_AGE, solve_retirement_age_batch
+
+PROVISION_FIELDS = ("current_value", "annual_return", "monthly_contribution", "contribution_increase")
+
+
+def scan_retirement_age(current_age, provisions, monthly_income, inflation_rate, annual_increase, preservation_years, assumed_return):
+    """Try each retirement age in turn with the scalar calculators."""
+    for retirement_age in range(current_age + 1, MAX_RETIREMENT_AGE + 1):
+        years = retirement_age - current_age
+        capital_required = calculate_retirement_plan(monthly_income, inflation_rate, annual_increase, years, True, preservation_years, assumed_return)[2]
+        if project_provisions(provisions, years)[1] >= capital_required:
+            return retirement_age
+    return None
+
+
+def make_clients(count, provisions=3, seed=0):
+    rng = np.random.default_rng(seed)
+    current_age = rng.integers(20, 60, count)
+    provision_columns = (
+        np.round(rng.uniform(0, 5000000, (count, provisions)), 2),
+        np.round(rng.uniform(0.02, 0.14, (count, provisions)) * 200) / 200,  # Down to below inflation, where the surplus can fall again
+        np.round(rng.uniform(0, 20000, (count, provisions)), 2),
+        np.round(rng.uniform(0, 0.08, (count, provisions)) * 200) / 200,
+    )
+    monthly_income = np.round(rng.uniform(5000, 60000, count), 2)
+    preservation_years = rng.choice([10, 15, 20, 25], count)
+    return current_age, provision_columns, monthly_income, preservation_years
+
+
+def main(count=5000):
+    inflation_rate, annual_increase, assumed_return = 0.06, 0.0, 0.07
+    current_age, provision_columns, monthly_income, preservation_years = make_clients(count)
+
+    start = time.perf_counter()
+    expected = []
+    for i in range(count):
+        provisions = [dict(zip(PROVISION_FIELDS, values)) for values in zip(*(column[i].tolist() for column in provision_columns))]
+        expected.append(scan_retirement_age(
+            int(current_age[i]), provisions, monthly_income[i], inflation_rate, annual_increase, int(preservation_years[i]), assumed_return
+        ))
+    scan_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ages = solve_retirement_age_batch(
+        current_age, *provision_columns, monthly_income, inflation_rate, annual_increase, preservation_years, assumed_return
+    )
+    solve_seconds = time.perf_counter() - start
+
+    solved = [None if np.isnan(age) else int(age) for age in ages]
+    mismatches = sum(got != want for got, want in zip(solved, expected))
+    if mismatches:
+        raise SystemExit(f"{mismatches:,} clients differ from the scalar search")
+
+    print(f"clients:           {count:,}")
+    print(f"scalar search:     {scan_seconds / count * 1e6:,.1f} us/client")
+    print(f"vectorized solver: {solve_seconds / count * 1e6:,.3f} us/client ({scan_seconds / solve_seconds:,.1f}x)")
+    print(f"not reachable:     {sum(age is None for age in solved):,}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,42 @@
+"""Measure the cold import time of the calculation core.
+
+Each run starts a fresh interpreter so nothing is cached in sys.modules, and checks that importing
+calculators does not pull in Streamlit, pandas or NumPy.
+
+Run from the repository root:  python -m benchmarks.bench_import [runs]
+"""
+import statistics
+import subprocess
+import sys
+
+IMPORT_BUDGET_MS = 20
+HEAVY_MODULES = ("streamlit", "pandas", "numpy")
+
+PROBE = f"""
+import sys, time
+start = time.perf_counter()
+import calculators
+elapsed = time.perf_counter() - start
+loaded = [name for name in {HEAVY_MODULES!r} if name in sys.modules]
+print(elapsed * 1000, ",".join(loaded))
+"""
+
+
+def main(runs=20):
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True, check=True).stdout.split()
+        if len(output) > 1:
+            raise SystemExit(f"importing calculators loaded: {output[1]}")
+        timings.append(float(output[0]))
+    median = statistics.median(timings)
+    print(f"runs:              {runs}")
+    print(f"median import:     {median:.2f} ms")
+    print(f"min / max:         {min(timings):.2f} / {max(timings):.2f} ms")
+    print(f"budget:            {IMPORT_BUDGET_MS} ms ({'ok' if median < IMPORT_BUDGET_MS else 'OVER BUDGET'})")
+    if median >= IMPORT_BUDGET_MS:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
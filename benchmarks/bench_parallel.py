@@ -0,0 +1,86 @@
+"""Benchmark BatchExecutor scaling on the batch calculators over millions of rows.
+
+Two cases: calculate_future_value_batch over 1-D provision columns, and the multi-year
+calculate_ra_ledger_batch over (members, years) arrays with a 1-D carried_forward, which
+checks that 2-D inputs are sharded by row rather than sent whole to every task. Each is timed
+in-process, then through BatchExecutor with 2, 4, ... workers up to max_workers (default: every
+core), and every run is checked against the in-process result. The inputs are built in shared
+memory with BatchExecutor.empty, and each executor is timed on its second run, once its
+workers have started, so the times are the calculation plus the pool's scheduling and the copy
+of the result out of shared memory.
+
+Run from the repository root:  python -m benchmarks.bench_parallel [rows] [max_workers]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+from calculators.batch import calculate_future_value_batch, calculate_ra_ledger_batch
+from calculators.parallel import CHUNK_ROWS, BatchExecutor
+
+LEDGER_YEARS = 6  # The ledger case has rows // LEDGER_YEARS members, so both cases have as many values
+
+
+def same_results(result, expected):
+    if isinstance(expected, dict):
+        return result.keys() == expected.keys() and all(np.array_equal(result[name], expected[name]) for name in expected)
+    return np.array_equal(result, expected)
+
+
+def compare(name, func, columns, worker_counts):
+    """Time func(*columns) in-process and with each worker count; arrays go in shared memory, other arguments as they are."""
+    start = time.perf_counter()
+    expected = func(*columns)
+    serial_seconds = time.perf_counter() - start
+
+    print(f"{name}, rows: {len(columns[0]):,}, shape: {columns[0].shape}")
+    print(f"  in-process:      {serial_seconds:7.3f} s")
+    for workers in worker_counts:
+        with BatchExecutor(workers=workers) as executor:
+            shared = []
+            for values in columns:
+                if isinstance(values, np.ndarray):
+                    array = executor.empty(values.shape, values.dtype)
+                    array[:] = values
+                    values = array
+                shared.append(values)
+            for _ in range(2):
+                start = time.perf_counter()
+                result = executor.run(func, *shared)
+                seconds = time.perf_counter() - start
+            shared = array = None
+        if not same_results(result, expected):
+            raise SystemExit(f"{name}: {workers} workers returned different results")
+        speedup = serial_seconds / seconds
+        print(f"  {workers:3} workers:     {seconds:7.3f} s  {speedup:5.2f}x  ({speedup / workers * 100:3.0f}% of linear)")
+
+
+def main(rows=10000000, max_workers=None):
+    max_workers = max_workers or os.cpu_count()
+    worker_counts = sorted({*(2 ** i for i in range(1, max_workers.bit_length()) if 2 ** i <= max_workers), max_workers} - {1})
+    rng = np.random.default_rng(0)
+    print(f"chunk rows: {CHUNK_ROWS:,}, cores: {os.cpu_count()}")
+    if not worker_counts:
+        print("Only one core, so there is no pool to compare; pass max_workers to run one anyway.")
+
+    compare("calculate_future_value_batch", calculate_future_value_batch, [
+        rng.uniform(0, 5e6, rows),
+        rng.uniform(0.0, 0.12, rows),
+        rng.integers(0, 45, rows).astype(np.float64),
+        rng.uniform(0, 20000, rows),
+        rng.uniform(0.0, 0.1, rows),
+    ], worker_counts)
+
+    members = rows // LEDGER_YEARS
+    compare("calculate_ra_ledger_batch", calculate_ra_ledger_batch, [
+        np.round(rng.lognormal(13, 0.8, (members, LEDGER_YEARS)), -2),
+        np.round(rng.uniform(0, 400000, (members, LEDGER_YEARS)), -2),
+        None,
+        np.round(rng.uniform(0, 100000, members), -2),
+    ], worker_counts)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,69 @@
+"""Benchmark monthly PAYE lookups from a memory-mapped table against calculating the tax.
+
+Run from the repository root:  python -m benchmarks.bench_paye_tables [employees]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from calculators import calculate_salary_tax
+from calculators.batch import calculate_salary_tax_batch
+from calculators.paye_tables import build_paye_table, load_paye_table
+
+SCALAR_SAMPLE = 20000  # Employees run through the scalar paths
+
+
+def main(employees=1000000):
+    rng = np.random.default_rng(0)
+    remuneration = np.round(rng.uniform(0, 150000, employees), 2)
+    age = rng.integers(18, 90, employees)
+    num_dependants = rng.integers(0, 6, employees)
+
+    start = time.perf_counter()
+    paye_table = build_paye_table("monthly")
+    build_seconds = time.perf_counter() - start
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "paye_monthly"
+        paye_table.save(path)
+        start = time.perf_counter()
+        paye_table = load_paye_table(path)
+        load_seconds = time.perf_counter() - start
+
+        sample = min(employees, SCALAR_SAMPLE)
+        arguments = list(zip(remuneration[:sample].tolist(), age[:sample].tolist(), num_dependants[:sample].tolist()))
+        start = time.perf_counter()
+        expected = [calculate_salary_tax(r * 12, 0, a, 0, d)[6] for r, a, d in arguments]
+        calculate_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        looked_up = [paye_table.lookup(r, a, d) for r, a, d in arguments]
+        lookup_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        calculate_salary_tax_batch(remuneration * 12, 0, age, num_dependants)
+        batch_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        batch_lookup = paye_table.lookup_batch(remuneration, age, num_dependants)
+        batch_lookup_seconds = time.perf_counter() - start
+
+        if not np.allclose(batch_lookup[:sample], looked_up):
+            raise SystemExit("lookup and lookup_batch disagree")
+        error = np.array(expected) - np.array(looked_up)
+        if error.min() < -0.005 or error.max() > paye_table.step * paye_table.top_rate + 0.005:
+            raise SystemExit("Table lookups differ from calculate_salary_tax by more than one step")
+        step = paye_table.step
+        del paye_table, batch_lookup  # Release the memory map before the directory is removed
+
+    print(f"employees:         {employees:,}")
+    print(f"build table:       {build_seconds * 1e3:,.0f} ms   load (mmap): {load_seconds * 1e3:,.2f} ms")
+    print(f"scalar calculate:  {calculate_seconds / sample * 1e6:,.2f} us/employee")
+    print(f"scalar lookup:     {lookup_seconds / sample * 1e6:,.2f} us/employee ({calculate_seconds / lookup_seconds:,.1f}x)")
+    print(f"batch calculate:   {batch_seconds / employees * 1e9:,.1f} ns/employee")
+    print(f"batch lookup:      {batch_lookup_seconds / employees * 1e9:,.1f} ns/employee ({batch_seconds / batch_lookup_seconds:,.1f}x)")
+    print(f"max error:         R {error.max():.4f} (table step R {step:g})")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
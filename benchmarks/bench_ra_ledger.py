@@ -0,0 +1,56 @@
+"""Benchmark the RA carry-forward ledger over multi-year histories.
+
+Run from the repository root:  python -m benchmarks.bench_ra_ledger [members] [years]
+"""
+import sys
+import time
+
+import numpy as np
+
+from calculators import calculate_ra_ledger
+from calculators.batch import calculate_ra_ledger_batch
+from calculators.tax import RA_LEDGER_OUTPUTS
+
+SCALAR_SAMPLE = 2000  # Members run through the scalar ledger for timing and checking
+
+
+def make_histories(members, years, seed=0):
+    rng = np.random.default_rng(seed)
+    income = np.round(rng.uniform(0, 2500000, (members, years)), 2)
+    contribution = np.round(rng.uniform(0, 600000, (members, years)), 2)
+    return income, contribution
+
+
+def main(members=100000, years=20):
+    income, contribution = make_histories(members, years)
+
+    sample = min(members, SCALAR_SAMPLE)
+    start = time.perf_counter()
+    expected = [calculate_ra_ledger([(i, c, None) for i, c in zip(income[m].tolist(), contribution[m].tolist())]) for m in range(sample)]
+    scalar_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ledger = calculate_ra_ledger_batch(income, contribution)
+    batch_seconds = time.perf_counter() - start
+
+    # Appending one more year from the last column's state, instead of rerunning the history
+    start = time.perf_counter()
+    appended = calculate_ra_ledger_batch(
+        income[:, -1:], contribution[:, -1:], carried_forward=ledger["carried_forward"][:, -1], cumulative_rebate=ledger["cumulative_rebate"][:, -1]
+    )
+    append_seconds = time.perf_counter() - start
+
+    actual = np.stack([ledger[name][:sample] for name in RA_LEDGER_OUTPUTS], axis=2)
+    if not np.allclose(actual, np.array(expected), rtol=1e-9, atol=1e-6):
+        raise SystemExit("The batch ledger differs from calculate_ra_ledger")
+    if not np.allclose(appended["cumulative_rebate"][:, 0], ledger["cumulative_rebate"][:, -1] + appended["rebate"][:, 0]):
+        raise SystemExit("Appending a year did not continue the ledger")
+
+    print(f"members x years:   {members:,} x {years}")
+    print(f"scalar ledger:     {scalar_seconds / sample * 1e6:,.1f} us/member")
+    print(f"batch ledger:      {batch_seconds / members * 1e6:,.3f} us/member ({scalar_seconds / sample / (batch_seconds / members):,.1f}x)")
+    print(f"append one year:   {append_seconds * 1e3:,.1f} ms for all members")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,56 @@
+"""Benchmark the kink-point RA optimizer against scanning contributions in R100 steps.
+
+Run from the repository root:  python -m benchmarks.bench_ra_optimizer [clients]
+"""
+import sys
+import time
+
+import numpy as np
+
+from calculators.batch import calculate_salary_tax_batch
+from calculators.ra_optimizer import optimize_ra_contribution_batch
+
+SCAN_STEP = 100.0
+SCAN_CLIENTS = 2000  # The scan is checked on this many clients; it needs thousands of PAYE runs per client
+
+
+def scan_savings(gross_salary, age, num_dependants):
+    """PAYE saved at every SCAN_STEP of contribution up to the cap, one row per client."""
+    contributions = np.arange(0, 350000 + SCAN_STEP, SCAN_STEP)
+    paye = calculate_salary_tax_batch(gross_salary[:, None], contributions[None, :], age[:, None], num_dependants[:, None])["paye"]
+    return contributions, paye[:, :1] - paye
+
+
+def main(clients=1000000):
+    rng = np.random.default_rng(0)
+    gross_salary = np.round(rng.lognormal(13, 0.8, clients), -2)
+    age = rng.integers(18, 90, clients).astype(np.float64)
+    num_dependants = rng.integers(0, 5, clients).astype(np.float64)
+
+    start = time.perf_counter()
+    optimal = optimize_ra_contribution_batch(gross_salary, age, num_dependants)
+    optimizer_seconds = time.perf_counter() - start
+
+    sample = slice(0, min(SCAN_CLIENTS, clients))
+    start = time.perf_counter()
+    contributions, savings = scan_savings(gross_salary[sample], age[sample], num_dependants[sample])
+    scan_seconds = time.perf_counter() - start
+    curves = np.array([
+        np.interp(contributions, points, rebates)
+        for points, rebates in zip(optimal["contribution_points"][sample], optimal["rebate_points"][sample])
+    ])
+    error = np.abs(curves - savings).max()
+    if error > 0.01:
+        raise SystemExit(f"The kink-point curve differs from the scan by up to R {error:,.2f}")
+    if (savings.max(axis=1) > optimal["max_rebate"][sample] + 0.01).any():
+        raise SystemExit("The scan found a larger saving than max_rebate")
+
+    scanned = savings.shape[0]
+    print(f"clients:                 {clients:,}")
+    print(f"kink-point optimizer:    {optimizer_seconds * 1e3:,.1f} ms ({optimizer_seconds / clients * 1e6:,.2f} us per client)")
+    print(f"R{SCAN_STEP:,.0f} scan:               {scan_seconds * 1e3:,.1f} ms for {scanned:,} clients ({scan_seconds / scanned * 1e6:,.0f} us per client)")
+    print(f"largest curve error:     R {error:,.4f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,78 @@
+"""Benchmark writing bulk salary tax results as Excel, Parquet, Arrow IPC and CSV.
+
+Each case runs in its own forked process, which generates and calculates the clients chunk by
+chunk exactly as a bulk upload does, so the peak memory reported is the peak resident size the
+whole run added to the process. The first case is the in-memory workbook the app used to
+build, the rest stream to a file on disk.
+
+Run from the repository root:  python -m benchmarks.bench_result_files [rows]
+"""
+import io
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from calculators.bulk import BULK_CHUNK_ROWS, RESULT_FORMATS, write_salary_tax_results, write_salary_tax_workbook
+
+
+def client_chunks(rows):
+    rng = np.random.default_rng(0)
+    for start in range(0, rows, BULK_CHUNK_ROWS):
+        size = min(BULK_CHUNK_ROWS, rows - start)
+        yield pd.DataFrame({
+            "name": [f"Client {i}" for i in range(start, start + size)],
+            "gross_salary": rng.uniform(100000, 2000000, size).round(2),
+            "pension_contribution": rng.uniform(0, 50000, size).round(2),
+            "age": rng.integers(18, 90, size),
+            "num_dependants": rng.integers(0, 5, size),
+        }), (start + size) / rows
+
+
+def peak_rss_bytes():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # Linux reports KiB
+
+
+def run_case(file_format, rows, directory, connection):
+    baseline = peak_rss_bytes()
+    start = time.perf_counter()
+    if file_format is None:
+        data, total_rows = write_salary_tax_workbook(client_chunks(rows))
+        size = len(data)
+    else:
+        path = os.path.join(directory, f"results.{file_format}")
+        total_rows = write_salary_tax_results(client_chunks(rows), path, file_format)
+        size = os.path.getsize(path)
+    seconds = time.perf_counter() - start
+    connection.send((total_rows, seconds, peak_rss_bytes() - baseline, size))
+
+
+def measure(file_format, rows, directory):
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.get_context("fork").Process(target=run_case, args=(file_format, rows, directory, sender))
+    process.start()
+    result = receiver.recv()
+    process.join()
+    return result
+
+
+def main(rows=1000000):
+    # Import-time allocations happen here, before the forks, so they are left out of every case
+    write_salary_tax_results(client_chunks(1000), io.BytesIO(), "parquet")
+    print(f"rows: {rows:,}")
+    print(f"{'format':28} {'seconds':>8} {'rows/s':>10} {'peak MiB':>9} {'file MiB':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for file_format, label in [(None, "Excel (in memory, BytesIO)"), *((key, f"{label} (file)") for key, (label, mime) in RESULT_FORMATS.items())]:
+            total_rows, seconds, peak, size = measure(file_format, rows, directory)
+            if total_rows != rows:
+                raise SystemExit(f"{label} wrote {total_rows:,} rows, expected {rows:,}")
+            print(f"{label:28} {seconds:8.2f} {rows / seconds:10,.0f} {peak / 2**20:9.1f} {size / 2**20:9.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,65 @@
+"""Benchmark bulk inserts into the result store and point lookups by inputs and by client.
+
+Run from the repository root:  python -m benchmarks.bench_result_store [records]
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from result_store import ResultStore
+
+CLIENTS = 100000
+LOOKUPS = 2000
+
+
+def salary_records(records):
+    for i in range(records):
+        gross_salary = 100000 + i * 10 % 2000000
+        yield (
+            "salary_tax", f"Client {i % CLIENTS}",
+            {"gross_salary": gross_salary, "pension_contribution": 0.0, "age": 30 + i % 50, "medical_contributions": 0.0, "num_dependants": i % 4},
+            {"PAYE (R)": gross_salary * 0.3, "Net Income (R)": gross_salary * 0.7}, 2026
+        )
+
+
+def lookup_microseconds(func, arguments):
+    times = []
+    for argument in arguments:
+        start = time.perf_counter()
+        if not func(argument):
+            raise SystemExit(f"Lookup found nothing for {argument!r}")
+        times.append((time.perf_counter() - start) * 1e6)
+    times.sort()
+    return statistics.median(times), times[int(len(times) * 0.99)]
+
+
+def main(records=1000000):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "results.sqlite3")
+        store = ResultStore(path)
+        start = time.perf_counter()
+        store.record_many(salary_records(records))
+        insert_seconds = time.perf_counter() - start
+        if store.count() != records:
+            raise SystemExit("The store lost records")
+
+        rng = random.Random(0)
+        picks = [rng.randrange(records) for _ in range(LOOKUPS)]
+        inputs = [record[2] for record in salary_records(max(picks) + 1)]
+        find_median, find_p99 = lookup_microseconds(lambda i: store.find("salary_tax", inputs[i]), picks)
+        history_median, history_p99 = lookup_microseconds(lambda i: store.history(f"Client {i % CLIENTS}", limit=1), picks)
+        size = os.path.getsize(path)
+        store.close()
+
+    print(f"records:                 {records:,}")
+    print(f"bulk insert:             {insert_seconds:,.2f} s ({records / insert_seconds:,.0f} records/s)")
+    print(f"database size:           {size / 2**20:,.1f} MiB")
+    print(f"find by inputs:          median {find_median:,.1f} us, p99 {find_p99:,.1f} us")
+    print(f"latest result by client: median {history_median:,.1f} us, p99 {history_p99:,.1f} us")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
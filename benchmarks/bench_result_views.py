@@ -0,0 +1,68 @@
+"""Benchmark paging and chart down-sampling of a large result, and the Arrow payload each sends.
+
+Run from the repository root:  python -m benchmarks.bench_result_views [rows]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from result_views import downsample_line, result_page, thin_grid
+
+
+def arrow_bytes(df):
+    """Size of df serialized as an Arrow IPC stream, which is how Streamlit sends DataFrames."""
+    sink = pa.BufferOutputStream()
+    table = pa.Table.from_pandas(df)
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().size
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main(rows=1000000):
+    rng = np.random.default_rng(0)
+    results = pd.DataFrame({
+        "estate_id": np.arange(rows),
+        "gross_estate": rng.uniform(0, 5e7, rows),
+        "total_costs": rng.uniform(0, 5e6, rows),
+        "liquidity_shortfall": np.maximum(rng.normal(0, 1e6, rows), 0),
+    })
+    series = pd.DataFrame({"Month": np.arange(rows), "Balance (R)": np.cumsum(rng.normal(0, 1000, rows))})
+    side = int(np.sqrt(rows))
+    inflation, returns = np.meshgrid(np.arange(side) / 10, np.arange(side) / 10, indexing="ij")
+    grid = pd.DataFrame({"Inflation Rate (%)": inflation.ravel(), "Assumed Return (%)": returns.ravel(), "Value": rng.random(side * side)})
+
+    page, page_seconds = timed(lambda: result_page(results, 0, 100))
+    sorted_page, sorted_seconds = timed(lambda: result_page(results, 0, 100, "liquidity_shortfall", ascending=False))
+    # About half the shortfalls are 0, so pages across the tied rows must continue each other too
+    for ascending in (False, True):
+        expected = results.sort_values("liquidity_shortfall", ascending=ascending, kind="stable")["estate_id"].to_numpy()
+        for page_number in (0, rows // 200, rows // 100 - 1):
+            page_ids = result_page(results, page_number, 100, "liquidity_shortfall", ascending)["estate_id"].to_numpy()
+            if not np.array_equal(page_ids, expected[page_number * 100:(page_number + 1) * 100]):
+                raise SystemExit(f"Sorted page {page_number} (ascending={ascending}) has different rows from sort_values")
+    line, line_seconds = timed(lambda: downsample_line(series, "Month"))
+    if line["Balance (R)"].max() != series["Balance (R)"].max() or line["Balance (R)"].min() != series["Balance (R)"].min():
+        raise SystemExit("Down-sampling lost the line's extremes")
+    heatmap, heatmap_seconds = timed(lambda: thin_grid(grid, ("Inflation Rate (%)", "Assumed Return (%)")))
+
+    print(f"rows:                    {rows:,}")
+    print(f"table, all rows:         {arrow_bytes(results) / 2**20:10,.2f} MiB")
+    print(f"table, one page:         {arrow_bytes(page) / 2**10:10,.2f} KiB ({page_seconds * 1e3:,.2f} ms)")
+    print(f"table, sorted page:      {arrow_bytes(sorted_page) / 2**10:10,.2f} KiB ({sorted_seconds * 1e3:,.2f} ms)")
+    print(f"line chart, all points:  {arrow_bytes(series) / 2**20:10,.2f} MiB")
+    print(f"line chart, thinned:     {arrow_bytes(line) / 2**10:10,.2f} KiB, {len(line):,} points ({line_seconds * 1e3:,.2f} ms)")
+    print(f"heatmap, all cells:      {arrow_bytes(grid) / 2**20:10,.2f} MiB")
+    print(f"heatmap, thinned:        {arrow_bytes(heatmap) / 2**10:10,.2f} KiB, {len(heatmap):,} cells ({heatmap_seconds * 1e3:,.2f} ms)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
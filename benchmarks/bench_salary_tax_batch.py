@@ -0,0 +1,56 @@
+"""Benchmark the scalar and vectorized salary tax paths.
+
+Run from the repository root:  python -m benchmarks.bench_salary_tax_batch [rows]
+"""
+import sys
+import time
+
+import numpy as np
+
+from calculators import calculate_salary_tax, get_tax_table
+from calculators.batch import SALARY_TAX_OUTPUTS, calculate_salary_tax_batch
+
+
+def make_payroll(rows, seed=0):
+    """Generate a random payroll of whole-rand and cent salaries."""
+    rng = np.random.default_rng(seed)
+    gross_salary = np.round(rng.uniform(0, 3000000, rows), 2)
+    pension_contribution = np.round(gross_salary * rng.uniform(0, 0.35, rows), 2)
+    age = rng.integers(18, 90, rows)
+    num_dependants = rng.integers(0, 8, rows)
+    return gross_salary, pension_contribution, age, num_dependants
+
+
+def main(rows=200000):
+    gross_salary, pension_contribution, age, num_dependants = make_payroll(rows)
+    # Include every bracket threshold (and the rand either side) so the edges are always exercised
+    thresholds = np.asarray(get_tax_table().thresholds)
+    bounds = np.concatenate([thresholds - 1, thresholds, thresholds + 1, thresholds + 0.5])
+    gross_salary[:len(bounds)] = bounds
+    pension_contribution[:len(bounds)] = 0
+
+    start = time.perf_counter()
+    scalar = [
+        calculate_salary_tax(g, p, a, 0, n)
+        for g, p, a, n in zip(gross_salary.tolist(), pension_contribution.tolist(), age.tolist(), num_dependants.tolist())
+    ]
+    scalar_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = calculate_salary_tax_batch(gross_salary, pension_contribution, age, num_dependants)
+    batch_seconds = time.perf_counter() - start
+
+    scalar_columns = np.array(scalar, dtype=np.float64).T
+    for name, expected in zip(SALARY_TAX_OUTPUTS, scalar_columns):
+        mismatches = np.count_nonzero(np.round(expected, 2) != np.round(batch[name], 2))
+        if mismatches:
+            raise SystemExit(f"{name}: {mismatches} rows differ from calculate_salary_tax")
+
+    print(f"rows:              {rows:,}")
+    print(f"scalar:            {rows / scalar_seconds:,.0f} rows/s ({scalar_seconds:.3f}s)")
+    print(f"vectorized:        {rows / batch_seconds:,.0f} rows/s ({batch_seconds:.3f}s)")
+    print(f"speedup:           {scalar_seconds / batch_seconds:,.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
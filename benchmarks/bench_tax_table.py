@@ -0,0 +1,64 @@
+"""Benchmark TaxTable's bisect bracket lookup against the old linear scan.
+
+Run from the repository root:  python -m benchmarks.bench_tax_table [lookups]
+"""
+import random
+import sys
+import time
+
+from calculators.tax_tables import TAX_TABLES, get_tax_table
+
+# The 2024/2025 brackets and get_tax_rate scan as they were before TaxTable
+LEGACY_TAX_BRACKETS = [
+    (0, 237100, 0.18, 0),
+    (237101, 370500, 0.26, 42678),
+    (370501, 512800, 0.31, 77362),
+    (512801, 673000, 0.36, 121475),
+    (673001, 857900, 0.39, 179147),
+    (857901, 1817000, 0.41, 251258),
+    (1817001, float('inf'), 0.45, 644489)
+]
+
+
+def legacy_get_tax_rate(income):
+    for lower, upper, rate, base_tax in LEGACY_TAX_BRACKETS:
+        if lower <= income <= upper:
+            return rate
+    return 0.45
+
+
+def best_of(function, incomes, repeats=5):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for income in incomes:
+            function(income)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(lookups=200000):
+    rng = random.Random(0)
+    incomes = [rng.uniform(0, 3000000) for _ in range(lookups)]
+    table = get_tax_table()
+
+    # Whole-rand incomes agree; the scan's gaps between bounds fall back to 45%
+    mismatches = sum(legacy_get_tax_rate(income) != table.marginal_rate(income) for income in range(0, 2000000, 97))
+    gap_rate = legacy_get_tax_rate(237100.5)
+
+    years = [rng.choice(sorted(TAX_TABLES)) for _ in range(lookups)]
+    registry_seconds = best_of(get_tax_table, years)
+
+    scan_seconds = best_of(legacy_get_tax_rate, incomes)
+    bisect_seconds = best_of(table.marginal_rate, incomes)
+    print(f"lookups:           {lookups:,}")
+    print(f"linear scan:       {scan_seconds / lookups * 1e9:,.0f} ns/lookup")
+    print(f"bisect:            {bisect_seconds / lookups * 1e9:,.0f} ns/lookup")
+    print(f"speedup:           {scan_seconds / bisect_seconds:,.2f}x")
+    print(f"registry lookup:   {registry_seconds / lookups * 1e9:,.0f} ns/lookup")
+    print(f"whole-rand mismatches vs scan: {mismatches}")
+    print(f"R237,100.50 marginal rate: scan {gap_rate:.2f}, bisect {table.marginal_rate(237100.5):.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,90 @@
+"""Load-test the calculation API and report p50/p99 latency.
+
+Start the service first, e.g.  uvicorn service:app --port 8000 --log-level warning
+then run from the repository root:
+
+    python -m benchmarks.load_test_api [--url http://127.0.0.1:8000] [--concurrency 64] [--requests 5000]
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+def make_body(endpoint, rng):
+    if endpoint == "/salary-tax/batch":
+        return {"clients": [{"gross_salary": round(rng.uniform(0, 2000000), 2), "age": rng.randint(18, 90), "num_dependants": rng.randint(0, 5)}]}
+    if endpoint == "/salary-tax":
+        return {"gross_salary": round(rng.uniform(0, 2000000), 2), "age": rng.randint(18, 90), "num_dependants": rng.randint(0, 5)}
+    if endpoint == "/ra-rebate":
+        return {"income": round(rng.uniform(0, 2000000), 2), "contribution": round(rng.uniform(0, 400000), 2)}
+    if endpoint == "/estate-liquidity":
+        return {"cash": rng.uniform(0, 1e6), "properties": [rng.uniform(1e6, 5e6)], "investments": [{"market_value": 2e6, "base_cost": 1e6}]}
+    return {
+        "desired_monthly_income": 30000, "current_age": rng.randint(25, 50), "retirement_age": 65, "inflation_rate": 0.06,
+        "assumed_return": 0.07, "preserve_capital": True, "preservation_years": 20,
+        "provisions": [{"current_value": 500000, "annual_return": 0.1, "monthly_contribution": 5000, "contribution_increase": 0.05}],
+    }
+
+
+async def post(reader, writer, host, path, body):
+    payload = json.dumps(body).encode()
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n".encode() + payload
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return int(status_line.split()[1])
+
+
+async def worker(url, endpoint, count, latencies, errors, seed):
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    rng = random.Random(seed)
+    try:
+        for _ in range(count):
+            start = time.perf_counter()
+            status = await post(reader, writer, parts.netloc, endpoint, make_body(endpoint, rng))
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run(url, endpoint, concurrency, requests):
+    latencies, errors = [], []
+    per_worker = max(requests // concurrency, 1)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(url, endpoint, per_worker, latencies, errors, seed) for seed in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{endpoint:<20} {len(latencies):>7,} req  {len(latencies) / elapsed:>9,.0f} req/s  "
+          f"p50 {quantiles[49] * 1000:7.2f} ms  p99 {quantiles[98] * 1000:7.2f} ms  errors {len(errors)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--endpoints", nargs="+", default=["/salary-tax", "/salary-tax/batch", "/ra-rebate", "/retirement", "/estate-liquidity"])
+    args = parser.parse_args()
+    for endpoint in args.endpoints:
+        asyncio.run(run(args.url, endpoint, args.concurrency, args.requests))
+
+
+if __name__ == "__main__":
+    main()
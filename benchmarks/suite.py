@@ -0,0 +1,260 @@
+"""Benchmark suite over every calculator and Excel export path, with stored results for comparing commits.
+
+Run from the repository root:
+
+    python -m benchmarks.suite [--sizes 1000,100000,1000000] [--filter excel] [--compare benchmarks/results/<commit>.json]
+
+Scalar calculators and the per-tool summary workbooks are timed per call; the batch calculators,
+bulk workbooks and bulk result files (Parquet, Arrow IPC, CSV) at every size in --sizes. Results
+are written as JSON to benchmarks/results/<commit>.json (or --output), and --compare prints each
+benchmark's time relative to an earlier run and exits with status 1 if any got more than
+--threshold times slower.
+The full default run takes around ten minutes, almost all of it writing the 1M-row workbooks
+(about 130 us per row); pass --sizes 1000,100000 for a quicker run.
+"""
+import argparse
+import io
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from calculators import (
+    calculate_budget,
+    calculate_estate_liquidity,
+    calculate_future_value,
+    calculate_ra_rebate,
+    calculate_retirement_plan,
+    calculate_salary_tax,
+    calculate_years_until_depletion,
+)
+from calculators.batch import (
+    calculate_depletion_years_batch,
+    calculate_estate_liquidity_batch,
+    calculate_future_value_batch,
+    calculate_ra_rebate_batch,
+    calculate_salary_tax_batch,
+)
+from calculators.bulk import (
+    BULK_CHUNK_ROWS,
+    calculate_estate_liquidity_tables,
+    write_estate_liquidity_results,
+    write_estate_liquidity_workbook,
+    write_salary_tax_results,
+    write_salary_tax_workbook,
+)
+from calculators.goal_seek import calculate_capital_required_batch
+from calculators.ra_optimizer import optimize_ra_contribution_batch
+from excel_export import build_workbook
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+DEFAULT_SIZES = (1000, 100000, 1000000)
+MIN_SECONDS = 0.5  # Keep repeating a benchmark until this much time is spent...
+MAX_RUNS = 1000  # ...or it has run this many times
+BATCH_CALL_SECONDS = 0.2  # Scalar calls are timed in batches of at least this long
+
+
+def make_clients(rows, seed=0):
+    """Random inputs for every calculator, one row per client."""
+    rng = np.random.default_rng(seed)
+    gross_salary = np.round(rng.uniform(0, 3000000, rows), 2)
+    return {
+        "gross_salary": gross_salary,
+        "pension_contribution": np.round(gross_salary * rng.uniform(0, 0.35, rows), 2),
+        "age": rng.integers(18, 90, rows),
+        "num_dependants": rng.integers(0, 8, rows),
+        "current_value": np.round(rng.uniform(0, 5000000, rows), 2),
+        "annual_return": rng.uniform(0.02, 0.12, rows),
+        "years": rng.integers(0, 40, rows),
+        "monthly_contribution": np.round(rng.uniform(0, 20000, rows), 2),
+        "contribution_increase": rng.uniform(0, 0.08, rows),
+        "monthly_income": np.round(rng.uniform(5000, 100000, rows), 2),
+        "inflation_rate": rng.uniform(0.03, 0.08, rows),
+        "preservation_years": rng.integers(0, 30, rows),
+        "cash": np.round(rng.uniform(0, 2000000, rows), 2),
+        "life_insurance_to_estate": np.round(rng.uniform(0, 3000000, rows), 2),
+        "property_value": np.round(rng.uniform(0, 10000000, rows), 2),
+        "investment_value": np.round(rng.uniform(0, 8000000, rows), 2),
+        "investment_gain": np.round(rng.uniform(0, 3000000, rows), 2),
+        "other_assets": np.round(rng.uniform(0, 1000000, rows), 2),
+        "debts": np.round(rng.uniform(0, 3000000, rows), 2),
+        "has_surviving_spouse": rng.random(rows) < 0.5,
+    }
+
+
+def scalar_cases():
+    """(name, func) pairs timed per call."""
+    provisions = [500000, 8000000]
+    investments = [{"market_value": 2000000, "base_cost": 1200000}]
+    yield "calc.calculate_salary_tax", lambda: calculate_salary_tax(650000, 50000, 45, 0, 2)
+    yield "calc.calculate_ra_rebate", lambda: calculate_ra_rebate(650000, 80000)
+    yield "calc.calculate_future_value", lambda: calculate_future_value(500000, 0.1, 25, 5000, 0.05)
+    yield "calc.calculate_years_until_depletion", lambda: calculate_years_until_depletion(8000000, 360000, 0.06, 20, 0.07)
+    yield "calc.calculate_retirement_plan", lambda: calculate_retirement_plan(30000, 0.06, 0.0, 20, True, 20, 0.07)
+    yield "calc.calculate_estate_liquidity", lambda: calculate_estate_liquidity(
+        500000, 1000000, provisions, investments, 250000, 400000, 50000, 100000, True, 3000000, 0, 0.45
+    )
+    yield "calc.calculate_budget", lambda: calculate_budget(40000, [("Housing", 12000), ("Transport", 5000), ("Food", 6000)])
+
+    # One result workbook per tool, laid out like app.py's Excel exports
+    instructions = ["This Excel file contains your summary.", "Select the data and use Insert > Chart to chart it."]
+    summary = pd.DataFrame({f"Value {i}": [float(i) * 1000] for i in range(15)})
+    chart = pd.DataFrame({"Category": [f"Category {i}" for i in range(6)], "Amount (R)": np.linspace(1000, 6000, 6)})
+    depletion = pd.DataFrame({column: np.linspace(0, 1e7, 40) for column in ("Year", "Capital (R)", "Annual Withdrawal (R)", "Monthly Income (R)")})
+    yield "excel.budget_summary", lambda: build_workbook([("Budget Summary", summary, 0), ("Budget Summary", chart, 3), ("Chart Data", chart, 0)], instructions)
+    yield "excel.ra_rebate_summary", lambda: build_workbook([("RA Rebate Summary", summary, 0)], instructions)
+    yield "excel.salary_tax_summary", lambda: build_workbook([("Salary Tax Summary", summary, 0), ("Chart Data", chart, 0)], instructions)
+    yield "excel.retirement_summary", lambda: build_workbook(
+        [("Retirement Plan Summary", summary, 0), ("Retirement Plan Summary", chart, 3), ("Chart Data", depletion, 0)], instructions
+    )
+    yield "excel.estate_liquidity_summary", lambda: build_workbook([("Estate Liquidity Summary", summary, 0)], instructions)
+
+
+def batch_cases(rows):
+    """(name, func) pairs timed at rows clients."""
+    c = make_clients(rows)
+    yield "batch.calculate_salary_tax_batch", lambda: calculate_salary_tax_batch(c["gross_salary"], c["pension_contribution"], c["age"], c["num_dependants"])
+    yield "batch.calculate_ra_rebate_batch", lambda: calculate_ra_rebate_batch(c["gross_salary"], c["pension_contribution"])
+    yield "batch.optimize_ra_contribution_batch", lambda: optimize_ra_contribution_batch(
+        c["gross_salary"], c["age"], c["num_dependants"], c["pension_contribution"]
+    )
+    yield "batch.calculate_future_value_batch", lambda: calculate_future_value_batch(
+        c["current_value"], c["annual_return"], c["years"], c["monthly_contribution"], c["contribution_increase"]
+    )
+    yield "batch.calculate_depletion_years_batch", lambda: calculate_depletion_years_batch(
+        c["current_value"] * 4, c["monthly_income"] * 12, c["annual_return"]
+    )
+    yield "batch.calculate_capital_required_batch", lambda: calculate_capital_required_batch(
+        c["monthly_income"], c["inflation_rate"], 0.0, c["years"], c["preservation_years"], c["annual_return"]
+    )
+    yield "batch.calculate_estate_liquidity_batch", lambda: calculate_estate_liquidity_batch(
+        c["cash"], c["life_insurance_to_estate"], c["property_value"], c["investment_value"], c["investment_gain"], c["other_assets"],
+        c["debts"], 50000.0, 0.0, c["has_surviving_spouse"], c["property_value"] * 0.5, 0.0, 0.45
+    )
+
+    payroll = pd.DataFrame({name: c[name] for name in ("gross_salary", "pension_contribution", "age", "num_dependants")})
+    chunks = [(payroll.iloc[start:start + BULK_CHUNK_ROWS], min((start + BULK_CHUNK_ROWS) / rows, 1.0)) for start in range(0, rows, BULK_CHUNK_ROWS)]
+    yield "excel.bulk_salary_tax_workbook", lambda: write_salary_tax_workbook(chunks)
+    for file_format in ("parquet", "arrow", "csv"):
+        yield f"export.bulk_salary_tax_{file_format}", lambda file_format=file_format: write_salary_tax_results(chunks, io.BytesIO(), file_format)
+
+    estate_ids = np.arange(rows)
+    estates = pd.DataFrame({"estate_id": estate_ids, "cash": c["cash"], "debts": c["debts"], "has_surviving_spouse": c["has_surviving_spouse"]})
+    properties = pd.DataFrame({"estate_id": np.repeat(estate_ids, 2), "market_value": np.repeat(c["property_value"] / 2, 2)})
+    investments = pd.DataFrame({"estate_id": estate_ids, "market_value": c["investment_value"], "base_cost": c["investment_value"] - c["investment_gain"]})
+    yield "bulk.calculate_estate_liquidity_tables", lambda: calculate_estate_liquidity_tables(estates, properties, investments)
+    results = calculate_estate_liquidity_tables(estates, properties, investments)
+    yield "excel.bulk_estate_liquidity_workbook", lambda: write_estate_liquidity_workbook(results)
+    for file_format in ("parquet", "arrow", "csv"):
+        yield f"export.bulk_estate_liquidity_{file_format}", lambda file_format=file_format: write_estate_liquidity_results(results, io.BytesIO(), file_format)
+
+    sweep = pd.DataFrame({f"Column {i}": c["current_value"] for i in range(9)})
+    yield "excel.scenario_sweep_workbook", lambda: build_workbook([("Scenario Sweep", sweep, 0)], ["Scenario sweep"])
+
+
+def time_call(func, calls_per_run=1):
+    """Run func until MIN_SECONDS have passed and return the seconds per call of each run."""
+    runs, spent = [], 0.0
+    while len(runs) < MAX_RUNS and (spent < MIN_SECONDS or len(runs) < 3):
+        start = time.perf_counter()
+        for _ in range(calls_per_run):
+            func()
+        seconds = time.perf_counter() - start
+        runs.append(seconds / calls_per_run)
+        spent += seconds
+        if seconds > MIN_SECONDS * 4:  # One run of a slow benchmark is enough
+            break
+    return runs
+
+
+def calls_per_run(func):
+    """How many scalar calls add up to about BATCH_CALL_SECONDS."""
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        if time.perf_counter() - start >= BATCH_CALL_SECONDS:
+            return calls
+        calls *= 10
+
+
+def record(results, name, rows, runs):
+    best, median = min(runs), statistics.median(runs)
+    results[f"{name}[{rows}]"] = {
+        "rows": rows, "runs": len(runs), "min_seconds": best, "median_seconds": median, "rows_per_second": rows / best if best else None
+    }
+    per_row = f"{best / rows * 1e6:10,.3f} us/row" if rows > 1 else ""
+    print(f"{name + f'[{rows:,}]':<52} {best * 1e3:12,.3f} ms  (median {median * 1e3:,.3f} ms, {len(runs)} runs) {per_row}")
+
+
+def git_commit():
+    """Short hash of HEAD, with -dirty if the tree has uncommitted changes."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def compare(results, baseline_path, threshold):
+    """Print each benchmark's time relative to a stored run; return how many regressed past threshold."""
+    baseline = json.loads(Path(baseline_path).read_text())
+    print(f"\ncompared with {baseline['commit']} ({baseline['created']}):")
+    regressions = 0
+    for key, entry in results.items():
+        previous = baseline["results"].get(key)
+        if previous is None:
+            continue
+        ratio = entry["min_seconds"] / previous["min_seconds"]
+        flag = "  SLOWER" if ratio > threshold else ("  faster" if ratio < 1 / threshold else "")
+        regressions += ratio > threshold
+        print(f"{key:<52} {ratio:8.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="comma-separated batch sizes")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--output", help="results file (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="slowdown ratio reported as a regression")
+    args = parser.parse_args()
+
+    results = {}
+    for name, func in scalar_cases():
+        if args.filter in name:
+            record(results, name, 1, time_call(func, calls_per_run(func)))
+    for rows in (int(size) for size in args.sizes.split(",") if size):
+        for name, func in batch_cases(rows):
+            if args.filter in name:
+                record(results, name, rows, time_call(func))
+
+    commit = git_commit()
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        "commit": commit,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": f"{platform.system()} {platform.machine()} {platform.processor()}".strip(),
+        "results": results,
+    }, indent=2) + "\n")
+    print(f"\nresults written to {output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Process-wide LRU cache for the pure calculator functions.
+
+Streamlit reruns app.py on every widget interaction, so the interface calls the calculators
+through cached() wrappers. Results are keyed on the function, its normalized arguments and the
+tax table fingerprint, expire after a TTL, and the least recently used entries are evicted once
+the cache holds max_entries results or their approximate size (session_memory.deep_size)
+exceeds max_bytes, so a few large sweep grids or Monte Carlo results can't grow it without
+bound. Cached results are shared between sessions, so each caller gets its own copy of the
+lists, dicts and sets in a result, and NumPy arrays (shared, not copied) are made read-only.
+"""
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from numbers import Number
+
+import numpy as np
+
+from calculators.tax_tables import TAX_TABLES_FINGERPRINT
+from session_memory import deep_size
+
+CACHE_MAX_ENTRIES = 4096
+CACHE_MAX_BYTES = 256 * 2 ** 20
+CACHE_TTL_SECONDS = 3600
+
+
+class _Unhashable(Exception):
+    pass
+
+
+class _NaN:
+    """Key for every NaN argument; NaN never equals itself, so it can't be a key as it is."""
+
+    def __repr__(self):
+        return "nan"
+
+
+_NAN = _NaN()
+
+
+def normalize_key(value):
+    """Turn calculator arguments into a hashable key; 1, 1.0 and numpy scalars compare equal."""
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, Number):
+        value = float(value)
+        return _NAN if value != value else value
+    if isinstance(value, (list, tuple)):
+        return tuple(normalize_key(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, normalize_key(item)) for key, item in value.items()))
+    raise _Unhashable(type(value).__name__)
+
+
+def _freeze(value):
+    """Make the NumPy arrays in a result read-only before it is shared."""
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, dict):
+        for item in value.values():
+            _freeze(item)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            _freeze(item)
+    return value
+
+
+def _copy(value):
+    """A copy of a cached result's containers for one caller; arrays and scalars are shared."""
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _copy(item) for key, item in value.items()}
+    if isinstance(value, set):
+        return {_copy(item) for item in value}
+    if isinstance(value, tuple):
+        return tuple(_copy(item) for item in value)
+    return value
+
+
+class CalculationCache:
+    """Thread-safe LRU cache with entry and byte limits, a time-to-live and hit/miss counters.
+
+    A result larger than max_bytes on its own is returned without being stored (counted in
+    "oversized").
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, max_bytes=CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, result, nbytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = self.bypasses = self.oversized = 0
+
+    def get_or_compute(self, func, args, kwargs):
+        """Return func(*args, **kwargs), computing and storing it only on a miss."""
+        try:
+            key = (func.__module__, func.__qualname__, normalize_key(args), normalize_key(kwargs), TAX_TABLES_FINGERPRINT)
+        except _Unhashable:
+            with self._lock:
+                self.bypasses += 1
+            return func(*args, **kwargs)
+        return self.get_or_set(key, lambda: func(*args, **kwargs))
+
+    def get_or_set(self, key, compute):
+        """Return the cached value for a hashable key, calling compute() only on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return _copy(entry[1])
+                self._bytes -= self._entries.pop(key)[2]
+                self.expirations += 1
+            self.misses += 1
+        # Compute and measure outside the lock so slow calculations don't block other sessions
+        result = _freeze(compute())
+        nbytes = deep_size(result)
+        with self._lock:
+            if nbytes > self.max_bytes:
+                self.oversized += 1
+                return result
+            previous = self._entries.pop(key, None)  # Another session computed it meanwhile
+            if previous is not None:
+                self._bytes -= previous[2]
+            self._entries[key] = (now + self.ttl, result, nbytes)
+            self._bytes += nbytes
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._bytes -= self._entries.popitem(last=False)[1][2]
+                self.evictions += 1
+        return _copy(result)
+
+    def wrap(self, func):
+        """Return a cached version of func."""
+        @wraps(func)
+        def cached_func(*args, **kwargs):
+            return self.get_or_compute(func, args, kwargs)
+        return cached_func
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Return the hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "bypasses": self.bypasses,
+                "oversized": self.oversized,
+            }
+
+
+CALCULATION_CACHE = CalculationCache()
+
+
+def cached(func):
+    """Wrap a pure calculator function with the shared CALCULATION_CACHE."""
+    return CALCULATION_CACHE.wrap(func)
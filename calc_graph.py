@@ -0,0 +1,76 @@
+"""Per-session dependency graph for incremental recalculation.
+
+A tool declares its widget values as inputs and each calculation step as a node over named
+inputs and other nodes. The graph's state lives in a dict kept between Streamlit reruns
+(st.session_state), and each node records the versions of its dependencies, so on the next
+rerun only nodes downstream of an input that actually changed are recomputed; everything
+else is reused. A node whose recomputed value is unchanged does not invalidate its dependents.
+"""
+import time
+
+from calc_cache import _Unhashable, normalize_key
+
+
+def _value_key(value):
+    # Values that can't be normalized never compare equal, so their dependents always rerun
+    try:
+        return normalize_key(value)
+    except _Unhashable:
+        return _Unhashable
+
+
+class CalculationGraph:
+    """Dependency-tracked, memoized calculation steps for one tool in one session."""
+
+    def __init__(self, state):
+        self._entries = state  # name -> {"key", "value", "version", "deps"}
+        self._touched = set()
+        self.changed_inputs = []
+        self.recomputed = {}  # node name -> seconds spent recomputing it
+        self.reused = []
+
+    def _store(self, name, value, deps=None):
+        entry = self._entries.get(name)
+        key = _value_key(value)
+        if entry is not None and key is not _Unhashable and entry["key"] == key:
+            # Same value as before: keep the version so dependents stay valid
+            entry["deps"] = deps
+            return False
+        version = entry["version"] + 1 if entry is not None else 1
+        self._entries[name] = {"key": key, "value": value, "version": version, "deps": deps}
+        return True
+
+    def input(self, name, value):
+        """Set an input for this run and return it."""
+        self._touched.add(name)
+        if self._store(name, value):
+            self.changed_inputs.append(name)
+        return value
+
+    def node(self, name, func, *deps):
+        """Return func(*values of deps), recomputing only if a dependency changed since the last run."""
+        self._touched.add(name)
+        dep_versions = tuple((dep, self._entries[dep]["version"]) for dep in deps)
+        entry = self._entries.get(name)
+        if entry is not None and entry["deps"] == dep_versions:
+            self.reused.append(name)
+            return entry["value"]
+        start = time.perf_counter()
+        value = func(*(self._entries[dep]["value"] for dep in deps))
+        self.recomputed[name] = time.perf_counter() - start
+        self._store(name, value, dep_versions)
+        return self._entries[name]["value"]
+
+    def finish(self):
+        """Drop inputs and nodes not used in this run (e.g. removed provisions) and return the run report."""
+        for name in [name for name in self._entries if name not in self._touched]:
+            del self._entries[name]
+        return self.report()
+
+    def report(self):
+        """Which inputs changed and which nodes were recomputed (with milliseconds) or reused in this run."""
+        return {
+            "changed_inputs": list(self.changed_inputs),
+            "recomputed_ms": {name: round(seconds * 1000, 3) for name, seconds in self.recomputed.items()},
+            "reused": list(self.reused),
+        }
@@ -0,0 +1,39 @@
+"""Navigate Wealth calculation core.
+
+Pure calculator functions with no Streamlit, pandas or NumPy import at load time, so batch
+jobs and services can import them cheaply. Vectorized and bulk helpers live in the
+calculators.batch, calculators.bulk, calculators.goal_seek, calculators.monte_carlo,
+calculators.parallel, calculators.paye_tables, calculators.ra_optimizer and calculators.sweep
+submodules, which import NumPy/pandas and are only loaded when imported explicitly.
+"""
+from .budget import calculate_budget
+from .estate import (
+    CGT_EXCLUSION_DEATH,
+    CGT_INCLUSION_RATE,
+    ESTATE_DUTY_ABATEMENT,
+    ESTATE_DUTY_RATE_1,
+    ESTATE_DUTY_RATE_2,
+    ESTATE_DUTY_THRESHOLD,
+    ESTATE_LIQUIDITY_OUTPUTS,
+    EXECUTOR_FEE_RATE,
+    VAT_RATE,
+    calculate_cgt,
+    calculate_estate_duty,
+    calculate_estate_liquidity,
+    calculate_executor_fees,
+)
+from .retirement import (
+    DEPLETION_HORIZON_YEARS,
+    FULL_WITHDRAWAL_LIMIT,
+    MAX_DRAWDOWN_RATE,
+    average_contribution_increase,
+    calculate_additional_savings_needed,
+    calculate_future_value,
+    calculate_retirement_plan,
+    calculate_years_until_depletion,
+    combine_provisions,
+    project_provision,
+    project_provisions,
+)
+from .tax import calculate_medical_tax_credits, calculate_ra_ledger, calculate_ra_rebate, calculate_salary_tax, get_tax_rate
+from .tax_tables import DEFAULT_TAX_YEAR, TAX_TABLES, TAX_TABLES_FINGERPRINT, TaxTable, get_tax_table
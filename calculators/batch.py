@@ -0,0 +1,279 @@
+"""Vectorized (NumPy) versions of the calculators for whole-payroll and multi-client runs."""
+import numpy as np
+
+from .estate import (
+    CGT_EXCLUSION_DEATH,
+    CGT_INCLUSION_RATE,
+    ESTATE_DUTY_ABATEMENT,
+    ESTATE_DUTY_RATE_1,
+    ESTATE_DUTY_RATE_2,
+    ESTATE_DUTY_THRESHOLD,
+    ESTATE_LIQUIDITY_OUTPUTS,
+    EXECUTOR_FEE_RATE,
+    VAT_RATE,
+)
+from .retirement import DEPLETION_HORIZON_YEARS, FULL_WITHDRAWAL_LIMIT, MAX_DRAWDOWN_RATE
+from .tax import RA_LEDGER_OUTPUTS, SALARY_TAX_OUTPUTS
+from .tax_tables import get_tax_table
+
+# Batch Salary Tax Functions (whole-payroll runs)
+SALARY_TAX_INPUTS = ("gross_salary", "pension_contribution", "age", "num_dependants")
+
+def _bracket_index(table, income):
+    # Locate each income's bracket by its lower threshold, like TaxTable.bracket_index
+    return np.maximum(np.searchsorted(np.asarray(table.thresholds), income, side="left") - 1, 0)
+
+def calculate_medical_tax_credits_batch(num_dependants, tax_year=None):
+    """Vectorized calculate_medical_tax_credits over an array of dependant counts."""
+    table = get_tax_table(tax_year)
+    num_dependants = np.asarray(num_dependants, dtype=np.float64)
+    annual_mtc = np.where(
+        num_dependants <= 2,
+        num_dependants * table.mtc_per_person * 12,
+        (2 * table.mtc_per_person * 12) + ((num_dependants - 2) * table.mtc_additional_dependant * 12)
+    )
+    annual_mtc = np.where(num_dependants <= 0, 0.0, annual_mtc)
+    monthly_mtc = annual_mtc / 12
+    return annual_mtc, monthly_mtc
+
+def calculate_salary_tax_batch(gross_salary, pension_contribution, age, num_dependants, tax_year=None):
+    """Calculate PAYE, UIF, MTC and net income for many employees in one vectorized pass.
+
+    Takes equal-length arrays (or scalars, which are broadcast) and returns a dict of
+    NumPy arrays keyed by SALARY_TAX_OUTPUTS, matching calculate_salary_tax row for row.
+    """
+    gross_salary, pension_contribution, age, num_dependants = np.broadcast_arrays(
+        *(np.asarray(values, dtype=np.float64) for values in (gross_salary, pension_contribution, age, num_dependants))
+    )
+    table = get_tax_table(tax_year)
+
+    # Step 1: Calculate Taxable Income
+    max_deductible = np.minimum(gross_salary * table.ra_deduction_rate, table.ra_deduction_cap)
+    deductible_contribution = np.minimum(pension_contribution, max_deductible)
+    taxable_income = np.maximum(0, gross_salary - deductible_contribution)
+
+    # Step 2: Calculate PAYE before MTC, locating each bracket by its lower threshold
+    thresholds = np.asarray(table.thresholds)
+    rates = np.asarray(table.rates)
+    base_taxes = np.asarray(table.base_taxes)
+    index = _bracket_index(table, taxable_income)
+    taxed = taxable_income > 0
+    tax_before_rebates = np.where(taxed, base_taxes[index] + (taxable_income - thresholds[index]) * rates[index], 0.0)
+    marginal_rate = np.where(taxed, rates[index], 0.0)
+
+    # Apply rebates based on age
+    total_rebate = np.full(age.shape, float(table.primary_rebate))
+    total_rebate = np.where(age >= 65, total_rebate + table.secondary_rebate, total_rebate)
+    total_rebate = np.where(age >= 75, total_rebate + table.tertiary_rebate, total_rebate)
+    paye_before_mtc = np.maximum(0, tax_before_rebates - total_rebate)
+    paye_before_mtc_monthly = paye_before_mtc / 12
+
+    # Step 3: Calculate Medical Tax Credits
+    mtc_annual, mtc_monthly = calculate_medical_tax_credits_batch(num_dependants, tax_year)
+    paye = np.maximum(0, paye_before_mtc - mtc_annual)
+    paye_monthly = paye / 12
+
+    # Step 4: Calculate UIF (employee contribution)
+    uif = np.minimum(gross_salary, table.uif_annual_cap) * table.uif_rate
+    uif_monthly = uif / 12
+
+    # Step 5: Calculate Net Income
+    net_income = gross_salary - paye - uif
+    net_income_monthly = net_income / 12
+
+    values = (taxable_income, paye_before_mtc, paye_before_mtc_monthly, mtc_annual, mtc_monthly, paye, paye_monthly, uif, uif_monthly, net_income, net_income_monthly, marginal_rate)
+    return dict(zip(SALARY_TAX_OUTPUTS, values))
+
+def calculate_salary_tax_frame(df, tax_year=None):
+    """Run calculate_salary_tax_batch over a DataFrame with SALARY_TAX_INPUTS columns.
+
+    Returns a copy of the input with one column appended per SALARY_TAX_OUTPUTS entry.
+    """
+    missing = [column for column in SALARY_TAX_INPUTS if column not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    results = calculate_salary_tax_batch(*(df[column].to_numpy() for column in SALARY_TAX_INPUTS), tax_year=tax_year)
+    return df.assign(**results)
+
+# RA Contribution Batch Functions
+def calculate_ra_rebate_batch(income, contribution, tax_year=None):
+    """Vectorized calculate_ra_rebate; returns (deductible, tax_rate, rebate, excess) arrays."""
+    income, contribution = np.broadcast_arrays(np.asarray(income, dtype=np.float64), np.asarray(contribution, dtype=np.float64))
+    table = get_tax_table(tax_year)
+    max_deductible = np.minimum(income * table.ra_deduction_rate, table.ra_deduction_cap)
+    deductible = np.minimum(contribution, max_deductible)
+    excess = np.maximum(0, contribution - max_deductible)
+    tax_rate = np.asarray(table.rates)[_bracket_index(table, income)]
+    return deductible, tax_rate, deductible * tax_rate, excess
+
+def calculate_ra_ledger_batch(income, contribution, tax_years=None, carried_forward=0, cumulative_rebate=0):
+    """Vectorized calculate_ra_ledger for many members.
+
+    income and contribution are (members, years) arrays and tax_years lists each column's tax
+    year (None for the default table throughout). Returns a dict of (members, years) arrays
+    keyed by RA_LEDGER_OUTPUTS. To append later years, pass the last column of carried_forward
+    and cumulative_rebate back in as the starting state.
+    """
+    income, contribution = np.broadcast_arrays(np.atleast_2d(np.asarray(income, dtype=np.float64)), np.atleast_2d(np.asarray(contribution, dtype=np.float64)))
+    members, years = income.shape
+    tax_years = [None] * years if tax_years is None else list(tax_years)
+    if len(tax_years) != years:
+        raise ValueError("tax_years must list one tax year per column.")
+    # Year-major so each year writes one contiguous row; returned transposed
+    results = {name: np.empty((years, members)) for name in RA_LEDGER_OUTPUTS}
+    carried_forward = np.broadcast_to(np.asarray(carried_forward, dtype=np.float64), (members,))
+    cumulative_rebate = np.broadcast_to(np.asarray(cumulative_rebate, dtype=np.float64), (members,))
+    for year, tax_year in enumerate(tax_years):
+        deductible, tax_rate, rebate, carried_forward = calculate_ra_rebate_batch(income[:, year], contribution[:, year] + carried_forward, tax_year)
+        cumulative_rebate = cumulative_rebate + rebate
+        for name, values in zip(RA_LEDGER_OUTPUTS, (deductible, tax_rate, rebate, carried_forward, cumulative_rebate)):
+            results[name][year] = values
+    return {name: values.T for name, values in results.items()}
+
+# Retirement Batch Functions
+def calculate_future_value_batch(current_value, annual_rate, years, monthly_contribution=0, annual_contribution_increase=0):
+    """Vectorized calculate_future_value over arrays of provisions (scalars are broadcast)."""
+    current_value, annual_rate, years, monthly_contribution, annual_contribution_increase = np.broadcast_arrays(
+        *(np.asarray(values, dtype=np.float64) for values in (current_value, annual_rate, years, monthly_contribution, annual_contribution_increase))
+    )
+    years = np.maximum(years, 0)
+    growth = (1 + annual_rate) ** years
+    monthly_rate = (1 + annual_rate) ** (1/12) - 1
+    rate_gap = annual_rate - annual_contribution_increase
+    same_rate = np.abs(rate_gap) < 1e-12
+    with np.errstate(divide="ignore", invalid="ignore"):
+        months_factor = np.where(monthly_rate != 0, annual_rate / monthly_rate, 12.0)
+        years_factor = np.where(
+            same_rate,
+            years * (1 + annual_rate) ** (years - 1),
+            (growth - (1 + annual_contribution_increase) ** years) / np.where(same_rate, 1.0, rate_gap)
+        )
+    return current_value * growth + monthly_contribution * months_factor * years_factor
+
+def _withdraw_year(current_capital, annual_income, assumed_return):
+    # Withdraw at the start of the year (capped at 17.5%), then apply the return to the rest
+    withdrawal = np.minimum(annual_income, current_capital * MAX_DRAWDOWN_RATE)
+    return withdrawal, (current_capital - withdrawal) * (1 + assumed_return)
+
+def _perpetual(current_capital, next_capital, withdrawal, annual_income):
+    """Rows whose capital can never be depleted.
+
+    With a constant income and return, capital that does not fall over a year in which the
+    full income was withdrawn is at or above the level income * (1 + r) / r that the return
+    alone sustains, so it grows every year after that too.
+    """
+    return (next_capital >= current_capital) & (withdrawal >= annual_income)
+
+def calculate_depletion_years_batch(capital, annual_income, assumed_return, horizon=DEPLETION_HORIZON_YEARS):
+    """Vectorized years value of calculate_years_until_depletion (scalars are broadcast).
+
+    Follows the same rules: the withdrawal at the start of each year is capped at 17.5% of
+    capital, and capital at or below R125,000 is withdrawn in full in one final year. Capital
+    that is never depleted, or outlasts horizon years, returns inf. Rows stop being stepped as
+    soon as they deplete or are detected as perpetual.
+    """
+    capital, annual_income, assumed_return = np.broadcast_arrays(
+        *(np.asarray(values, dtype=np.float64) for values in (capital, annual_income, assumed_return))
+    )
+    current_capital = capital.copy()
+    years = np.where(capital > 0, np.inf, 0.0)
+    alive = capital > 0
+    for year in range(horizon):
+        full_withdrawal = alive & (current_capital <= FULL_WITHDRAWAL_LIMIT)
+        years[full_withdrawal] = year + 1
+        alive &= ~full_withdrawal
+        if not alive.any():
+            break
+        withdrawal, next_capital = _withdraw_year(current_capital, annual_income, assumed_return)
+        alive &= ~_perpetual(current_capital, next_capital, withdrawal, annual_income)
+        current_capital = np.where(alive, next_capital, current_capital)
+    return years
+
+def calculate_depletion_trajectory_batch(capital, annual_income, assumed_return, horizon=DEPLETION_HORIZON_YEARS):
+    """Vectorized calculate_years_until_depletion, including the year-by-year trajectory.
+
+    Returns (years, capital, withdrawals): years is inf where capital is never depleted within
+    horizon years, and capital and withdrawals are preallocated (clients, horizon + 1) arrays
+    holding the capital at the start of each year and that year's withdrawal, zero after
+    depletion. Once a row is perpetual the rest of its trajectory is filled in closed form,
+    capital approaching income * (1 + r) / r geometrically, instead of being stepped.
+    """
+    capital, annual_income, assumed_return = np.broadcast_arrays(
+        *(np.asarray(values, dtype=np.float64) for values in (np.atleast_1d(capital), annual_income, assumed_return))
+    )
+    # Stored year-major so each year's update writes one contiguous row
+    capital_over_time = np.zeros((horizon + 1, capital.shape[0]))
+    withdrawals = np.zeros((horizon + 1, capital.shape[0]))
+    capital_over_time[0] = capital
+    years = np.where(capital > 0, np.inf, 0.0)
+    alive = capital > 0
+    steps = np.arange(horizon + 1)[:, None]
+    for year in range(horizon):
+        current_capital = capital_over_time[year]
+        # Full withdrawal once capital is at or below the R125,000 threshold
+        full_withdrawal = alive & (current_capital <= FULL_WITHDRAWAL_LIMIT)
+        withdrawals[year] = np.where(full_withdrawal, current_capital, 0.0)
+        years[full_withdrawal] = year + 1
+        alive &= ~full_withdrawal
+        if not alive.any():
+            break
+        withdrawal, next_capital = _withdraw_year(current_capital, annual_income, assumed_return)
+        withdrawals[year] = np.where(alive, withdrawal, withdrawals[year])
+        capital_over_time[year + 1] = np.where(alive, next_capital, 0.0)
+        perpetual = alive & _perpetual(current_capital, next_capital, withdrawal, annual_income)
+        if perpetual.any():
+            rows = np.flatnonzero(perpetual)
+            rate = assumed_return[rows]
+            # C_t = C* + (C_0 - C*)(1 + r)^t with C* = I(1 + r)/r; constant capital when r = 0 (no income)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                steady = annual_income[rows] * (1 + rate) / rate
+                path = np.where(rate > 0, steady + (next_capital[rows] - steady) * (1 + rate) ** steps[:horizon - year], next_capital[rows])
+            capital_over_time[year + 1:, rows] = path
+            withdrawals[year + 1:, rows] = annual_income[rows]
+            alive &= ~perpetual
+    # Capital still declining at the horizon: record the withdrawal due at its start
+    withdrawals[horizon, alive] = np.minimum(annual_income, capital_over_time[horizon] * MAX_DRAWDOWN_RATE)[alive]
+    return years, capital_over_time.T, withdrawals.T
+
+# Estate Liquidity Batch Functions (client book reviews)
+def calculate_estate_liquidity_batch(cash, life_insurance_to_estate, property_value, investment_value, investment_gain, other_assets, debts,
+                                     medical_bills, cash_bequests, has_surviving_spouse, spouse_bequest_value, pbo_bequest_value, marginal_tax_rate):
+    """Vectorized calculate_estate_liquidity over arrays of estates (scalars are broadcast).
+
+    Each estate's properties and investments are passed as totals: property_value and
+    investment_value are the summed market values, and investment_gain is the sum of each
+    investment's gain floored at zero. Returns a dict of arrays keyed by ESTATE_LIQUIDITY_OUTPUTS.
+    """
+    (cash, life_insurance_to_estate, property_value, investment_value, investment_gain, other_assets, debts,
+     medical_bills, cash_bequests, spouse_bequest_value, pbo_bequest_value, marginal_tax_rate) = np.broadcast_arrays(
+        *(np.asarray(values, dtype=np.float64) for values in (
+            cash, life_insurance_to_estate, property_value, investment_value, investment_gain, other_assets, debts,
+            medical_bills, cash_bequests, spouse_bequest_value, pbo_bequest_value, marginal_tax_rate
+        ))
+    )
+    has_surviving_spouse = np.broadcast_to(np.asarray(has_surviving_spouse, dtype=bool), cash.shape)
+
+    # Gross and net estate value
+    gross_estate = cash + life_insurance_to_estate + property_value + investment_value + other_assets
+    net_estate = gross_estate - debts - medical_bills - cash_bequests
+
+    # Capital gains tax after the R300,000 exclusion in the year of death
+    cgt = np.maximum(0, investment_gain - CGT_EXCLUSION_DEATH) * CGT_INCLUSION_RATE * marginal_tax_rate
+
+    # Estate duty after spouse and PBO deductions and the abatement; deferred if there is a surviving spouse
+    dutiable_value = np.maximum(0, np.maximum(0, net_estate - spouse_bequest_value - pbo_bequest_value) - ESTATE_DUTY_ABATEMENT)
+    estate_duty = np.where(
+        dutiable_value <= ESTATE_DUTY_THRESHOLD,
+        dutiable_value * ESTATE_DUTY_RATE_1,
+        ESTATE_DUTY_THRESHOLD * ESTATE_DUTY_RATE_1 + (dutiable_value - ESTATE_DUTY_THRESHOLD) * ESTATE_DUTY_RATE_2
+    )
+    estate_duty = np.where(has_surviving_spouse, 0.0, estate_duty)
+
+    # Executor fees including VAT, and liquidity
+    executor_fees = gross_estate * EXECUTOR_FEE_RATE * (1 + VAT_RATE)
+    total_costs = cgt + estate_duty + executor_fees
+    liquid_assets = cash + life_insurance_to_estate
+    liquidity_shortfall = np.maximum(0, total_costs - liquid_assets)
+
+    values = (gross_estate, net_estate, cgt, estate_duty, executor_fees, total_costs, liquid_assets, liquidity_shortfall)
+    return dict(zip(ESTATE_LIQUIDITY_OUTPUTS, values))
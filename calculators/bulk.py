@@ -0,0 +1,300 @@
+"""Streaming bulk salary tax and estate liquidity runs over uploaded CSV/XLSX client files.
+
+Results are written chunk by chunk to Excel (.xlsx), Parquet, Arrow IPC or CSV. The columnar
+formats have no row limit and write each chunk as soon as it is calculated, so a file of
+millions of results never has to be held in memory.
+"""
+import io
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv
+import pyarrow.parquet
+import xlsxwriter
+
+from .batch import SALARY_TAX_INPUTS, calculate_estate_liquidity_batch, calculate_salary_tax_frame
+
+# Bulk Upload Functions
+BULK_CHUNK_ROWS = 50000  # Clients per chunk when streaming an uploaded file
+EXCEL_MAX_ROWS = 1048576  # Rows per worksheet, including the header row
+# Result file formats: (label, MIME type)
+RESULT_FORMATS = {
+    "xlsx": ("Excel (.xlsx)", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "parquet": ("Parquet", "application/vnd.apache.parquet"),
+    "arrow": ("Arrow IPC", "application/vnd.apache.arrow.file"),
+    "csv": ("CSV", "text/csv"),
+}
+PARQUET_COMPRESSION = "zstd"
+MAX_REPORTED_LINES = 10  # File lines listed in an invalid-value error
+ESTATE_INPUT_DEFAULTS = {
+    "cash": 0.0,
+    "life_insurance_to_estate": 0.0,
+    "other_assets": 0.0,
+    "debts": 0.0,
+    "medical_bills": 0.0,
+    "cash_bequests": 0.0,
+    "has_surviving_spouse": False,
+    "spouse_bequest_value": 0.0,
+    "pbo_bequest_value": 0.0,
+    "marginal_tax_rate": 0.45,
+}
+
+def normalize_columns(df):
+    """Map headings like 'Gross Salary' onto the snake_case input names."""
+    df.columns = [str(column).strip().lower().replace(" ", "_") for column in df.columns]
+    return df
+
+def read_client_chunks(file, file_name, chunk_rows=BULK_CHUNK_ROWS):
+    """Yield (DataFrame, fraction_done) pairs of at most chunk_rows clients from a CSV or XLSX file.
+
+    Each chunk's index counts data rows from 0 across the whole file, so row i is on line i + 2.
+    """
+    extension = file_name.rsplit(".", 1)[-1].lower()
+    if extension == "csv":
+        size = max(getattr(file, "size", 0), 1)
+        for chunk in pd.read_csv(file, chunksize=chunk_rows):
+            yield normalize_columns(chunk), min(file.tell() / size, 1.0)
+    elif extension == "xlsx":
+        from openpyxl import load_workbook
+        # read_only mode streams rows from the sheet XML instead of building the whole workbook
+        workbook = load_workbook(file, read_only=True, data_only=True)
+        try:
+            sheet = workbook.active
+            total_rows = max((sheet.max_row or 1) - 1, 1)
+            rows = sheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            chunk, rows_read = [], 0
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) == chunk_rows:
+                    yield normalize_columns(pd.DataFrame(chunk, columns=header, index=range(rows_read, rows_read + len(chunk)))), min((rows_read + len(chunk)) / total_rows, 1.0)
+                    rows_read += len(chunk)
+                    chunk = []
+            if chunk:
+                yield normalize_columns(pd.DataFrame(chunk, columns=header, index=range(rows_read, rows_read + len(chunk)))), 1.0
+        finally:
+            workbook.close()
+    else:
+        raise ValueError("Unsupported file type. Please upload a .csv or .xlsx file.")
+
+class _ResultSheets:
+    """Append result rows to a constant_memory workbook, starting a new sheet at Excel's row limit."""
+
+    def __init__(self, file, title, instructions):
+        self.workbook = xlsxwriter.Workbook(file, {"constant_memory": True, "nan_inf_to_errors": True})
+        self.title = title
+        self.instructions = instructions
+        self.worksheet, self.sheet_row, self.sheet_number = None, EXCEL_MAX_ROWS, 0
+
+    def append(self, results):
+        for row in results.itertuples(index=False, name=None):
+            if self.sheet_row >= EXCEL_MAX_ROWS:
+                self.sheet_number += 1
+                self.worksheet = self.workbook.add_worksheet(self.title if self.sheet_number == 1 else f"{self.title} {self.sheet_number}")
+                self.worksheet.write_row(0, 0, results.columns)
+                self.sheet_row = 1
+            self.worksheet.write_row(self.sheet_row, 0, row)
+            self.sheet_row += 1
+
+    def close(self):
+        # Add a note sheet for instructions
+        self.workbook.add_worksheet("Instructions").write_column(0, 0, ["Instructions", *self.instructions])
+        self.workbook.close()
+
+class _ResultTable:
+    """Append result chunks to a Parquet (one row group per chunk), Arrow IPC or CSV file.
+
+    The first chunk fixes the schema; later chunks are cast to it, so a column that is whole
+    numbers in the first chunk of an upload must stay whole numbers.
+    """
+
+    def __init__(self, file, file_format):
+        self.file = file
+        self.file_format = file_format
+        self.writer = None
+
+    def append(self, results):
+        table = pa.Table.from_pandas(results, preserve_index=False)
+        if self.writer is None:
+            if self.file_format == "parquet":
+                self.writer = pyarrow.parquet.ParquetWriter(self.file, table.schema, compression=PARQUET_COMPRESSION)
+            elif self.file_format == "arrow":
+                self.writer = pa.ipc.new_file(self.file, table.schema)
+            else:
+                self.writer = pyarrow.csv.CSVWriter(self.file, table.schema)
+            self.schema = table.schema
+        elif not table.schema.equals(self.schema):
+            try:
+                table = table.cast(self.schema)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+                raise ValueError(f"A later chunk of the results doesn't match the columns of the first: {e}") from e
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+def open_result_file(file, file_format, title, instructions):
+    """Open a result writer with append(results) and close() for one of RESULT_FORMATS.
+
+    file is a path or a binary file object. The Excel title names the result sheets and the
+    instructions fill its Instructions sheet; the other formats hold the result rows only.
+    """
+    if file_format == "xlsx":
+        return _ResultSheets(file, title, instructions)
+    if file_format in RESULT_FORMATS:
+        return _ResultTable(file, file_format)
+    raise ValueError(f"Unsupported result format: {file_format}")
+
+def check_client_values(chunk, columns):
+    """Raise ValueError naming the file lines where any of columns is blank, not a number or negative.
+
+    chunk is indexed as by read_client_chunks. Columns the chunk doesn't have are left to the
+    calculation's missing-column check.
+    """
+    problems = []
+    for column in columns:
+        if column not in chunk.columns:
+            continue
+        values = pd.to_numeric(chunk[column], errors="coerce")
+        invalid = (values.isna() | (values < 0)).to_numpy()
+        if invalid.any():
+            lines = (chunk.index[invalid] + 2).tolist()
+            shown = ", ".join(map(str, lines[:MAX_REPORTED_LINES]))
+            if len(lines) > MAX_REPORTED_LINES:
+                shown += f" and {len(lines) - MAX_REPORTED_LINES:,} more"
+            problems.append(f"{column.replace('_', ' ').title()} on line(s) {shown}")
+    if problems:
+        raise ValueError(f"Every input must be a non-negative number. Check {'; '.join(problems)}.")
+
+def write_salary_tax_results(chunks, file, file_format="xlsx", on_chunk=None, tax_year=None):
+    """Calculate salary tax for each chunk of clients and write the results into one file.
+
+    Rows are written as each chunk finishes (for Excel, in xlsxwriter constant_memory mode,
+    spilling onto a new sheet when Excel's row limit is reached). on_chunk(rows, seconds,
+    fraction_done) is called after every chunk. Returns the number of clients processed.
+    Raises ValueError, naming the lines, if an input is blank, not a number or negative.
+    """
+    writer = open_result_file(file, file_format, "Salary Tax Results", [
+        "This Excel file contains the Salary Tax results for every client in your upload.",
+        "Each row repeats the uploaded inputs followed by the calculated columns.",
+        "Results larger than one worksheet continue on 'Salary Tax Results 2', 'Salary Tax Results 3', etc."
+    ])
+    total_rows = 0
+    try:
+        for chunk, fraction_done in chunks:
+            start = time.perf_counter()
+            check_client_values(chunk, SALARY_TAX_INPUTS)
+            results = calculate_salary_tax_frame(chunk, tax_year)
+            writer.append(results)
+            total_rows += len(results)
+            if on_chunk:
+                on_chunk(len(results), time.perf_counter() - start, fraction_done)
+    finally:
+        writer.close()
+    if total_rows == 0:
+        raise ValueError("The uploaded file contains no clients.")
+    return total_rows
+
+def write_salary_tax_workbook(chunks, on_chunk=None, tax_year=None):
+    """Like write_salary_tax_results for Excel, returning the workbook bytes and the number of clients."""
+    buffer = io.BytesIO()
+    total_rows = write_salary_tax_results(chunks, buffer, "xlsx", on_chunk, tax_year)
+    return buffer.getvalue(), total_rows
+
+def _require_columns(df, columns, table):
+    missing = [column for column in columns if column not in df.columns]
+    if missing:
+        raise ValueError(f"Missing {table} columns: {', '.join(missing)}")
+
+def _flags(values):
+    """Read Yes/No, True/False or 1/0 columns as booleans."""
+    if values.dtype == bool:
+        return values
+    if values.dtype == object:
+        return values.astype(str).str.strip().str.lower().isin(("yes", "y", "true", "1"))
+    return values.fillna(0) != 0
+
+def sum_estate_assets(chunks, columns):
+    """Sum asset columns per estate_id over an iterable of DataFrame chunks.
+
+    Only one chunk and the per-estate totals are held in memory at a time, so asset tables
+    with millions of rows can be streamed straight from read_client_chunks.
+    """
+    totals = None
+    for chunk in chunks:
+        if isinstance(chunk, tuple):  # (DataFrame, fraction_done) from read_client_chunks
+            chunk = chunk[0]
+        _require_columns(chunk, ("estate_id", *columns), "asset")
+        partial = chunk.groupby("estate_id", sort=False)[list(columns)].sum()
+        totals = partial if totals is None else totals.add(partial, fill_value=0)
+    if totals is None:
+        return pd.DataFrame(columns=list(columns), dtype=float)
+    return totals
+
+def _investment_gains(chunks):
+    for chunk in chunks:
+        if isinstance(chunk, tuple):
+            chunk = chunk[0]
+        _require_columns(chunk, ("estate_id", "market_value", "base_cost"), "investment")
+        # CGT only counts gains, so each investment's loss is floored at zero before summing
+        yield chunk[["estate_id", "market_value"]].assign(gain=(chunk["market_value"] - chunk["base_cost"]).clip(lower=0))
+
+def calculate_estate_liquidity_tables(estates, property_chunks=(), investment_chunks=()):
+    """Calculate estate liquidity for a client book of estates in one vectorized pass.
+
+    estates has one row per estate with an estate_id and any ESTATE_INPUT_DEFAULTS columns
+    (missing columns take the defaults). Properties (estate_id, market_value) and investments
+    (estate_id, market_value, base_cost) are one-to-many tables, given as DataFrames or
+    iterables of chunks, and are aggregated per estate with group-by sums. Returns estates
+    with the asset totals and ESTATE_LIQUIDITY_OUTPUTS columns appended.
+    """
+    _require_columns(estates, ("estate_id",), "estate")
+    if estates["estate_id"].duplicated().any():
+        raise ValueError("estate_id must be unique in the estates table.")
+    if isinstance(property_chunks, pd.DataFrame):
+        property_chunks = [property_chunks]
+    if isinstance(investment_chunks, pd.DataFrame):
+        investment_chunks = [investment_chunks]
+    property_totals = sum_estate_assets(property_chunks, ("market_value",)).reindex(estates["estate_id"], fill_value=0)
+    investment_totals = sum_estate_assets(_investment_gains(investment_chunks), ("market_value", "gain")).reindex(estates["estate_id"], fill_value=0)
+    inputs = {
+        column: estates[column].fillna(default) if column in estates.columns else default
+        for column, default in ESTATE_INPUT_DEFAULTS.items()
+    }
+    if "has_surviving_spouse" in estates.columns:
+        inputs["has_surviving_spouse"] = _flags(estates["has_surviving_spouse"])
+    assets = {
+        "property_value": property_totals["market_value"].to_numpy(dtype=float),
+        "investment_value": investment_totals["market_value"].to_numpy(dtype=float),
+        "investment_gain": investment_totals["gain"].to_numpy(dtype=float),
+    }
+    results = calculate_estate_liquidity_batch(
+        inputs["cash"], inputs["life_insurance_to_estate"], assets["property_value"], assets["investment_value"], assets["investment_gain"],
+        inputs["other_assets"], inputs["debts"], inputs["medical_bills"], inputs["cash_bequests"], inputs["has_surviving_spouse"],
+        inputs["spouse_bequest_value"], inputs["pbo_bequest_value"], inputs["marginal_tax_rate"]
+    )
+    return estates.assign(**assets, **results)
+
+def write_estate_liquidity_results(results, file, file_format="xlsx", chunk_rows=BULK_CHUNK_ROWS):
+    """Write calculate_estate_liquidity_tables results into a file, chunk_rows at a time."""
+    writer = open_result_file(file, file_format, "Estate Liquidity Results", [
+        "This Excel file contains the Estate Liquidity results for every estate in your upload.",
+        "Each row repeats the estate inputs, the property and investment totals, and the calculated costs and liquidity shortfall.",
+        "Filter the liquidity_shortfall column to find estates that need more liquid assets."
+    ])
+    try:
+        # An empty result still writes its header
+        for start in range(0, max(len(results), 1), chunk_rows):
+            writer.append(results.iloc[start:start + chunk_rows])
+    finally:
+        writer.close()
+
+def write_estate_liquidity_workbook(results):
+    """Write calculate_estate_liquidity_tables results into a workbook and return its bytes."""
+    buffer = io.BytesIO()
+    write_estate_liquidity_results(results, buffer)
+    return buffer.getvalue()
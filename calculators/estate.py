@@ -0,0 +1,76 @@
+"""Estate duty, capital gains tax at death and executor fee calculations."""
+
+# Estate Duty Rates (2025)
+ESTATE_DUTY_ABATEMENT = 3500000  # R3.5 million
+ESTATE_DUTY_RATE_1 = 0.20  # 20% up to R30 million
+ESTATE_DUTY_RATE_2 = 0.25  # 25% above R30 million
+ESTATE_DUTY_THRESHOLD = 30000000  # R30 million
+EXECUTOR_FEE_RATE = 0.035  # 3.5%
+VAT_RATE = 0.15  # 15%
+CGT_INCLUSION_RATE = 0.40  # 40% inclusion rate for individuals
+CGT_EXCLUSION_DEATH = 300000  # R300,000 exclusion in year of death
+
+ESTATE_LIQUIDITY_OUTPUTS = (
+    "gross_estate", "net_estate", "cgt", "estate_duty", "executor_fees", "total_costs", "liquid_assets", "liquidity_shortfall"
+)
+
+# Estate Liquidity Tool Functions
+def calculate_estate_duty(net_value, has_surviving_spouse, spouse_bequest_value, pbo_bequest_value):
+    """Calculate estate duty based on net estate value and deductions."""
+    # Apply Section 4q deduction (spouse bequest) and Section 18A (PBO bequest)
+    dutiable_value = max(0, net_value - spouse_bequest_value - pbo_bequest_value)
+    # Apply R3.5 million abatement
+    dutiable_value = max(0, dutiable_value - ESTATE_DUTY_ABATEMENT)
+    
+    if dutiable_value <= 0:
+        return 0
+    if dutiable_value <= ESTATE_DUTY_THRESHOLD:
+        estate_duty = dutiable_value * ESTATE_DUTY_RATE_1
+    else:
+        estate_duty = (ESTATE_DUTY_THRESHOLD * ESTATE_DUTY_RATE_1) + ((dutiable_value - ESTATE_DUTY_THRESHOLD) * ESTATE_DUTY_RATE_2)
+    
+    if has_surviving_spouse:
+        # Note that estate duty is deferred until second spouse's death
+        return 0
+    return estate_duty
+
+def calculate_cgt(assets, marginal_tax_rate):
+    """Calculate Capital Gains Tax on assets at death."""
+    total_gain = 0
+    for asset in assets:
+        gain = max(0, asset["market_value"] - asset["base_cost"])
+        total_gain += gain
+    
+    # Apply R300,000 exclusion in year of death
+    taxable_gain = max(0, total_gain - CGT_EXCLUSION_DEATH)
+    # Apply inclusion rate
+    taxable_amount = taxable_gain * CGT_INCLUSION_RATE
+    # Apply marginal tax rate
+    cgt = taxable_amount * marginal_tax_rate
+    return cgt
+
+def calculate_executor_fees(gross_value):
+    """Calculate executor's fees based on gross estate value."""
+    base_fee = gross_value * EXECUTOR_FEE_RATE
+    total_fee = base_fee * (1 + VAT_RATE)  # Add 15% VAT
+    return total_fee
+
+def calculate_estate_liquidity(cash, life_insurance_to_estate, properties, investments, other_assets, debts, medical_bills,
+                               cash_bequests, has_surviving_spouse, spouse_bequest_value, pbo_bequest_value, marginal_tax_rate):
+    """Calculate estate costs at death and whether the liquid assets cover them.
+
+    properties is a list of market values and investments a list of {"market_value", "base_cost"} dicts.
+    """
+    # Calculate Gross Estate Value
+    gross_estate = cash + life_insurance_to_estate + sum(properties) + sum(i["market_value"] for i in investments) + other_assets
+    # Calculate Net Estate Value
+    net_estate = gross_estate - debts - medical_bills - cash_bequests
+    # Calculate Capital Gains Tax, Estate Duty and Executor Fees
+    cgt = calculate_cgt(investments, marginal_tax_rate)
+    estate_duty = calculate_estate_duty(net_estate, has_surviving_spouse, spouse_bequest_value, pbo_bequest_value)
+    executor_fees = calculate_executor_fees(gross_estate)
+    total_costs = cgt + estate_duty + executor_fees
+    # Assess Liquidity
+    liquid_assets = cash + life_insurance_to_estate
+    liquidity_shortfall = max(0, total_costs - liquid_assets)
+    return gross_estate, net_estate, cgt, estate_duty, executor_fees, total_costs, liquid_assets, liquidity_shortfall
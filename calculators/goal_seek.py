@@ -0,0 +1,109 @@
+"""Goal-seek solvers for the Retirement Calculator, vectorized over many clients.
+
+Both solvers use the same monthly-compounding, escalating-contribution model as
+calculate_future_value, so their answers close the capital shortfall reported by the
+calculator exactly.
+"""
+import numpy as np
+
+from .batch import calculate_future_value_batch
+from .retirement import MAX_DRAWDOWN_RATE
+
+MAX_RETIREMENT_AGE = 75  # Latest retirement age the age solver will consider
+DEPLETION_YEARS = 20  # Years the capital must last after the preservation period, as in calculate_retirement_plan
+SOLVE_BLOCK_CELLS = 2000000  # Provision-years evaluated at once by the age solver
+
+
+def solve_monthly_contribution_batch(shortfall, years_to_retirement, annual_rate, contribution_increase=0):
+    """Monthly contribution, escalating by contribution_increase each year, whose future value equals shortfall.
+
+    The future value is linear in the contribution, so one evaluation of the future value of
+    R1/month gives the exact answer. Returns 0 where there is no shortfall and inf where there
+    are no years left to save.
+    """
+    shortfall = np.asarray(shortfall, dtype=np.float64)
+    per_rand = calculate_future_value_batch(0.0, annual_rate, years_to_retirement, 1.0, contribution_increase)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        contribution = np.where(per_rand > 0, shortfall / np.where(per_rand > 0, per_rand, 1.0), np.inf)
+    return np.where(shortfall > 0, contribution, 0.0)
+
+
+def calculate_capital_required_batch(monthly_income, inflation_rate, annual_increase, years_to_retirement, preservation_years, assumed_return):
+    """Vectorized capital_required of calculate_retirement_plan with preserve_capital=True."""
+    monthly_income, inflation_rate, annual_increase, years_to_retirement, preservation_years, assumed_return = np.broadcast_arrays(
+        *(np.asarray(values, dtype=np.float64) for values in (monthly_income, inflation_rate, annual_increase, years_to_retirement, preservation_years, assumed_return))
+    )
+    income_growth = (1 + inflation_rate) * (1 + annual_increase)
+    future_annual_income = monthly_income * 12 * income_growth ** years_to_retirement
+    positive_return = assumed_return > 0
+    safe_return = np.where(positive_return, assumed_return, 1.0)
+    # Capital that funds the income from returns alone, with withdrawals capped at 17.5%
+    capital_at_retirement = future_annual_income / np.minimum(safe_return, MAX_DRAWDOWN_RATE)
+    # Capital that funds the escalated income over DEPLETION_YEARS after preservation, discounted to retirement
+    income_after_preservation = future_annual_income * income_growth ** preservation_years
+    annuity_factor = (1 - (1 + safe_return) ** (-DEPLETION_YEARS)) / safe_return
+    capital_for_depletion = income_after_preservation * annuity_factor / (1 + safe_return) ** preservation_years
+    return np.where(positive_return, np.maximum(capital_at_retirement, capital_for_depletion), np.inf)
+
+
+def _provision_arrays(current_value, annual_return, monthly_contribution, contribution_increase):
+    # One row per client, one column per provision; 1-D inputs mean one provision per client
+    arrays = [np.asarray(values, dtype=np.float64) for values in (current_value, annual_return, monthly_contribution, contribution_increase)]
+    arrays = [values[:, None] if values.ndim == 1 else values for values in arrays]
+    return np.broadcast_arrays(*arrays)
+
+
+def solve_retirement_age_batch(current_age, current_value, annual_return, monthly_contribution, contribution_increase,
+                               monthly_income, inflation_rate, annual_increase, preservation_years, assumed_return,
+                               max_retirement_age=MAX_RETIREMENT_AGE):
+    """Earliest whole retirement age at which the provisions cover the capital required.
+
+    Provision inputs are (clients, provisions) arrays, zero-padded for clients with fewer
+    provisions, or 1-D for one provision per client; the other inputs are per client. The
+    surplus (provisions less capital required) is evaluated at every whole year from
+    current_age + 1 to max_retirement_age in one pass per block of clients, and the first year
+    it is not negative is returned. The surplus need not grow with a later retirement age: when
+    the provisions' returns trail the growth of the income it can turn negative again. Returns
+    NaN where the target is not reached by max_retirement_age.
+    """
+    current_value, annual_return, monthly_contribution, contribution_increase = _provision_arrays(
+        current_value, annual_return, monthly_contribution, contribution_increase
+    )
+    clients, provisions = current_value.shape
+    current_age = np.broadcast_to(np.asarray(current_age, dtype=np.float64), (clients,))
+    monthly_income, inflation_rate, annual_increase, preservation_years, assumed_return = (
+        np.broadcast_to(np.asarray(values, dtype=np.float64), (clients,))
+        for values in (monthly_income, inflation_rate, annual_increase, preservation_years, assumed_return)
+    )
+
+    # Step 1: Years to retirement to try, as columns; each client tries up to its own last year
+    max_years = np.maximum(max_retirement_age - current_age, 1.0)
+    years = np.arange(1, int(max_years.max(initial=1)) + 1, dtype=np.float64)
+    block = max(SOLVE_BLOCK_CELLS // (len(years) * max(provisions, 1)), 1)
+
+    # Step 2: Surplus at every year for a block of clients; the first year it is met wins
+    ages = np.full(clients, np.nan)
+    for start in range(0, clients, block):
+        rows = slice(start, start + block)
+        projected = calculate_future_value_batch(
+            current_value[rows, :, None], annual_return[rows, :, None], years, monthly_contribution[rows, :, None], contribution_increase[rows, :, None]
+        ).sum(axis=1)
+        required = calculate_capital_required_batch(
+            monthly_income[rows, None], inflation_rate[rows, None], annual_increase[rows, None], years,
+            preservation_years[rows, None], assumed_return[rows, None]
+        )
+        met = (projected - required >= 0) & (years <= max_years[rows, None])
+        ages[rows] = np.where(met.any(axis=1), current_age[rows] + years[met.argmax(axis=1)], np.nan)
+    return ages
+
+
+def solve_retirement_age(current_age, provisions, monthly_income, inflation_rate, annual_increase, preservation_years,
+                         assumed_return, max_retirement_age=MAX_RETIREMENT_AGE):
+    """Earliest retirement age for one client, with provisions as in project_provisions; None if not reachable."""
+    columns = [[provision[name] for provision in provisions] or [0.0]
+               for name in ("current_value", "annual_return", "monthly_contribution", "contribution_increase")]
+    age = solve_retirement_age_batch(
+        current_age, *([column] for column in columns), monthly_income, inflation_rate, annual_increase,
+        preservation_years, assumed_return, max_retirement_age
+    )[0]
+    return None if np.isnan(age) else int(age)
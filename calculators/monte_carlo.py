@@ -0,0 +1,89 @@
+"""Monte Carlo simulation of retirement capital depletion with stochastic returns and inflation.
+
+Each path follows the same rules as calculate_years_until_depletion in retirement.py: the annual
+withdrawal is capped at the living annuity maximum drawdown of 17.5%, and once capital is at
+or below R125,000 it is withdrawn in full. Paths are simulated in chunks so memory stays
+bounded, and chunks can be spread across a process pool.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .retirement import FULL_WITHDRAWAL_LIMIT, MAX_DRAWDOWN_RATE
+
+DEPLETION_PERCENTILES = (10, 25, 50, 75, 90)
+CHUNK_PATHS = 10000  # Paths simulated together; memory is O(chunk_paths) per worker
+
+
+def _simulate_chunk(args):
+    """Simulate one chunk of paths; returns (depletion years per path, survivors per year)."""
+    (seed, paths, capital, annual_income, horizon, assumed_return, return_volatility,
+     inflation_rate, inflation_volatility, escalate_income) = args
+    rng = np.random.default_rng(seed)
+    current_capital = np.full(paths, float(capital))
+    income = np.full(paths, float(annual_income))
+    alive = np.ones(paths, dtype=bool)
+    # 0 means the capital outlived the horizon
+    depletion_years = np.zeros(paths, dtype=np.int32)
+    survivors = np.zeros(horizon, dtype=np.int64)
+    for year in range(horizon):
+        # Full withdrawal once capital is below the R125,000 threshold
+        full_withdrawal = alive & (current_capital <= FULL_WITHDRAWAL_LIMIT)
+        depletion_years[full_withdrawal] = year + 1
+        alive &= ~full_withdrawal
+        # Withdraw at the start of the year (capped at 17.5%), then apply that year's return
+        withdrawal = np.minimum(income, current_capital * MAX_DRAWDOWN_RATE)
+        returns = np.maximum(rng.normal(assumed_return, return_volatility, paths), -1.0)
+        current_capital = np.where(alive, (current_capital - withdrawal) * (1 + returns), 0.0)
+        if escalate_income:
+            income *= 1 + rng.normal(inflation_rate, inflation_volatility, paths)
+        survivors[year] = np.count_nonzero(alive)
+    return depletion_years, survivors
+
+
+def run_retirement_monte_carlo(capital, annual_income, retirement_age, assumed_return, return_volatility,
+                               inflation_rate=0.06, inflation_volatility=0.0, num_paths=10000, life_expectancy=95,
+                               escalate_income=False, chunk_paths=CHUNK_PATHS, workers=1, seed=None):
+    """Simulate num_paths retirements and summarise when the capital runs out.
+
+    Returns (probability_of_success, depletion_age_percentiles, survival_by_age), where success
+    means the capital pays income up to life_expectancy, depletion_age_percentiles maps each of
+    DEPLETION_PERCENTILES to an age (inf if the capital outlives life_expectancy), and
+    survival_by_age lists (age, fraction of paths with capital left). Income escalates with
+    simulated inflation only if escalate_income is set, matching the deterministic calculator
+    otherwise. workers > 1 spreads chunks over a process pool; None uses every core. Each chunk
+    of chunk_paths paths draws from its own stream spawned from seed, so for a given seed and
+    chunk_paths the results are the same for any number of workers; changing chunk_paths
+    changes the paths drawn. Raises ValueError unless num_paths and
+    chunk_paths are at least 1 and both volatilities are non-negative.
+    """
+    if num_paths < 1 or chunk_paths < 1:
+        raise ValueError("num_paths and chunk_paths must be at least 1.")
+    if not (return_volatility >= 0 and inflation_volatility >= 0):  # Also rejects NaN
+        raise ValueError("return_volatility and inflation_volatility must be non-negative.")
+    horizon = max(int(life_expectancy - retirement_age), 1)
+    chunk_sizes = [min(chunk_paths, num_paths - start) for start in range(0, num_paths, chunk_paths)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    tasks = [
+        (chunk_seed, paths, capital, annual_income, horizon, assumed_return, return_volatility,
+         inflation_rate, inflation_volatility, escalate_income)
+        for chunk_seed, paths in zip(seeds, chunk_sizes)
+    ]
+    workers = os.cpu_count() if workers is None else workers
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            results = list(executor.map(_simulate_chunk, tasks))
+    else:
+        results = [_simulate_chunk(task) for task in tasks]
+
+    depletion_years = np.concatenate([years for years, survivors in results])
+    survivors = np.sum([survivors for years, survivors in results], axis=0)
+    probability_of_success = np.count_nonzero((depletion_years == 0) | (depletion_years >= horizon)) / num_paths
+    depletion_ages = np.where(depletion_years == 0, np.inf, retirement_age + depletion_years)
+    depletion_age_percentiles = {
+        percentile: float(age)
+        for percentile, age in zip(DEPLETION_PERCENTILES, np.percentile(depletion_ages, DEPLETION_PERCENTILES, method="inverted_cdf"))
+    }
+    survival_by_age = [(retirement_age + year + 1, count / num_paths) for year, count in enumerate(survivors.tolist())]
+    return probability_of_success, depletion_age_percentiles, survival_by_age
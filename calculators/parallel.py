@@ -0,0 +1,180 @@
+"""Process-pool execution of the vectorized batch calculators over shared-memory arrays.
+
+A BatchExecutor runs any row-wise batch function (calculate_future_value_batch,
+calculate_depletion_years_batch, calculate_estate_liquidity_batch, ...) over chunks of rows in
+worker processes. Input and output arrays live in shared memory: each worker maps them and
+reads and writes its own rows in place, so no rows are pickled in either direction, and each
+chunk writes to its own output rows, so results come back in input order however the
+workers are scheduled. Arrays are split along their first axis, so (rows, years) inputs such
+as calculate_ra_ledger_batch's are sharded by row like 1-D ones. Arrays the caller builds
+with BatchExecutor.empty are already shared and aren't copied at all.
+
+    with BatchExecutor(workers=8, chunk_rows=250000) as executor:
+        values = executor.run(calculate_future_value_batch, current_value, annual_rate, years, monthly_contribution)
+
+workers=1 runs the function in the calling process, with the same interface, so callers can
+take an executor without caring whether it is parallel.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+CHUNK_ROWS = 250000  # Rows per task sent to a worker
+
+
+def _attach(spec, memories):
+    name, dtype, shape = spec
+    memory = shared_memory.SharedMemory(name=name)
+    memories.append(memory)
+    return np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+
+
+def _close(memory):
+    try:
+        memory.close()
+    except BufferError:
+        # An array still views the block; the mapping is released along with that array
+        pass
+
+
+def _run_chunk(task):
+    # Runs in a worker: map the shared inputs and outputs, calculate rows start:stop in place
+    func, arguments, keywords, outputs, start, stop = task
+    memories = []
+    try:
+        values = [_attach(value, memories)[start:stop] if kind == "shared" else value for kind, value in arguments]
+        columns = _columns(func(*values, **keywords))[1]
+        for spec, column in zip(outputs, columns):
+            _attach(spec, memories)[start:stop] = column
+    finally:
+        # Drop the views before unmapping the blocks they point into
+        values = columns = column = None
+        for memory in memories:
+            _close(memory)
+
+
+def _sharded(value, rows):
+    # Arrays with one entry per row along the first axis are shared and split into chunks
+    return isinstance(value, np.ndarray) and value.ndim >= 1 and len(value) == rows
+
+
+def _columns(result):
+    """Split a batch function's result into (layout, arrays); layout rebuilds it in _assemble."""
+    if isinstance(result, np.ndarray):
+        return None, [result]
+    if isinstance(result, dict):
+        return tuple(result), list(result.values())
+    if isinstance(result, tuple):
+        return len(result), list(result)
+    raise TypeError(f"Batch functions must return an array, or a tuple or dict of arrays, not {type(result).__name__}")
+
+
+def _assemble(layout, arrays):
+    if layout is None:
+        return arrays[0]
+    if isinstance(layout, tuple):
+        return dict(zip(layout, arrays))
+    return tuple(arrays)
+
+
+class BatchExecutor:
+    """Shard batch calculations across a process pool (see the module docstring).
+
+    workers defaults to every core; chunk_rows is the number of rows in each task. Array
+    arguments whose first axis has one entry per row (1-D or not) are shared and split along
+    it; scalars and arrays of length 1 are broadcast and sent to each task as they are, as are
+    keyword arguments.
+    """
+
+    def __init__(self, workers=None, chunk_rows=CHUNK_ROWS):
+        self.workers = os.cpu_count() if workers is None else workers
+        self.chunk_rows = chunk_rows
+        self._pool = None
+        self._shared = {}  # id(array) -> (SharedMemory, array) for arrays made by empty()
+
+    def empty(self, shape, dtype=np.float64):
+        """A new array of shape (rows or a tuple) in shared memory, passed to run without a copy; freed by close()."""
+        shape = (shape,) if isinstance(shape, (int, np.integer)) else tuple(shape)
+        memory = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1))
+        array = np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+        self._shared[id(array)] = (memory, array)
+        return array
+
+    def _share(self, array, temporary):
+        entry = self._shared.get(id(array))
+        if entry is not None and entry[1] is array:
+            return entry[0].name
+        shared = self.empty(array.shape, array.dtype)
+        shared[:] = array
+        temporary.append(id(shared))
+        return self._shared[id(shared)][0].name
+
+    def run(self, func, *args, **kwargs):
+        """Return func(*args, **kwargs), calculated chunk_rows at a time across the workers.
+
+        func must be importable by the workers (a module-level function) and work row by row:
+        each output row depends only on the same input row.
+        """
+        arrays = [np.asarray(arg) if isinstance(arg, list) or hasattr(arg, "__array__") else arg for arg in args]
+        rows = max((len(array) for array in arrays if isinstance(array, np.ndarray) and array.ndim >= 1 and len(array) != 1), default=1)
+        if self.workers <= 1 or rows <= self.chunk_rows:
+            return func(*arrays, **kwargs)
+
+        # Step 1: Work out the outputs' layout, dtypes and row shapes from the first row
+        first = [array[:1] if _sharded(array, rows) else array for array in arrays]
+        layout, sample = _columns(func(*first, **kwargs))
+
+        # Step 2: Put the inputs and outputs in shared memory
+        temporary = []
+        try:
+            arguments = [
+                ("shared", (self._share(array, temporary), array.dtype, array.shape))
+                if _sharded(array, rows) else ("value", array)
+                for array in arrays
+            ]
+            outputs = [self.empty((rows, *np.shape(column)[1:]), np.asarray(column).dtype) for column in sample]
+            temporary += [id(output) for output in outputs]
+            output_specs = [(self._shared[id(output)][0].name, output.dtype, output.shape) for output in outputs]
+
+            # Step 3: Each task writes its own rows, so the results are in input order
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            tasks = [
+                (func, arguments, kwargs, output_specs, start, min(start + self.chunk_rows, rows))
+                for start in range(0, rows, self.chunk_rows)
+            ]
+            for _ in self._pool.map(_run_chunk, tasks):
+                pass
+            return _assemble(layout, [output.copy() for output in outputs])
+        finally:
+            outputs = None
+            for key in temporary:
+                self._free(key)
+
+    def _free(self, key):
+        memory, array = self._shared.pop(key)
+        array = None
+        _close(memory)
+        memory.unlink()
+
+    def close(self):
+        """Shut down the workers and free the shared arrays made by empty()."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        for key in list(self._shared):
+            self._free(key)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def run_batch(func, *args, workers=None, chunk_rows=CHUNK_ROWS, **kwargs):
+    """Run func once with a temporary BatchExecutor (see BatchExecutor.run)."""
+    with BatchExecutor(workers, chunk_rows) as executor:
+        return executor.run(func, *args, **kwargs)
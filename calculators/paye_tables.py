@@ -0,0 +1,188 @@
+"""Precomputed PAYE deduction tables for monthly, fortnightly and weekly payroll runs.
+
+A table holds the PAYE for one pay period at every remuneration step up to a maximum, for
+each rebate age band and medical scheme dependant count. Each entry is calculated like
+calculate_salary_tax on the annualized remuneration (the SARS annualization method), so a
+payroll lookup is one array index instead of a tax calculation. Tables are saved as a .npy
+array of cents next to a .json description and are loaded memory-mapped, so a process only
+reads the pages it looks up.
+
+Remuneration means taxable remuneration for the period, after pension and RA deductions.
+
+Build, save and check the tables for a tax year from the repository root:
+
+    python -m calculators.paye_tables [out_dir] [tax_year]
+"""
+import json
+import math
+import sys
+from bisect import bisect_right
+from pathlib import Path
+
+import numpy as np
+
+from .batch import calculate_medical_tax_credits_batch, calculate_salary_tax_batch
+from .tax import calculate_medical_tax_credits, calculate_salary_tax
+from .tax_tables import TAX_TABLES_FINGERPRINT, get_tax_table
+
+PAY_PERIODS = {"monthly": 12, "fortnightly": 26, "weekly": 52}
+AGE_BANDS = (0, 65, 75)  # Lowest age of each rebate band: primary, + secondary, + tertiary
+MAX_DEPENDANTS = 6  # Larger dependant counts are derived from the zero-dependant column
+DEFAULT_MAX_ANNUAL_INCOME = 3000000  # Above this the top bracket is extrapolated
+
+
+class PayeTable:
+    """PAYE per pay period in cents, indexed by [remuneration // step, age band, dependants].
+
+    The deduction for a remuneration is the entry of the step it falls in, as in the printed
+    SARS deduction tables, so it is exact at multiples of step and otherwise low by at most
+    step times the marginal rate.
+    """
+
+    def __init__(self, cents, tax_year, period, step, top_rate):
+        self.cents = cents
+        self.tax_year = tax_year
+        self.period = period
+        self.step = step
+        self.top_rate = top_rate
+        self.periods = PAY_PERIODS[period]
+        self.max_dependants = cents.shape[2] - 1
+        self.max_remuneration = (cents.shape[0] - 1) * step
+        # Indexing a flat memoryview is much cheaper per scalar lookup than indexing the array
+        self._flat = memoryview(np.ascontiguousarray(cents).reshape(-1))
+        self._row = cents.shape[1] * cents.shape[2]
+
+    def __repr__(self):
+        return f"PayeTable({self.tax_year} {self.period}, up to R{self.max_remuneration:,.0f} in R{self.step:g} steps)"
+
+    def lookup(self, remuneration, age, num_dependants):
+        """Return the PAYE (rand) to deduct for one employee's pay period."""
+        if remuneration <= 0:
+            return 0.0
+        band = bisect_right(AGE_BANDS, age) - 1
+        index = min(int(remuneration // self.step), self.cents.shape[0] - 1)
+        excess = max(remuneration - self.max_remuneration, 0) * self.top_rate
+        offset = index * self._row + band * (self.max_dependants + 1)
+        if num_dependants <= self.max_dependants:
+            return self._flat[offset + max(int(num_dependants), 0)] / 100 + excess
+        # The credit only grows with more dependants, so take it off the zero-dependant PAYE
+        credit = calculate_medical_tax_credits(num_dependants, self.tax_year)[0] / self.periods
+        return max(self._flat[offset] / 100 + excess - credit, 0.0)
+
+    def lookup_batch(self, remuneration, age, num_dependants):
+        """Vectorized lookup over arrays (or scalars, which are broadcast) of employees."""
+        remuneration, age, num_dependants = np.broadcast_arrays(
+            *(np.asarray(values, dtype=np.float64) for values in (remuneration, age, num_dependants))
+        )
+        band = np.searchsorted(np.asarray(AGE_BANDS), age, side="right") - 1
+        index = np.clip(remuneration // self.step, 0, self.cents.shape[0] - 1).astype(np.intp)
+        dependants = np.clip(num_dependants, 0, self.max_dependants).astype(np.intp)
+        excess = np.maximum(remuneration - self.max_remuneration, 0) * self.top_rate
+        paye = self.cents[index, band, dependants] / 100 + excess
+        over = num_dependants > self.max_dependants
+        if over.any():
+            credit = calculate_medical_tax_credits_batch(num_dependants[over], self.tax_year)[0] / self.periods
+            paye[over] = np.maximum(self.cents[index[over], band[over], 0] / 100 + excess[over] - credit, 0)
+        return np.where(remuneration > 0, paye, 0.0)
+
+    def save(self, path):
+        """Write path.npy (the cents) and path.json (what they describe)."""
+        path = Path(path)
+        np.save(path.with_suffix(".npy"), np.ascontiguousarray(self.cents))
+        path.with_suffix(".json").write_text(json.dumps({
+            "tax_year": self.tax_year,
+            "period": self.period,
+            "step": self.step,
+            "top_rate": self.top_rate,
+            "tax_tables_fingerprint": TAX_TABLES_FINGERPRINT,
+        }, indent=2) + "\n")
+
+
+def build_paye_table(period="monthly", tax_year=None, step=1.0, max_annual_income=DEFAULT_MAX_ANNUAL_INCOME,
+                     max_dependants=MAX_DEPENDANTS):
+    """Calculate the PAYE table for a pay period from the tax year's tables."""
+    if period not in PAY_PERIODS:
+        raise ValueError(f"Unknown pay period {period!r}. Use one of: {', '.join(PAY_PERIODS)}")
+    table = get_tax_table(tax_year)
+    periods = PAY_PERIODS[period]
+    steps = math.ceil(max_annual_income / periods / step) + 1
+    if (steps - 1) * step * periods < table.thresholds[-1]:
+        raise ValueError("max_annual_income must reach the top tax bracket so larger incomes can be extrapolated.")
+    annual_income = np.arange(steps) * step * periods
+    cents = np.empty((steps, len(AGE_BANDS), max_dependants + 1), dtype=np.int32)
+    for band, age in enumerate(AGE_BANDS):
+        for dependants in range(max_dependants + 1):
+            paye = calculate_salary_tax_batch(annual_income, 0, age, dependants, table.year)["paye"]
+            cents[:, band, dependants] = np.round(paye / periods * 100)
+    return PayeTable(cents, table.year, period, float(step), table.rates[-1])
+
+
+def load_paye_table(path):
+    """Open a saved PAYE table memory-mapped, checking it was built from the current tax tables."""
+    path = Path(path)
+    meta = json.loads(path.with_suffix(".json").read_text())
+    if meta["tax_tables_fingerprint"] != TAX_TABLES_FINGERPRINT:
+        raise ValueError(f"{path} was built from different tax tables; rebuild it with build_paye_table.")
+    cents = np.load(path.with_suffix(".npy"), mmap_mode="r")
+    return PayeTable(cents, meta["tax_year"], meta["period"], meta["step"], meta["top_rate"])
+
+
+def validate_paye_table(paye_table, samples=20000, seed=0):
+    """Check table lookups against calculate_salary_tax for random employees.
+
+    Half the samples fall exactly on table steps, where the lookup must match to the cent;
+    the rest anywhere up to 1.5 times the table's range, where it may be low by at most one
+    step at the marginal rate. Every sample is also looked up one at a time, which must give
+    the same result as the batch lookup. Returns a report dict whose "ok" is False on any mismatch.
+    """
+    rng = np.random.default_rng(seed)
+    periods = paye_table.periods
+    on_step = np.arange(samples) < samples // 2
+    remuneration = np.where(
+        on_step,
+        rng.integers(0, paye_table.cents.shape[0], samples) * paye_table.step,
+        np.round(rng.uniform(0, paye_table.max_remuneration * 1.5, samples), 2),
+    )
+    age = rng.integers(18, 95, samples)
+    num_dependants = rng.integers(0, paye_table.max_dependants + 3, samples)
+    actual = paye_table.lookup_batch(remuneration, age, num_dependants)
+    employees = list(zip(remuneration.tolist(), age.tolist(), num_dependants.tolist()))
+    expected = np.array([calculate_salary_tax(r * periods, 0, a, 0, d, paye_table.tax_year)[5] / periods for r, a, d in employees])
+    # The scalar lookup must agree with the batch lookup exactly
+    scalar_mismatches = sum(paye_table.lookup(r, a, d) != paye for (r, a, d), paye in zip(employees, actual.tolist()))
+    error = expected - actual
+    step_tolerance = paye_table.step * paye_table.top_rate + 0.005
+    on_step_error = float(np.abs(error[on_step]).max(initial=0))
+    between_error = float(np.abs(error[~on_step]).max(initial=0))
+    mismatches = int(
+        np.count_nonzero(np.abs(error[on_step]) > 0.005)
+        + np.count_nonzero((error[~on_step] < -0.005) | (error[~on_step] > step_tolerance))
+        + scalar_mismatches
+    )
+    return {
+        "samples": samples,
+        "max_error_on_step": round(on_step_error, 4),
+        "max_error_between_steps": round(between_error, 4),
+        "step_tolerance": round(step_tolerance, 4),
+        "mismatches": mismatches,
+        "ok": mismatches == 0,
+    }
+
+
+def main(out_dir="paye_tables", tax_year=None):
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    failed = False
+    for period in PAY_PERIODS:
+        paye_table = build_paye_table(period, tax_year)
+        path = out_dir / f"paye_{paye_table.tax_year}_{period}"
+        paye_table.save(path)
+        report = validate_paye_table(load_paye_table(path))
+        failed = failed or not report["ok"]
+        print(f"{path}.npy: {paye_table.cents.nbytes / 2**20:,.1f} MiB, {report}")
+    if failed:
+        raise SystemExit("PAYE table lookups differ from calculate_salary_tax")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:3])
@@ -0,0 +1,93 @@
+"""Optimal RA contribution per client, solved from the kink points of the tax saving curve.
+
+The tax an RA contribution saves is PAYE (calculate_salary_tax) without it less PAYE with it.
+Tax is piecewise linear in taxable income, so the saving is piecewise linear in the
+contribution, and concave: each rand saves the client's marginal rate until taxable income
+falls to the next bracket threshold down, then the lower rate, and nothing once PAYE reaches
+zero or the deduction reaches its cap (27.5% of income, at most R350,000). The curve is fully
+described by the contributions at those kinks, so it is evaluated there only, a handful of
+points per client, rather than scanned rand by rand.
+"""
+import numpy as np
+
+from .batch import calculate_medical_tax_credits_batch, calculate_salary_tax_batch
+from .tax_tables import get_tax_table
+
+# Names of the per-client values returned by optimize_ra_contribution_batch, in order
+RA_OPTIMIZER_OUTPUTS = ("optimal_contribution", "optimal_rebate", "rebate_per_rand", "max_useful_contribution", "max_rebate")
+RATE_TOLERANCE = 1e-6  # Bracket base taxes are rounded to cents, so segment rates are this close to the table's
+
+
+def optimize_ra_contribution_batch(gross_salary, age, num_dependants=0, existing_contribution=0, tax_year=None):
+    """Find the RA contribution that maximizes the tax saved per rand for many clients.
+
+    existing_contribution is pension/RA already deducted this year, which uses up part of the
+    cap. Every rand up to optimal_contribution saves the client's top marginal rate
+    (rebate_per_rand), the most any rand can save, so it is the largest contribution with the
+    best rebate per rand; contributions above max_useful_contribution save nothing this year.
+    Rebates are PAYE savings as calculated by calculate_salary_tax.
+
+    Returns a dict of (clients,) arrays keyed by RA_OPTIMIZER_OUTPUTS plus the whole curve:
+    "contribution_points", a (clients, points) array of the contributions at the kinks in
+    increasing order (starting at 0), and "rebate_points", the tax saved at each. The saving
+    is linear between consecutive points. Scalar inputs give scalar values and 1-D curves.
+    """
+    scalar = all(np.ndim(values) == 0 for values in (gross_salary, age, num_dependants, existing_contribution))
+    gross_salary, age, num_dependants, existing_contribution = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(values, dtype=np.float64)) for values in (gross_salary, age, num_dependants, existing_contribution))
+    )
+    table = get_tax_table(tax_year)
+    thresholds = np.asarray(table.thresholds)
+    rates = np.asarray(table.rates)
+    base_taxes = np.asarray(table.base_taxes)
+
+    # Step 1: Room left under the deduction cap, and taxable income before the new contribution
+    max_deductible = np.minimum(gross_salary * table.ra_deduction_rate, table.ra_deduction_cap)
+    room = np.maximum(max_deductible - existing_contribution, 0)
+    taxable_income = np.maximum(gross_salary - np.minimum(existing_contribution, max_deductible), 0)
+
+    # Step 2: Taxable income at which the age rebates and medical credits cover all the tax
+    relief = np.full(age.shape, float(table.primary_rebate))
+    relief = np.where(age >= 65, relief + table.secondary_rebate, relief)
+    relief = np.where(age >= 75, relief + table.tertiary_rebate, relief)
+    relief = relief + calculate_medical_tax_credits_batch(num_dependants, tax_year)[0]
+    index = np.maximum(np.searchsorted(base_taxes, relief, side="right") - 1, 0)
+    tax_free_income = thresholds[index] + (relief - base_taxes[index]) / rates[index]
+
+    # Step 3: Kinks, as contributions: each lower bracket threshold, the tax-free income and the cap
+    kinks = np.concatenate([
+        np.zeros((len(room), 1)),
+        taxable_income[:, None] - thresholds[None, 1:],
+        (taxable_income - tax_free_income)[:, None],
+        room[:, None],
+    ], axis=1)
+    contribution_points = np.sort(np.clip(kinks, 0, room[:, None]), axis=1)
+
+    # Step 4: Tax saved at each kink, from calculate_salary_tax's PAYE
+    paye_before = calculate_salary_tax_batch(gross_salary, existing_contribution, age, num_dependants, tax_year)["paye"]
+    paye_after = calculate_salary_tax_batch(
+        gross_salary[:, None], existing_contribution[:, None] + contribution_points, age[:, None], num_dependants[:, None], tax_year
+    )["paye"]
+    rebate_points = paye_before[:, None] - paye_after
+
+    # Step 5: Rate of each segment between kinks; the curve is concave, so the first rate is the best
+    widths = np.diff(contribution_points, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        segment_rates = np.where(widths > 0, np.diff(rebate_points, axis=1) / np.where(widths > 0, widths, 1.0), 0.0)
+    rebate_per_rand = segment_rates.max(axis=1)
+    best = (widths > 0) & (segment_rates >= rebate_per_rand[:, None] - RATE_TOLERANCE) & (rebate_per_rand[:, None] > RATE_TOLERANCE)
+    useful = (widths > 0) & (segment_rates > RATE_TOLERANCE)
+    # The saving only grows with the contribution, so the last qualifying kink has the largest values
+    segment_ends, rebate_ends = contribution_points[:, 1:], rebate_points[:, 1:]
+    results = {
+        "optimal_contribution": np.where(best, segment_ends, 0.0).max(axis=1),
+        "optimal_rebate": np.where(best, rebate_ends, 0.0).max(axis=1),
+        "rebate_per_rand": np.where(rebate_per_rand > RATE_TOLERANCE, rebate_per_rand, 0.0),
+        "max_useful_contribution": np.where(useful, segment_ends, 0.0).max(axis=1),
+        "max_rebate": np.where(useful, rebate_ends, 0.0).max(axis=1),
+        "contribution_points": contribution_points,
+        "rebate_points": rebate_points,
+    }
+    if scalar:
+        return {name: values[0] for name, values in results.items()}
+    return results
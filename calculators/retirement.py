@@ -0,0 +1,149 @@
+"""Retirement capital, future value and depletion calculations."""
+import math
+
+MAX_DRAWDOWN_RATE = 0.175  # Living annuity max drawdown of 17.5%
+FULL_WITHDRAWAL_LIMIT = 125000  # Capital at or below this may be withdrawn in full
+DEPLETION_HORIZON_YEARS = 100  # Capital lasting longer than this after retirement is treated as never depleted
+
+# Retirement Calculator Functions
+def calculate_future_value(current_value, annual_rate, years, monthly_contribution=0, annual_contribution_increase=0):
+    """Calculate the future value of an investment with monthly contributions and annual increases.
+
+    Each year the value grows by annual_rate, then twelve monthly contributions are added,
+    each compounded monthly to the end of the year, and the contribution escalates by
+    annual_contribution_increase. Both sums are geometric series, so this is O(1) in years.
+    """
+    years = max(years, 0)
+    growth = (1 + annual_rate) ** years
+    monthly_rate = (1 + annual_rate) ** (1/12) - 1  # Convert annual rate to monthly
+    # Year-end value of R1/month: sum of (1 + monthly_rate) ** k for k = 0..11
+    months_factor = annual_rate / monthly_rate if monthly_rate != 0 else 12
+    # Year-end value at retirement of contributions escalating by annual_contribution_increase
+    if abs(annual_rate - annual_contribution_increase) < 1e-12:
+        years_factor = years * (1 + annual_rate) ** (years - 1)
+    else:
+        years_factor = (growth - (1 + annual_contribution_increase) ** years) / (annual_rate - annual_contribution_increase)
+    return current_value * growth + monthly_contribution * months_factor * years_factor
+
+def project_provision(provision, years_to_retirement):
+    """Future value at retirement of one provision dict (see project_provisions)."""
+    return calculate_future_value(
+        provision["current_value"],
+        provision["annual_return"],
+        years_to_retirement,
+        provision["monthly_contribution"],
+        provision["contribution_increase"]
+    )
+
+def combine_provisions(provisions, future_values, years_to_retirement):
+    """Return (total future value, contribution-weighted average return) of projected provisions."""
+    average_return = 0
+    total_weight = 0
+    for provision in provisions:
+        # Weighted average return for additional savings calculation
+        weight = provision["current_value"] + (provision["monthly_contribution"] * 12 * years_to_retirement)
+        average_return += provision["annual_return"] * weight
+        total_weight += weight
+    if total_weight > 0:
+        average_return /= total_weight
+    return sum(future_values), average_return
+
+def average_contribution_increase(provisions):
+    """Annual contribution increase of the provisions, weighted by monthly contribution (0 if none contribute).
+
+    calculate_additional_savings_needed escalates the additional savings at this rate, as the
+    provisions' own contributions escalate in project_provision.
+    """
+    total_contribution = sum(provision["monthly_contribution"] for provision in provisions)
+    if total_contribution <= 0:
+        return 0
+    return sum(provision["contribution_increase"] * provision["monthly_contribution"] for provision in provisions) / total_contribution
+
+def project_provisions(provisions, years_to_retirement):
+    """Project each provision to retirement.
+
+    provisions is a list of {"current_value", "annual_return", "monthly_contribution", "contribution_increase"}
+    dicts. Returns (future values, total future value, contribution-weighted average return).
+    """
+    future_values = [project_provision(provision, years_to_retirement) for provision in provisions]
+    total, average_return = combine_provisions(provisions, future_values, years_to_retirement)
+    return future_values, total, average_return
+
+def calculate_years_until_depletion(capital, annual_income, inflation_rate, years_to_retirement, assumed_return, horizon=DEPLETION_HORIZON_YEARS):
+    """Calculate how many years the capital will last with annual withdrawals, considering SA laws.
+
+    Returns years (inf if the capital lasts more than horizon years or forever), the first
+    withdrawal, and per-year lists of capital, withdrawals, monthly income and monthly income in
+    today's value for graphing, each ending with the year after depletion (or at the horizon).
+    """
+    # Imported here so the package loads without NumPy; the engine is shared with the batch form
+    from .batch import calculate_depletion_trajectory_batch
+    years, capital_over_time, withdrawals_over_time = calculate_depletion_trajectory_batch(capital, annual_income, assumed_return, horizon)
+    years = float(years[0])
+    length = horizon + 1 if math.isinf(years) else int(years) + 1
+    capital_over_time = capital_over_time[0, :length].tolist()
+    withdrawals_over_time = withdrawals_over_time[0, :length].tolist()
+    monthly_income_over_time = [withdrawal / 12 for withdrawal in withdrawals_over_time]
+    # Adjust monthly income to today's value (year i is paid i + 1 years after retirement)
+    monthly_income_today_value = [
+        monthly_income / (1 + inflation_rate) ** (years_to_retirement + i + 1) for i, monthly_income in enumerate(monthly_income_over_time)
+    ]
+    first_withdrawal = withdrawals_over_time[0]
+    return (years if math.isinf(years) else int(years)), first_withdrawal, capital_over_time, withdrawals_over_time, monthly_income_over_time, monthly_income_today_value
+
+def calculate_additional_savings_needed(shortfall, years_to_retirement, average_return, contribution_increase=0):
+    """Calculate the additional monthly savings whose future value closes the shortfall.
+
+    Uses the same monthly compounding and annual contribution increase as calculate_future_value.
+    The future value is linear in the contribution, so the exact answer is the shortfall divided
+    by the future value of R1/month.
+    """
+    if shortfall <= 0:
+        return 0
+    future_value_per_rand = calculate_future_value(0, average_return, years_to_retirement, 1, contribution_increase)
+    if future_value_per_rand <= 0:
+        return float('inf')
+    return shortfall / future_value_per_rand
+
+def calculate_retirement_plan(monthly_income, inflation_rate, annual_increase, years_to_retirement, preserve_capital, preservation_years, assumed_return):
+    """Calculate the retirement plan details."""
+    annual_income = monthly_income * 12
+    # Future value of the annual income needed at retirement, adjusted for inflation and annual increase
+    future_annual_income = annual_income * (1 + inflation_rate) ** years_to_retirement * (1 + annual_increase) ** years_to_retirement
+    future_monthly_income = future_annual_income / 12
+
+    if preserve_capital:
+        # Step 1: For the preservation period, income is drawn from returns only
+        if assumed_return <= 0:
+            capital_at_retirement = float('inf')
+        else:
+            # Capital needed to generate the income during preservation
+            capital_at_retirement = future_annual_income / assumed_return
+            # Check if the withdrawal rate exceeds 17.5%
+            withdrawal_rate = future_annual_income / capital_at_retirement
+            max_drawdown_rate = MAX_DRAWDOWN_RATE
+            if withdrawal_rate > max_drawdown_rate:
+                capital_at_retirement = future_annual_income / max_drawdown_rate
+                withdrawal_rate = max_drawdown_rate
+        
+        # Step 2: After preservation, deplete the capital over remaining life expectancy (assume 20 years)
+        remaining_years = 20  # From age 75 to 95
+        income_after_preservation = future_annual_income * (1 + inflation_rate) ** preservation_years * (1 + annual_increase) ** preservation_years
+        # Present value of an annuity to deplete the capital over 20 years
+        if assumed_return > 0:
+            annuity_factor = (1 - (1 + assumed_return) ** (-remaining_years)) / assumed_return
+            capital_required = income_after_preservation * annuity_factor
+            # Discount back to retirement age
+            capital_required = capital_required / (1 + assumed_return) ** preservation_years
+            # Use the higher of the two capital amounts (preservation period or depletion period)
+            capital_required = max(capital_at_retirement, capital_required)
+        else:
+            capital_required = capital_at_retirement
+
+        years_until_depletion = None
+        withdrawal_at_retirement = min(future_annual_income, capital_required * MAX_DRAWDOWN_RATE)
+    else:
+        capital_required = None
+        years_until_depletion, withdrawal_at_retirement = None, future_annual_income
+
+    return future_annual_income, future_monthly_income, capital_required, years_until_depletion, withdrawal_at_retirement
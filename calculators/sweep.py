@@ -0,0 +1,60 @@
+"""Scenario sweeps for the Retirement Calculator.
+
+Evaluates the retirement plan over the Cartesian grid of inflation rates, post-retirement
+returns, retirement ages and preservation periods in one vectorized pass, instead of one
+calculator run per scenario.
+"""
+import numpy as np
+
+from .batch import calculate_depletion_years_batch, calculate_future_value_batch
+from .goal_seek import calculate_capital_required_batch
+from .retirement import DEPLETION_HORIZON_YEARS
+
+SWEEP_OUTPUTS = (
+    "inflation_rate", "assumed_return", "retirement_age", "preservation_years",
+    "future_monthly_income", "capital_at_retirement", "capital_required", "capital_shortfall", "depletion_age",
+)
+
+
+def sweep_retirement_plan(desired_monthly_income, annual_increase, current_age, provisions,
+                          inflation_rates, assumed_returns, retirement_ages, preservation_periods):
+    """Evaluate the retirement plan for every combination of the four parameter lists.
+
+    provisions are dicts as in project_provisions. Returns a dict of flat arrays keyed by
+    SWEEP_OUTPUTS, one element per grid point (inflation rate varying slowest). capital_shortfall
+    is the preserve-capital shortfall (capital_required less the provisions, negative for an
+    excess) and depletion_age the age the provisions run out without preserving capital.
+    """
+    axes = [np.asarray(values, dtype=np.float64) for values in (inflation_rates, assumed_returns, retirement_ages, preservation_periods)]
+    shape = tuple(len(axis) for axis in axes)
+    inflation_rate, assumed_return, retirement_age, preservation_years = np.meshgrid(*axes, indexing="ij")
+    years_to_retirement = np.maximum(retirement_age - current_age, 0)
+
+    # Provisions only depend on the retirement age, so project them once per age
+    provision_columns = [
+        np.asarray([provision[name] for provision in provisions], dtype=np.float64)
+        for name in ("current_value", "annual_return", "monthly_contribution", "contribution_increase")
+    ]
+    capital_by_age = calculate_future_value_batch(
+        *(column[None, :] for column in provision_columns[:2]),
+        np.maximum(axes[2] - current_age, 0)[:, None],
+        *(column[None, :] for column in provision_columns[2:])
+    ).sum(axis=1)
+    capital_at_retirement = np.broadcast_to(capital_by_age[None, None, :, None], shape)
+
+    future_annual_income = desired_monthly_income * 12 * ((1 + inflation_rate) * (1 + annual_increase)) ** years_to_retirement
+    capital_required = calculate_capital_required_batch(
+        desired_monthly_income, inflation_rate, annual_increase, years_to_retirement, preservation_years, assumed_return
+    )
+
+    # Depletion does not depend on the preservation period, so run it once and broadcast over that axis
+    depletion_years = calculate_depletion_years_batch(
+        capital_at_retirement[..., 0], future_annual_income[..., 0], assumed_return[..., 0], DEPLETION_HORIZON_YEARS
+    )
+    depletion_age = np.broadcast_to((retirement_age[..., 0] + depletion_years)[..., None], shape)
+
+    values = (
+        inflation_rate, assumed_return, retirement_age, preservation_years,
+        future_annual_income / 12, capital_at_retirement, capital_required, capital_required - capital_at_retirement, depletion_age,
+    )
+    return dict(zip(SWEEP_OUTPUTS, (value.ravel() for value in values)))
@@ -0,0 +1,91 @@
+"""RA rebate, medical tax credit and salary tax (PAYE/UIF) calculations."""
+from .tax_tables import get_tax_table
+
+# Names of the values returned by calculate_salary_tax, in order
+SALARY_TAX_OUTPUTS = (
+    "taxable_income", "paye_before_mtc", "paye_before_mtc_monthly", "mtc_annual", "mtc_monthly",
+    "paye", "paye_monthly", "uif", "uif_monthly", "net_income", "net_income_monthly", "marginal_rate"
+)
+# Names of the values in each calculate_ra_ledger row, in order
+RA_LEDGER_OUTPUTS = ("deductible", "tax_rate", "rebate", "carried_forward", "cumulative_rebate")
+
+# RA Tax Rebate Calculator Functions
+def get_tax_rate(income, tax_year=None):
+    """Return the marginal tax rate based on annual taxable income."""
+    return get_tax_table(tax_year).marginal_rate(income)
+
+def calculate_ra_rebate(income, contribution, tax_year=None):
+    """Calculate the tax rebate for RA contributions and excess carryover."""
+    table = get_tax_table(tax_year)
+    max_deductible = min(income * table.ra_deduction_rate, table.ra_deduction_cap)  # 27.5% of income, capped at R350,000
+    deductible = min(contribution, max_deductible)  # Deductible amount
+    excess = max(0, contribution - max_deductible)  # Excess contribution to carry over
+    tax_rate = table.marginal_rate(income)
+    rebate = deductible * tax_rate
+    return deductible, tax_rate, rebate, excess
+
+def calculate_ra_ledger(years, carried_forward=0, cumulative_rebate=0):
+    """Carry excess RA contributions forward through successive tax years.
+
+    years is a list of (income, contribution, tax_year) tuples in order. Each year the excess
+    carried forward is added to that year's contribution and deducted up to that year's limit.
+    Returns one (deductible, tax_rate, rebate, carried_forward, cumulative_rebate) row per year.
+    To append later years, pass the last row's carried_forward and cumulative_rebate back in
+    instead of recomputing the history.
+    """
+    ledger = []
+    for income, contribution, tax_year in years:
+        deductible, tax_rate, rebate, carried_forward = calculate_ra_rebate(income, contribution + carried_forward, tax_year)
+        cumulative_rebate += rebate
+        ledger.append((deductible, tax_rate, rebate, carried_forward, cumulative_rebate))
+    return ledger
+
+# Calculate Medical Tax Credits
+def calculate_medical_tax_credits(num_dependants, tax_year=None):
+    """Calculate the Medical Scheme Fees Tax Credit (MTC) based on the number of dependants."""
+    if num_dependants <= 0:
+        return 0, 0
+    table = get_tax_table(tax_year)
+    # First two members (taxpayer + first dependant) get R364 each per month
+    if num_dependants <= 2:
+        annual_mtc = num_dependants * table.mtc_per_person * 12
+    else:
+        # First two get R364 each, additional dependants get R246 each
+        annual_mtc = (2 * table.mtc_per_person * 12) + ((num_dependants - 2) * table.mtc_additional_dependant * 12)
+    monthly_mtc = annual_mtc / 12
+    return annual_mtc, monthly_mtc
+
+# Salary Tax Calculator Function
+def calculate_salary_tax(gross_salary, pension_contribution, age, medical_contributions, num_dependants, tax_year=None):
+    """Calculate PAYE, UIF, MTC, taxable income, and tax rates."""
+    table = get_tax_table(tax_year)
+    # Step 1: Calculate Taxable Income
+    max_deductible = min(gross_salary * table.ra_deduction_rate, table.ra_deduction_cap)  # Pension/RA deduction limit
+    deductible_contribution = min(pension_contribution, max_deductible)
+    taxable_income = max(0, gross_salary - deductible_contribution)
+
+    # Step 2: Calculate PAYE before MTC
+    tax_before_rebates = table.tax_before_rebates(taxable_income)
+    marginal_rate = table.marginal_rate(taxable_income) if taxable_income > 0 else 0
+
+    # Apply rebates based on age
+    total_rebate = table.total_rebate(age)
+    paye_before_mtc = max(0, tax_before_rebates - total_rebate)
+    paye_before_mtc_monthly = paye_before_mtc / 12
+
+    # Step 3: Calculate Medical Tax Credits
+    mtc_annual, mtc_monthly = calculate_medical_tax_credits(num_dependants, tax_year)
+    # Apply MTC to reduce PAYE
+    paye = max(0, paye_before_mtc - mtc_annual)
+    paye_monthly = paye / 12
+
+    # Step 4: Calculate UIF (employee contribution)
+    annual_salary_for_uif = min(gross_salary, table.uif_annual_cap)
+    uif = annual_salary_for_uif * table.uif_rate
+    uif_monthly = uif / 12
+
+    # Step 5: Calculate Net Income
+    net_income = gross_salary - paye - uif
+    net_income_monthly = net_income / 12
+
+    return taxable_income, paye_before_mtc, paye_before_mtc_monthly, mtc_annual, mtc_monthly, paye, paye_monthly, uif, uif_monthly, net_income, net_income_monthly, marginal_rate
@@ -0,0 +1,121 @@
+"""SARS tax tables per tax year, loaded once from tax_tables.json.
+
+Tax years are keyed by the calendar year in which they end, so 2025 is the
+2024/2025 tax year (1 March 2024 - 28 February 2025).
+"""
+import hashlib
+import json
+from bisect import bisect_left
+from pathlib import Path
+
+TAX_TABLES_PATH = Path(__file__).with_name("tax_tables.json")
+TAX_TABLES_VERSION = 1  # Data file format this module understands
+DEFAULT_TAX_YEAR = 2025  # 2024/2025
+
+
+class TaxTable:
+    """Immutable tax table for one year with precomputed bracket thresholds and base tax.
+
+    Bracket i applies to income above thresholds[i] (up to thresholds[i + 1]), taxed at
+    base_taxes[i] + (income - thresholds[i]) * rates[i], as in the SARS tables.
+    """
+
+    __slots__ = (
+        "year", "label", "thresholds", "rates", "base_taxes",
+        "primary_rebate", "secondary_rebate", "tertiary_rebate",
+        "uif_rate", "uif_monthly_cap", "uif_annual_cap",
+        "mtc_per_person", "mtc_additional_dependant",
+        "ra_deduction_rate", "ra_deduction_cap",
+    )
+
+    def __init__(self, year, label, brackets, rebates, uif_rate, uif_monthly_cap,
+                 mtc_per_person, mtc_additional_dependant, ra_deduction_rate, ra_deduction_cap):
+        thresholds = tuple(float(threshold) for threshold, rate in brackets)
+        rates = tuple(float(rate) for threshold, rate in brackets)
+        if not thresholds or thresholds[0] != 0 or list(thresholds) != sorted(set(thresholds)):
+            raise ValueError(f"Tax year {year}: bracket thresholds must start at 0 and increase.")
+        # Cumulative tax payable at the start of each bracket
+        base_taxes = [0.0]
+        for i in range(1, len(thresholds)):
+            base_taxes.append(base_taxes[-1] + (thresholds[i] - thresholds[i - 1]) * rates[i - 1])
+        set_field = object.__setattr__
+        set_field(self, "year", int(year))
+        set_field(self, "label", label)
+        set_field(self, "thresholds", thresholds)
+        set_field(self, "rates", rates)
+        set_field(self, "base_taxes", tuple(round(base_tax, 2) for base_tax in base_taxes))
+        set_field(self, "primary_rebate", rebates["primary"])
+        set_field(self, "secondary_rebate", rebates["secondary"])  # Age 65+
+        set_field(self, "tertiary_rebate", rebates["tertiary"])  # Age 75+
+        set_field(self, "uif_rate", uif_rate)
+        set_field(self, "uif_monthly_cap", uif_monthly_cap)
+        set_field(self, "uif_annual_cap", uif_monthly_cap * 12)
+        set_field(self, "mtc_per_person", mtc_per_person)
+        set_field(self, "mtc_additional_dependant", mtc_additional_dependant)
+        set_field(self, "ra_deduction_rate", ra_deduction_rate)
+        set_field(self, "ra_deduction_cap", ra_deduction_cap)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("TaxTable is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("TaxTable is immutable")
+
+    def __repr__(self):
+        return f"TaxTable({self.label})"
+
+    def bracket_index(self, income):
+        """Return the index of the bracket that taxes the last rand of income."""
+        return max(bisect_left(self.thresholds, income) - 1, 0)
+
+    def marginal_rate(self, income):
+        """Return the marginal tax rate for an annual taxable income."""
+        return self.rates[self.bracket_index(income)]
+
+    def tax_before_rebates(self, income):
+        """Return the tax on an annual taxable income before rebates and credits."""
+        if income <= 0:
+            return 0
+        i = self.bracket_index(income)
+        return self.base_taxes[i] + (income - self.thresholds[i]) * self.rates[i]
+
+    def total_rebate(self, age):
+        """Return the primary, secondary and tertiary rebates that apply at an age."""
+        total_rebate = self.primary_rebate
+        if age >= 75:
+            total_rebate += self.secondary_rebate + self.tertiary_rebate
+        elif age >= 65:
+            total_rebate += self.secondary_rebate
+        return total_rebate
+
+    @classmethod
+    def from_dict(cls, year, data):
+        """Build a TaxTable from one year's entry in the data file."""
+        return cls(
+            year, data["label"], data["brackets"], data["rebates"], data["uif_rate"], data["uif_monthly_cap"],
+            data["mtc_per_person"], data["mtc_additional_dependant"], data["ra_deduction_rate"], data["ra_deduction_cap"]
+        )
+
+
+def load_tax_tables(path=TAX_TABLES_PATH):
+    """Parse a versioned tax table file into a {year: TaxTable} dict."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != TAX_TABLES_VERSION:
+        raise ValueError(f"Unsupported tax table version {data.get('version')!r} in {path}")
+    return {int(year): TaxTable.from_dict(year, table) for year, table in data["tables"].items()}
+
+
+# Registry of every known tax year, parsed once at import
+TAX_TABLES = load_tax_tables()
+# Changes whenever the data file is edited, so cached results from old rates are not reused
+TAX_TABLES_FINGERPRINT = hashlib.sha256(TAX_TABLES_PATH.read_bytes()).hexdigest()[:16]
+
+
+def get_tax_table(year=None):
+    """Return the TaxTable for a tax year (default DEFAULT_TAX_YEAR)."""
+    year = DEFAULT_TAX_YEAR if year is None else int(year)
+    try:
+        return TAX_TABLES[year]
+    except KeyError:
+        raise ValueError(f"No tax table for {year}. Available years: {', '.join(map(str, sorted(TAX_TABLES)))}") from None
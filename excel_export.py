@@ -0,0 +1,67 @@
+"""Shared Excel export for the calculator tools.
+
+Each tool describes its workbook as a list of (sheet name, DataFrame, start row) blocks plus the
+lines of its Instructions sheet. Workbook bytes are only built when requested, and are cached by
+a hash of that content so repeated downloads of the same result reuse them.
+"""
+import hashlib
+import io
+import math
+
+import pandas as pd
+import xlsxwriter
+
+from calc_cache import CalculationCache
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CONSTANT_MEMORY_ROWS = 10000  # Stream rows to disk (xlsxwriter constant_memory) above this size
+WORKBOOK_CACHE = CalculationCache(max_entries=64, ttl=900, max_bytes=64 * 2 ** 20)
+
+
+def workbook_key(sheets, instructions):
+    """Hash the sheet blocks and instructions into a cache key."""
+    digest = hashlib.sha256()
+    for sheet_name, df, startrow in sheets:
+        digest.update(f"{sheet_name}\0{startrow}\0{list(map(str, df.columns))}\0{len(df)}\0".encode())
+        if len(df.columns):
+            digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    digest.update("\0".join(instructions).encode())
+    return digest.hexdigest()
+
+
+def _cell(value):
+    # Blank out NaN/inf like DataFrame.to_excel does
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def build_workbook(sheets, instructions):
+    """Write the sheet blocks and an Instructions sheet into a new workbook and return its bytes.
+
+    Blocks sharing a sheet name are stacked at their start rows, which must increase. Large
+    workbooks are written in constant_memory mode, which flushes each row once it is complete.
+    """
+    total_rows = sum(len(df) for sheet_name, df, startrow in sheets)
+    buffer = io.BytesIO()
+    workbook = xlsxwriter.Workbook(buffer, {"constant_memory": total_rows > CONSTANT_MEMORY_ROWS})
+    header_format = workbook.add_format({"bold": True, "border": 1, "align": "center"})
+    worksheets = {}
+    for sheet_name, df, startrow in sheets:
+        if sheet_name not in worksheets:
+            worksheets[sheet_name] = workbook.add_worksheet(sheet_name)
+        worksheet = worksheets[sheet_name]
+        worksheet.write_row(startrow, 0, [str(column) for column in df.columns], header_format)
+        for row_number, row in enumerate(df.itertuples(index=False, name=None), start=startrow + 1):
+            worksheet.write_row(row_number, 0, [_cell(value) for value in row])
+    # Add a note sheet for chart instructions
+    worksheet = workbook.add_worksheet("Instructions")
+    worksheet.write(0, 0, "Instructions", header_format)
+    worksheet.write_column(1, 0, instructions)
+    workbook.close()
+    return buffer.getvalue()
+
+
+def workbook_bytes(sheets, instructions):
+    """Return the workbook bytes for a result, building them only on a cache miss."""
+    return WORKBOOK_CACHE.get_or_set(workbook_key(sheets, instructions), lambda: build_workbook(sheets, instructions))
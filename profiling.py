@@ -0,0 +1,143 @@
+"""Opt-in timing and allocation profiling for the calculators, the app phases and the API.
+
+Disabled unless the APP_PROFILE environment variable is 1 when the process starts. While
+disabled, profiled() returns functions unchanged and phase() returns a shared no-op context
+manager, so instrumented code pays nothing beyond that lookup. While enabled, every call or
+phase records its wall time, through tracemalloc the memory it allocated at its peak and still
+held on exit, and the number of memory blocks (objects and small buffers) it left allocated.
+PROFILER.stats() returns the totals as a dict and PROFILER.prometheus_text() in the
+Prometheus text format.
+
+tracemalloc's peak and the interpreter's block count are process-wide, so while profiling is
+on, profiled blocks on different threads (concurrent Streamlit sessions) run one at a time;
+otherwise one session's block would reset or inflate another's figures. Wall times start once
+a block has its turn, so they don't include the wait. Code outside profiled blocks still runs
+concurrently, and its allocations can show up in an overlapping block's figures.
+"""
+import contextlib
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from functools import wraps
+
+PROFILING_ENABLED = os.environ.get("APP_PROFILE") == "1"
+_NO_OP = contextlib.nullcontext()
+
+PROMETHEUS_METRICS = (
+    ("calls", "app_profile_calls_total", "counter", "Calls of each instrumented function or phase"),
+    ("seconds", "app_profile_seconds_total", "counter", "Wall time spent in each function or phase"),
+    ("max_seconds", "app_profile_seconds_max", "gauge", "Slowest single call of each function or phase"),
+    ("allocated_bytes", "app_profile_allocated_bytes_total", "counter", "Peak memory allocated during calls, summed over calls"),
+    ("retained_bytes", "app_profile_retained_bytes_total", "counter", "Memory still allocated when calls returned, summed over calls"),
+    ("max_allocated_bytes", "app_profile_allocated_bytes_max", "gauge", "Largest peak allocation of a single call"),
+    ("retained_blocks", "app_profile_retained_blocks_total", "counter", "Memory blocks still allocated when calls returned, summed over calls"),
+)
+
+
+class Profiler:
+    """Thread-safe per-name totals of call counts, wall time, tracemalloc allocations and block counts."""
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._measuring = threading.RLock()  # Held by the outermost profiled block on a thread
+        self._local = threading.local()
+
+    @contextlib.contextmanager
+    def measure(self, name):
+        """Record the wall time and allocations of the enclosed block under name."""
+        stack = self._local.__dict__.setdefault("stack", [])
+        outermost = not stack
+        if outermost:
+            self._measuring.acquire()
+        try:
+            with self._measure(name, stack):
+                yield
+        finally:
+            if outermost:
+                self._measuring.release()
+
+    @contextlib.contextmanager
+    def _measure(self, name, stack):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            # Keep the enclosing block's peak before resetting it for this one
+            stack[-1][1] = max(stack[-1][1], peak)
+        tracemalloc.reset_peak()
+        frame = [current, current]
+        stack.append(frame)
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            retained_blocks = sys.getallocatedblocks() - blocks
+            current_after, peak = tracemalloc.get_traced_memory()
+            stack.pop()
+            frame_peak = max(frame[1], peak)
+            if stack:
+                stack[-1][1] = max(stack[-1][1], frame_peak)
+            self._record(name, seconds, frame_peak - frame[0], current_after - frame[0], retained_blocks)
+
+    def _record(self, name, seconds, allocated_bytes, retained_bytes, retained_blocks):
+        with self._lock:
+            entry = self._stats.setdefault(name, {
+                "calls": 0, "seconds": 0.0, "max_seconds": 0.0, "allocated_bytes": 0, "retained_bytes": 0, "max_allocated_bytes": 0,
+                "retained_blocks": 0
+            })
+            entry["calls"] += 1
+            entry["seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+            entry["allocated_bytes"] += allocated_bytes
+            entry["retained_bytes"] += retained_bytes
+            entry["max_allocated_bytes"] = max(entry["max_allocated_bytes"], allocated_bytes)
+            entry["retained_blocks"] += retained_blocks
+
+    def stats(self):
+        """Return {name: totals}, slowest total first."""
+        with self._lock:
+            return {name: dict(entry) for name, entry in sorted(self._stats.items(), key=lambda item: -item[1]["seconds"])}
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def prometheus_text(self):
+        """Return the totals in the Prometheus text exposition format."""
+        stats = self.stats()
+        lines = []
+        for key, metric, metric_type, description in PROMETHEUS_METRICS:
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} {metric_type}")
+            for name, entry in stats.items():
+                label = name.replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'{metric}{{name="{label}"}} {entry[key]}')
+        return "\n".join(lines) + "\n"
+
+
+PROFILER = Profiler()
+
+
+def profiled(func, name=None):
+    """Return func wrapped to record each call under name (default module.qualname), or func itself when disabled."""
+    if not PROFILING_ENABLED:
+        return func
+    name = name or f"{func.__module__}.{func.__qualname__}"
+
+    @wraps(func)
+    def profiled_func(*args, **kwargs):
+        with PROFILER.measure(name):
+            return func(*args, **kwargs)
+    return profiled_func
+
+
+def phase(name):
+    """Context manager recording a block of app code as phase.<name>; a no-op when disabled."""
+    if not PROFILING_ENABLED:
+        return _NO_OP
+    return PROFILER.measure(f"phase.{name}")
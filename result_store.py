@@ -0,0 +1,190 @@
+"""Persistent SQLite store of calculation results.
+
+Each record holds the tool, client name, time, tax year and tax table fingerprint, and the
+calculation's inputs and outputs as JSON. Records are indexed by client and time for history
+lookups and by a hash of the tool, inputs and tax tables, so a result already calculated
+under the current tax tables can be loaded instead of recalculated, even after a restart.
+Bulk inserts run in batched transactions. Each thread uses its own connection, and the
+database runs in WAL mode so readers don't block the writer.
+
+Outputs are stored as JSON, so they come back as JSON types: tuples as lists, dict keys as
+strings. get_or_compute takes a decode function to restore anything else.
+
+The app's store lives at RESULT_STORE_PATH (default results.sqlite3 in the working
+directory); set it to an empty string to turn the store off.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from calculators.tax_tables import TAX_TABLES_FINGERPRINT
+
+INSERT_BATCH_ROWS = 10000  # Rows per transaction in record_many
+HISTORY_LIMIT = 100
+RESULT_STORE_PATH = os.environ.get("RESULT_STORE_PATH", "results.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    tool TEXT NOT NULL,
+    client TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    tax_year INTEGER,
+    tax_tables TEXT NOT NULL,
+    input_key BLOB NOT NULL,
+    inputs TEXT NOT NULL,
+    outputs TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_client ON results (client, created_at);
+CREATE INDEX IF NOT EXISTS results_input_key ON results (input_key, created_at);
+"""
+
+
+def _json_default(value):
+    # NumPy scalars and arrays
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Cannot store {type(value).__name__} in the result store")
+
+
+def _input_key(tool, inputs_json):
+    return hashlib.sha256(f"{tool}\0{inputs_json}\0{TAX_TABLES_FINGERPRINT}".encode()).digest()[:16]
+
+
+def input_key(tool, inputs):
+    """16-byte hash of a tool's inputs (as JSON with sorted keys) under the current tax tables."""
+    return _input_key(tool, json.dumps(inputs, sort_keys=True, default=_json_default))
+
+
+class ResultStore:
+    """Calculation history in one SQLite file, safe to share between threads."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _row(self, tool, client, inputs, outputs, tax_year, created_at):
+        # The inputs are serialized once, for both the key and the stored copy
+        inputs_json = json.dumps(inputs, sort_keys=True, default=_json_default)
+        return (
+            tool, client, time.time() if created_at is None else created_at, tax_year, TAX_TABLES_FINGERPRINT,
+            _input_key(tool, inputs_json), inputs_json, json.dumps(outputs, default=_json_default),
+        )
+
+    def record(self, tool, client, inputs, outputs, tax_year=None, created_at=None):
+        """Store one calculation and return its id."""
+        connection = self._connection()
+        with connection:
+            cursor = connection.execute(
+                "INSERT INTO results (tool, client, created_at, tax_year, tax_tables, input_key, inputs, outputs) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                self._row(tool, client, inputs, outputs, tax_year, created_at)
+            )
+        return cursor.lastrowid
+
+    def record_many(self, records, batch_rows=INSERT_BATCH_ROWS):
+        """Store an iterable of (tool, client, inputs, outputs, tax_year) tuples, batch_rows per transaction."""
+        connection = self._connection()
+        batch, total = [], 0
+        for tool, client, inputs, outputs, tax_year in records:
+            batch.append(self._row(tool, client, inputs, outputs, tax_year, None))
+            if len(batch) == batch_rows:
+                total += self._insert(connection, batch)
+                batch = []
+        if batch:
+            total += self._insert(connection, batch)
+        return total
+
+    def _insert(self, connection, rows):
+        with connection:
+            connection.executemany(
+                "INSERT INTO results (tool, client, created_at, tax_year, tax_tables, input_key, inputs, outputs) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+    def find(self, tool, inputs):
+        """Return the latest outputs stored for these inputs under the current tax tables, or None."""
+        row = self._connection().execute(
+            "SELECT outputs FROM results WHERE input_key = ? ORDER BY created_at DESC LIMIT 1", (input_key(tool, inputs),)
+        ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def get_or_compute(self, tool, inputs, compute, client="", tax_year=None, decode=None):
+        """Return the stored outputs for these inputs (passed through decode), or compute(), record and return them.
+
+        Outputs stored for another client are also recorded for this one, so they appear in
+        its history.
+        """
+        outputs = self.find(tool, inputs)
+        if outputs is not None:
+            recorded = self._connection().execute(
+                "SELECT 1 FROM results WHERE input_key = ? AND client = ? LIMIT 1", (input_key(tool, inputs), client)
+            ).fetchone()
+            if recorded is None:
+                self.record(tool, client, inputs, outputs, tax_year)
+            return decode(outputs) if decode else outputs
+        outputs = compute()
+        self.record(tool, client, inputs, outputs, tax_year)
+        return outputs
+
+    def history(self, client, tool=None, since=None, until=None, limit=HISTORY_LIMIT):
+        """Return a client's records, newest first, as dicts, optionally for one tool and a created_at range."""
+        query = "SELECT id, tool, client, created_at, tax_year, inputs, outputs FROM results WHERE client = ?"
+        parameters = [client]
+        if since is not None:
+            query += " AND created_at >= ?"
+            parameters.append(since)
+        if until is not None:
+            query += " AND created_at < ?"
+            parameters.append(until)
+        query += " ORDER BY created_at DESC"
+        if tool is None:
+            query += " LIMIT ?"
+            parameters.append(limit)
+            rows = self._connection().execute(query, parameters).fetchall()
+        else:
+            # Filtered after the indexed range scan, so other tools' rows don't need their own index
+            rows = [row for row in self._connection().execute(query, parameters) if row[1] == tool][:limit]
+        return [
+            {"id": id_, "tool": tool_, "client": client_, "created_at": created_at, "tax_year": tax_year,
+             "inputs": json.loads(inputs), "outputs": json.loads(outputs)}
+            for id_, tool_, client_, created_at, tax_year, inputs, outputs in rows
+        ]
+
+    def count(self):
+        return self._connection().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        """Close this thread's connection."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def default_result_store():
+    """The process-wide store at RESULT_STORE_PATH, opened on first use, or None if it is turned off."""
+    global _default_store
+    if not RESULT_STORE_PATH:
+        return None
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ResultStore(RESULT_STORE_PATH)
+    return _default_store
@@ -0,0 +1,102 @@
+"""Server-side slicing and down-sampling of large results before they are sent to the browser.
+
+Streamlit serializes every DataFrame it displays or charts (as Arrow) into the websocket
+message on each rerun, so a million-row result would ship the whole dataset every time.
+These helpers cut a result down to what fits on screen: one page of a table (sorted without
+sorting every row), a line chart thinned to about one point per pixel column, a heatmap
+grid thinned along each axis, and a bar chart of the largest categories with the rest summed.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+PAGE_SIZES = (25, 100, 500)
+MAX_LINE_POINTS = 1000  # About one point per pixel column of a full-width chart
+MAX_HEATMAP_VALUES = 60  # Cells along each heatmap axis
+MAX_BAR_CATEGORIES = 20
+
+
+def page_count(rows, page_size):
+    """Number of pages needed for rows (at least one)."""
+    return max(math.ceil(rows / page_size), 1)
+
+
+def result_page(df, page, page_size, sort_column=None, ascending=True):
+    """Return page (0-based) of df, ordered by sort_column if given.
+
+    Numeric columns are ordered with a partial sort of the rows up to the end of the page,
+    so the first pages of a large result cost O(n) rather than a full sort. The order is that
+    of DataFrame.sort_values(kind="stable"): ties keep their row order and missing values sort
+    last.
+    """
+    start = page * page_size
+    stop = min(start + page_size, len(df))
+    if start >= stop:
+        return df.iloc[0:0]
+    if sort_column is None:
+        return df.iloc[start:stop]
+    values = df[sort_column]
+    if not pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+        return df.sort_values(sort_column, ascending=ascending, kind="stable").iloc[start:stop]
+    keys = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    missing = np.isnan(keys)
+    keys = keys if ascending else -keys
+    present = np.flatnonzero(~missing)
+    if stop < len(present):
+        # Every row up to the key at the end of the page, including all rows tied with it, so
+        # the stable sort orders ties by position and each page continues the last one
+        boundary = np.partition(keys[present], stop - 1)[stop - 1]
+        rows = present[keys[present] <= boundary]
+    else:
+        rows = present
+    rows = rows[np.argsort(keys[rows], kind="stable")]
+    if stop > len(rows):
+        rows = np.concatenate([rows, np.flatnonzero(missing)])
+    return df.iloc[rows[start:stop]]
+
+
+def downsample_line(df, x, max_points=MAX_LINE_POINTS):
+    """Thin a line chart's rows (ordered by x) to about max_points, keeping every column's peaks.
+
+    The rows are split into equal buckets and each bucket keeps its first row and the rows
+    holding each column's minimum and maximum, so spikes survive the thinning.
+    """
+    if len(df) <= max_points:
+        return df
+    columns = [column for column in df.columns if column != x and pd.api.types.is_numeric_dtype(df[column])]
+    buckets = max(max_points // (2 * len(columns) + 1), 1)
+    bucket_size = math.ceil(len(df) / buckets)
+    padding = buckets * bucket_size - len(df)
+    offsets = np.arange(buckets) * bucket_size
+    keep = [offsets, [len(df) - 1]]
+    for column in columns:
+        values = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+        low = np.concatenate([np.where(np.isnan(values), np.inf, values), np.full(padding, np.inf)]).reshape(buckets, bucket_size)
+        high = np.concatenate([np.where(np.isnan(values), -np.inf, values), np.full(padding, -np.inf)]).reshape(buckets, bucket_size)
+        keep += [offsets + low.argmin(axis=1), offsets + high.argmax(axis=1)]
+    rows = np.unique(np.concatenate(keep))
+    return df.iloc[rows[rows < len(df)]]
+
+
+def thin_grid(df, axes, max_values=MAX_HEATMAP_VALUES):
+    """Keep at most max_values evenly spaced values of each axis column of a heatmap grid."""
+    mask = np.ones(len(df), dtype=bool)
+    for column in axes:
+        values = np.sort(df[column].unique())
+        if len(values) > max_values:
+            keep = values[np.round(np.linspace(0, len(values) - 1, max_values)).astype(int)]
+            mask &= df[column].isin(keep).to_numpy()
+    return df if mask.all() else df[mask]
+
+
+def top_categories(df, category, value, limit=MAX_BAR_CATEGORIES, keep=(), other="Other"):
+    """Keep the limit categories with the largest absolute value (plus any in keep) and sum the rest as other."""
+    if len(df) <= limit:
+        return df
+    kept = df[category].isin(keep)
+    largest = df.loc[~kept, value].abs().nlargest(max(limit - int(kept.sum()) - 1, 0)).index
+    selected = kept | df.index.isin(largest)
+    rest = pd.DataFrame({category: [other], value: [df.loc[~selected, value].sum()]})
+    # Keep the original order of the selected rows, with the other row before any kept ones
+    return pd.concat([df[selected & ~kept], rest, df[kept]], ignore_index=True)
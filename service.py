@@ -0,0 +1,358 @@
+"""Local HTTP JSON API over the calculators package.
+
+A plain ASGI application, so it runs under any ASGI server:
+
+    uvicorn service:app --port 8000
+
+Endpoints (all POST with a JSON body, plus GET /health and GET /metrics):
+    /ra-rebate          {"income", "contribution", "tax_year"?}
+    /ra-ledger          {"years": [{"income", "contribution", "tax_year"?}], "carried_forward"?, "cumulative_rebate"?}
+    /salary-tax         {"gross_salary", "pension_contribution", "age", "num_dependants", "tax_year"?}
+    /salary-tax/batch   {"clients": [salary-tax bodies], "tax_year"?}
+    /retirement         retirement plan inputs and a list of provisions
+    /estate-liquidity   estate assets, liabilities and will details
+
+GET /metrics returns the profiling totals (see profiling.py) in the Prometheus text format;
+they are empty unless the service was started with APP_PROFILE=1.
+
+Concurrent /salary-tax/batch requests are coalesced by a MicroBatcher into one vectorized
+calculate_salary_tax_batch call, waiting at most MAX_BATCH_WAIT seconds for more requests.
+"""
+import asyncio
+import json
+import math
+
+from calculators import (
+    average_contribution_increase,
+    calculate_additional_savings_needed,
+    calculate_estate_liquidity,
+    calculate_ra_ledger,
+    calculate_ra_rebate,
+    calculate_retirement_plan,
+    calculate_salary_tax,
+    calculate_years_until_depletion,
+    project_provisions,
+)
+from calculators.estate import ESTATE_LIQUIDITY_OUTPUTS
+from calculators.tax import RA_LEDGER_OUTPUTS, SALARY_TAX_OUTPUTS
+from calculators.tax_tables import get_tax_table
+from profiling import PROFILER, profiled
+
+MAX_BATCH_ROWS = 8192  # Flush a micro-batch as soon as it holds this many clients
+MAX_BATCH_WAIT = 0.002  # Seconds to wait for more requests before flushing
+MAX_BODY_BYTES = 16 * 1024 * 1024
+MAX_AGE = 120
+MAX_PLAN_YEARS = 100  # Longest saving or preservation period /retirement accepts
+
+
+class RequestError(Exception):
+    """Invalid request; reported to the client as a 400."""
+
+
+def _number(body, name, default=None):
+    value = body.get(name, default)
+    if value is None:
+        raise RequestError(f"Missing field: {name}")
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise RequestError(f"Field {name} must be a number")
+    if isinstance(value, float) and not math.isfinite(value):
+        raise RequestError(f"Field {name} must be a finite number")
+    if value < 0:
+        raise RequestError(f"Field {name} must be non-negative")
+    return value
+
+
+def _age(body, name):
+    age = _number(body, name)
+    if age > MAX_AGE:
+        raise RequestError(f"Field {name} must be at most {MAX_AGE}")
+    return age
+
+
+def _number_list(body, name):
+    values = body.get(name, [])
+    if not isinstance(values, list):
+        raise RequestError(f"Field {name} must be a list")
+    return [_number({name: value}, name) for value in values]
+
+
+def _objects(body, name):
+    values = body.get(name, [])
+    if not isinstance(values, list) or not all(isinstance(value, dict) for value in values):
+        raise RequestError(f"Field {name} must be a list of objects")
+    return values
+
+
+def _tax_year(body):
+    """The body's tax_year as a year with a tax table (the default table's when missing)."""
+    value = body.get("tax_year")
+    if isinstance(value, bool) or not isinstance(value, (int, float, str, type(None))) or (isinstance(value, float) and not value.is_integer()):
+        raise RequestError("Field tax_year must be a year")
+    try:
+        return get_tax_table(value).year
+    except (TypeError, ValueError) as e:
+        raise RequestError(f"Field tax_year: {e}") from None
+
+
+def _json_value(value):
+    # JSON has no inf/NaN; report them as null
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def ra_rebate(body):
+    deductible, tax_rate, rebate, excess = calculate_ra_rebate(_number(body, "income"), _number(body, "contribution"), _tax_year(body))
+    return {"deductible": deductible, "tax_rate": tax_rate, "rebate": rebate, "excess": excess}
+
+
+def ra_ledger(body):
+    years = [
+        (_number(year, "income"), _number(year, "contribution"), _tax_year(year))
+        for year in _objects(body, "years")
+    ]
+    ledger = calculate_ra_ledger(years, _number(body, "carried_forward", 0), _number(body, "cumulative_rebate", 0))
+    return {"years": [dict(zip(RA_LEDGER_OUTPUTS, row)) for row in ledger]}
+
+
+def salary_tax(body):
+    results = calculate_salary_tax(
+        _number(body, "gross_salary"), _number(body, "pension_contribution", 0), _age(body, "age"),
+        _number(body, "medical_contributions", 0), _number(body, "num_dependants", 0), _tax_year(body)
+    )
+    return dict(zip(SALARY_TAX_OUTPUTS, results))
+
+
+def retirement(body):
+    current_age, retirement_age = _age(body, "current_age"), _age(body, "retirement_age")
+    if current_age >= retirement_age:
+        raise RequestError("current_age must be less than retirement_age")
+    years_to_retirement = int(retirement_age - current_age)
+    preservation_years = _number(body, "preservation_years", 0)
+    if years_to_retirement > MAX_PLAN_YEARS or preservation_years > MAX_PLAN_YEARS:
+        raise RequestError(f"retirement_age - current_age and preservation_years must be at most {MAX_PLAN_YEARS}")
+    inflation_rate, assumed_return = _number(body, "inflation_rate"), _number(body, "assumed_return")
+    preserve_capital = bool(body.get("preserve_capital", False))
+    future_annual_income, future_monthly_income, capital_required, years_until_depletion, withdrawal_at_retirement = calculate_retirement_plan(
+        _number(body, "desired_monthly_income"), inflation_rate, _number(body, "annual_increase", 0), years_to_retirement,
+        preserve_capital, preservation_years, assumed_return
+    )
+    provisions = [
+        {
+            "current_value": _number(provision, "current_value", 0),
+            "annual_return": _number(provision, "annual_return", 0),
+            "monthly_contribution": _number(provision, "monthly_contribution", 0),
+            "contribution_increase": _number(provision, "contribution_increase", 0),
+        }
+        for provision in _objects(body, "provisions")
+    ]
+    future_values, total_provision_value, average_return = project_provisions(provisions, years_to_retirement)
+    result = {
+        "years_to_retirement": years_to_retirement,
+        "future_annual_income": future_annual_income,
+        "future_monthly_income": future_monthly_income,
+        "provision_future_values": future_values,
+        "total_provision_value": total_provision_value,
+    }
+    if preserve_capital:
+        shortfall = capital_required - total_provision_value
+        result.update({
+            "capital_required": capital_required,
+            "initial_withdrawal": withdrawal_at_retirement,
+            "capital_shortfall": max(0, shortfall),
+            "additional_monthly_savings": calculate_additional_savings_needed(
+                shortfall, years_to_retirement, average_return, average_contribution_increase(provisions)
+            ),
+        })
+    else:
+        years_until_depletion, first_withdrawal, capital_over_time = calculate_years_until_depletion(
+            total_provision_value, future_annual_income, inflation_rate, years_to_retirement, assumed_return
+        )[:3]
+        result.update({
+            "years_until_depletion": years_until_depletion,
+            "initial_withdrawal": first_withdrawal,
+            "capital_over_time": capital_over_time,
+        })
+    return result
+
+
+def estate_liquidity(body):
+    investments = [
+        {"market_value": _number(investment, "market_value"), "base_cost": _number(investment, "base_cost")}
+        for investment in _objects(body, "investments")
+    ]
+    marginal_tax_rate = _number(body, "marginal_tax_rate", 0.45)
+    if marginal_tax_rate > 0.45:
+        raise RequestError("marginal_tax_rate must be between 0 and 0.45")
+    results = calculate_estate_liquidity(
+        _number(body, "cash", 0), _number(body, "life_insurance_to_estate", 0),
+        _number_list(body, "properties"), investments,
+        _number(body, "other_assets", 0), _number(body, "debts", 0), _number(body, "medical_bills", 0),
+        _number(body, "cash_bequests", 0), bool(body.get("has_surviving_spouse", False)),
+        _number(body, "spouse_bequest_value", 0), _number(body, "pbo_bequest_value", 0), marginal_tax_rate
+    )
+    return dict(zip(ESTATE_LIQUIDITY_OUTPUTS, results))
+
+
+def salary_tax_rows(clients, tax_year):
+    """Run the vectorized salary tax calculation over a list of client dicts."""
+    # Imported here so the service starts without loading NumPy until the first batch
+    from calculators.batch import calculate_salary_tax_batch
+    columns = (
+        [_number(client, "gross_salary") for client in clients],
+        [_number(client, "pension_contribution", 0) for client in clients],
+        [_age(client, "age") for client in clients],
+        [_number(client, "num_dependants", 0) for client in clients],
+    )
+    results = calculate_salary_tax_batch(*columns, tax_year=tax_year)
+    values = [results[name].tolist() for name in SALARY_TAX_OUTPUTS]
+    return [dict(zip(SALARY_TAX_OUTPUTS, row)) for row in zip(*values)]
+
+
+class MicroBatcher:
+    """Coalesce concurrent small requests into one call of a vectorized function.
+
+    compute(items) must return one result per item. Requests are flushed together once
+    max_rows items are pending or max_wait seconds after the first pending request.
+    """
+
+    def __init__(self, compute, max_rows=MAX_BATCH_ROWS, max_wait=MAX_BATCH_WAIT):
+        self.compute = compute
+        self.max_rows = max_rows
+        self.max_wait = max_wait
+        self._pending = []  # (items, future)
+        self._pending_rows = 0
+        self._timer = None
+        self.batches = self.requests = 0
+
+    async def submit(self, items):
+        """Queue items and wait for their results."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((items, future))
+        self._pending_rows += len(items)
+        if self._pending_rows >= self.max_rows:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self.flush)
+        return await future
+
+    def flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending, self._pending_rows = self._pending, [], 0
+        if not pending:
+            return
+        self.batches += 1
+        self.requests += len(pending)
+        try:
+            results = self.compute([item for items, future in pending for item in items])
+        except Exception:
+            # Fall back to one call per request so one bad request doesn't fail the others
+            for items, future in pending:
+                try:
+                    future.set_result(self.compute(items))
+                except Exception as e:
+                    future.set_exception(e)
+            return
+        start = 0
+        for items, future in pending:
+            future.set_result(results[start:start + len(items)])
+            start += len(items)
+
+
+# One batcher per tax year with a table, created on first use
+_salary_tax_batchers = {}
+
+
+async def salary_tax_batch(body):
+    clients = _objects(body, "clients")
+    tax_year = _tax_year(body)
+    batcher = _salary_tax_batchers.get(tax_year)
+    if batcher is None:
+        batcher = _salary_tax_batchers[tax_year] = MicroBatcher(profiled(lambda items: salary_tax_rows(items, tax_year), "service.salary_tax_rows"))
+    return {"results": await batcher.submit(clients)}
+
+
+# The batch endpoint is a coroutine, so its time is recorded per flushed batch instead
+ROUTES = {
+    "/ra-rebate": profiled(ra_rebate),
+    "/ra-ledger": profiled(ra_ledger),
+    "/salary-tax": profiled(salary_tax),
+    "/salary-tax/batch": salary_tax_batch,
+    "/retirement": profiled(retirement),
+    "/estate-liquidity": profiled(estate_liquidity),
+}
+
+
+async def _read_body(receive):
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise RequestError("Request body too large")
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+async def _send(send, status, body, content_type):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", content_type), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _respond(send, status, payload):
+    await _send(send, status, json.dumps(payload, allow_nan=False).encode(), b"application/json")
+
+
+def _clean(value):
+    if isinstance(value, dict):
+        return {key: _clean(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_clean(item) for item in value]
+    return _json_value(value)
+
+
+async def app(scope, receive, send):
+    """ASGI entry point."""
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+    path, method = scope["path"].rstrip("/") or "/", scope["method"]
+    if path == "/health" and method == "GET":
+        await _respond(send, 200, {"status": "ok"})
+        return
+    if path == "/metrics" and method == "GET":
+        await _send(send, 200, PROFILER.prometheus_text().encode(), b"text/plain; version=0.0.4")
+        return
+    handler = ROUTES.get(path)
+    if handler is None:
+        await _respond(send, 404, {"error": f"Unknown endpoint {path}"})
+        return
+    if method != "POST":
+        await _respond(send, 405, {"error": "Use POST"})
+        return
+    try:
+        body = json.loads(await _read_body(receive) or b"{}")
+        if not isinstance(body, dict):
+            raise RequestError("Request body must be a JSON object")
+        result = handler(body)
+        if asyncio.iscoroutine(result):
+            result = await result
+    except (RequestError, ValueError, ArithmeticError) as e:
+        await _respond(send, 400, {"error": str(e)})
+        return
+    await _respond(send, 200, _clean(result))
@@ -0,0 +1,73 @@
+"""Memory held by one Streamlit session, for sizing how many sessions a server can hold.
+
+Each session keeps its results in st.session_state between reruns: DataFrames, calculation
+graph values, Excel export layouts and paths of bulk result files on disk. session_report
+measures each entry (DataFrames with their object columns, NumPy arrays by their buffers, and
+containers recursively), counting an object shared by several entries once. Objects shared
+with other sessions through the process-wide caches are counted too, so the total is an upper
+bound on what the session alone costs.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+def deep_size(value, seen=None):
+    """Approximate bytes held by value and everything it references, skipping ids in seen."""
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    if isinstance(value, np.ndarray):
+        # A view's buffer belongs to its base array, which is counted once
+        base = value
+        while isinstance(base.base, np.ndarray):
+            base = base.base
+        if base is value:
+            return value.nbytes
+        if id(base) in seen:
+            return 0
+        seen.add(id(base))
+        return base.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(deep_size(key, seen) + deep_size(item, seen) for key, item in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(deep_size(item, seen) for item in value)
+    return sys.getsizeof(value)
+
+
+def session_report(state):
+    """Return (rows, total_bytes, disk_bytes) for a session_state mapping, largest entries first.
+
+    Each row is {"key", "type", "bytes", "disk_bytes"}; disk_bytes is the size of a bulk result
+    file the entry points to (see store_result_file in app.py).
+    """
+    seen, rows = set(), []
+    for key in list(state.keys()):
+        value = state[key]
+        disk_bytes = 0
+        if str(key).endswith("_result_file") and isinstance(value, tuple) and os.path.exists(value[0]):
+            disk_bytes = os.path.getsize(value[0])
+        rows.append({"key": str(key), "type": type(value).__name__, "bytes": deep_size(value, seen), "disk_bytes": disk_bytes})
+    rows.sort(key=lambda row: row["bytes"], reverse=True)
+    return rows, sum(row["bytes"] for row in rows), sum(row["disk_bytes"] for row in rows)
+
+
+def process_memory_bytes():
+    """Resident memory of this process (the peak where /proc is unavailable), or None if unknown."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # macOS reports bytes, Linux KiB